@@ -1,49 +1,53 @@
+import asyncio
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, admin_only
+from app.core.config import settings
+from app.core.deps import get_db, get_read_db, admin_only
+from app.core.profile_cache import get_profiles
+from app.core.profiler import start_capture
+from app.core.responses import FastJSONResponse
+from app.core.user_cache import AuthUser
 from app.db import models, schemas
+from app.db.pagination import NEXT_CURSOR_HEADER, InvalidCursor, cursor_headers
+from app.db.instrumentation import query_budget, query_log
 from app.db.crud import (
     user as crud_user,
     payment as crud_payment,
     match as crud_match,
     recommendation as crud_recommendation
 )
+from app.db.serializers import serialize_profile
 from app.services.recommendation_service import build_weekly_recommendations
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @router.get("/users", response_model=List[schemas.AdminUser])
+@query_budget(3)
 def get_users(
     query: str = Query("", description="Search query for user nickname"),
-    page: int = Query(0, ge=0, description="Page number"),
-    admin_user: models.User = Depends(admin_only),
-    db: Session = Depends(get_db)
+    page: int = Query(0, ge=0, description="Page number (deprecated, use cursor)", deprecated=True),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(50, ge=1, le=100, description="Page size"),
+    admin_user: AuthUser = Depends(admin_only),
+    db: Session = Depends(get_read_db)
 ):
     """Get users for admin panel"""
     try:
-        users = crud_user.get_users_for_admin(db, query, page)
+        users, next_cursor = crud_user.get_users_for_admin(db, query, page, limit, cursor)
+        profiles = get_profiles(db, [user.id for user in users])
 
         result = []
         for user in users:
             profile_data = None
-            if user.profile:
-                profile_data = schemas.Profile(
-                    user_id=user.profile.user_id,
-                    nickname=user.profile.nickname,
-                    gender=user.profile.gender,
-                    birth_year=user.profile.birth_year,
-                    height=user.profile.height,
-                    region=user.profile.region,
-                    job=user.profile.job,
-                    intro=user.profile.intro,
-                    photos=user.profile.photos,
-                    visible=user.profile.visible
-                )
+            profile = profiles.get(str(user.id))
+            if profile:
+                profile_data = serialize_profile(profile, "admin")
 
-            result.append(schemas.AdminUser(
+            result.append(dict(
                 id=user.id,
                 kakao_user_id=user.kakao_user_id,
                 phone_verified=user.phone_verified,
@@ -53,8 +57,13 @@ def get_users(
                 profile=profile_data
             ))
 
-        return result
+        return FastJSONResponse(result, headers=cursor_headers(next_cursor))
 
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -63,51 +72,33 @@ def get_users(
 
 
 @router.get("/matches", response_model=List[schemas.AdminMatch])
+@query_budget(3)
 def get_matches(
     status_filter: Optional[str] = Query(None, alias="status", description="Filter by match status"),
-    page: int = Query(0, ge=0, description="Page number"),
-    admin_user: models.User = Depends(admin_only),
-    db: Session = Depends(get_db)
+    page: int = Query(0, ge=0, description="Page number (deprecated, use cursor)", deprecated=True),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(50, ge=1, le=100, description="Page size"),
+    admin_user: AuthUser = Depends(admin_only),
+    db: Session = Depends(get_read_db)
 ):
     """Get matches for admin panel"""
     try:
-        matches = crud_match.get_matches_for_admin(db, status_filter, page)
+        matches, next_cursor = crud_match.get_matches_for_admin(db, status_filter, page, limit, cursor)
+        profiles = get_profiles(db, [user_id for match in matches for user_id in (match.user_a, match.user_b)])
 
         result = []
         for match in matches:
             user_a_profile = None
-            if match.user_a_rel and match.user_a_rel.profile:
-                user_a_profile = schemas.Profile(
-                    user_id=match.user_a_rel.profile.user_id,
-                    nickname=match.user_a_rel.profile.nickname,
-                    gender=match.user_a_rel.profile.gender,
-                    birth_year=match.user_a_rel.profile.birth_year,
-                    height=match.user_a_rel.profile.height,
-                    region=match.user_a_rel.profile.region,
-                    job=match.user_a_rel.profile.job,
-                    intro=match.user_a_rel.profile.intro,
-                    photos=match.user_a_rel.profile.photos,
-                    visible=match.user_a_rel.profile.visible
-                )
+            if str(match.user_a) in profiles:
+                user_a_profile = serialize_profile(profiles[str(match.user_a)], "admin")
 
             user_b_profile = None
-            if match.user_b_rel and match.user_b_rel.profile:
-                user_b_profile = schemas.Profile(
-                    user_id=match.user_b_rel.profile.user_id,
-                    nickname=match.user_b_rel.profile.nickname,
-                    gender=match.user_b_rel.profile.gender,
-                    birth_year=match.user_b_rel.profile.birth_year,
-                    height=match.user_b_rel.profile.height,
-                    region=match.user_b_rel.profile.region,
-                    job=match.user_b_rel.profile.job,
-                    intro=match.user_b_rel.profile.intro,
-                    photos=match.user_b_rel.profile.photos,
-                    visible=match.user_b_rel.profile.visible
-                )
+            if str(match.user_b) in profiles:
+                user_b_profile = serialize_profile(profiles[str(match.user_b)], "admin")
 
             payment_data = None
             if match.payment:
-                payment_data = schemas.Payment(
+                payment_data = dict(
                     id=match.payment.id,
                     match_id=match.payment.match_id,
                     method=match.payment.method,
@@ -118,7 +109,7 @@ def get_matches(
                     memo=match.payment.memo
                 )
 
-            result.append(schemas.AdminMatch(
+            result.append(dict(
                 id=match.id,
                 user_a=match.user_a,
                 user_b=match.user_b,
@@ -129,8 +120,13 @@ def get_matches(
                 payment=payment_data
             ))
 
-        return result
+        return FastJSONResponse(result, headers=cursor_headers(next_cursor))
 
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -139,19 +135,22 @@ def get_matches(
 
 
 @router.get("/payments", response_model=List[schemas.AdminPayment])
+@query_budget(2)
 def get_payments(
     status_filter: Optional[str] = Query(None, alias="status", description="Filter by payment status (verified/pending)"),
-    page: int = Query(0, ge=0, description="Page number"),
-    admin_user: models.User = Depends(admin_only),
-    db: Session = Depends(get_db)
+    page: int = Query(0, ge=0, description="Page number (deprecated, use cursor)", deprecated=True),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(50, ge=1, le=100, description="Page size"),
+    admin_user: AuthUser = Depends(admin_only),
+    db: Session = Depends(get_read_db)
 ):
     """Get payments for admin panel"""
     try:
-        payments = crud_payment.get_payments_for_admin(db, status_filter, page)
+        payments, next_cursor = crud_payment.get_payments_for_admin(db, status_filter, page, limit, cursor)
 
         result = []
         for payment in payments:
-            match_data = schemas.Match(
+            match_data = dict(
                 id=payment.match.id,
                 user_a=payment.match.user_a,
                 user_b=payment.match.user_b,
@@ -159,7 +158,7 @@ def get_payments(
                 status=payment.match.status
             )
 
-            result.append(schemas.AdminPayment(
+            result.append(dict(
                 id=payment.id,
                 match_id=payment.match_id,
                 method=payment.method,
@@ -171,8 +170,13 @@ def get_payments(
                 match=match_data
             ))
 
-        return result
+        return FastJSONResponse(result, headers=cursor_headers(next_cursor))
 
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -183,7 +187,7 @@ def get_payments(
 @router.post("/payments/{payment_id}/verify", response_model=schemas.VerifyPaymentResponse)
 def verify_payment(
     payment_id: str,
-    admin_user: models.User = Depends(admin_only),
+    admin_user: AuthUser = Depends(admin_only),
     db: Session = Depends(get_db)
 ):
     """Verify a payment"""
@@ -220,7 +224,7 @@ def verify_payment(
 @router.post("/matches/{match_id}/activate", response_model=schemas.ActivateMatchResponse)
 def activate_match(
     match_id: str,
-    admin_user: models.User = Depends(admin_only),
+    admin_user: AuthUser = Depends(admin_only),
     db: Session = Depends(get_db)
 ):
     """Activate a match"""
@@ -254,9 +258,58 @@ def activate_match(
         )
 
 
+@router.get("/queries", response_model=schemas.QueryStatsResponse)
+def get_query_stats(
+    limit: int = Query(20, ge=1, le=200, description="Number of fingerprints"),
+    order_by: str = Query("total", pattern="^(total|count|max)$", description="Sort by total time, call count or max time"),
+    admin_user: AuthUser = Depends(admin_only)
+):
+    """Top SQL statement fingerprints seen by this worker over the rolling window"""
+    return schemas.QueryStatsResponse(
+        window_seconds=settings.QUERY_STATS_WINDOW_SECONDS,
+        queries=query_log.top(limit, order_by)
+    )
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=300, description="Longest time to sample"),
+    path: Optional[str] = Query(None, description="Only sample while requests under this path prefix run"),
+    requests: int = Query(1, ge=1, le=1000, description="With path: stop after this many matching requests"),
+    interval_ms: float = Query(5, ge=1, le=100, description="Sampling interval"),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$", description="Collapsed stacks or speedscope JSON"),
+    admin_user: AuthUser = Depends(admin_only)
+):
+    """Sample the stacks of the worker serving this request and return the profile
+
+    Samples for the given seconds, or with path for the next matching requests
+    (bounded by seconds). Open speedscope output at https://www.speedscope.app.
+    """
+    capture = start_capture(
+        seconds=seconds,
+        interval=interval_ms / 1000,
+        path=path,
+        requests=requests if path else None
+    )
+    if capture is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile capture is already running on this worker"
+        )
+
+    while not capture.finished:
+        await asyncio.sleep(0.05)
+    await asyncio.to_thread(capture.stop)
+
+    headers = {"X-Profile-Samples": str(capture.samples), "X-Profile-Requests": str(capture.requests_seen)}
+    if format == "speedscope":
+        return JSONResponse(capture.speedscope(path or f"{seconds:g}s"), headers=headers)
+    return PlainTextResponse(capture.collapsed(), headers=headers)
+
+
 @router.post("/recs/run")
 def run_recommendations(
-    admin_user: models.User = Depends(admin_only),
+    admin_user: AuthUser = Depends(admin_only),
     db: Session = Depends(get_db)
 ):
     """Manually trigger recommendation generation"""
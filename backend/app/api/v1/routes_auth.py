@@ -1,10 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, get_current_user
+from app.core.deps import get_db, get_async_db, get_current_user
+from app.core.profile_cache import get_own_preferences_async, get_own_profile_async
+from app.core.user_cache import AuthUser
 from app.core.security import create_jwt
-from app.db import models, schemas
+from app.db import schemas
+from app.db.instrumentation import query_budget
 from app.db.crud import user as crud_user
+from app.db.serializers import serialize_profile
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -47,12 +52,17 @@ def sync_kakao(body: schemas.SyncKakaoRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=schemas.MeResponse)
-def get_me(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@query_budget(4)
+async def get_me(
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get current user with profile and preferences"""
-    user_data = crud_user.get_user_with_profile_and_preferences(db, str(current_user.id))
+    """Get current user with profile and preferences
+
+    Read from the primary: it follows sign-up (/auth/sync-kakao), whose caller
+    has no token yet to carry the read-after-write marker.
+    """
+    user_data = await db.run_sync(crud_user.get_user_by_id, str(current_user.id))
 
     if not user_data:
         raise HTTPException(
@@ -60,31 +70,22 @@ def get_me(
             detail="User not found"
         )
 
+    profile = await get_own_profile_async(db, current_user.id)
     profile_data = None
-    if user_data.profile:
-        profile_data = schemas.Profile(
-            user_id=user_data.profile.user_id,
-            nickname=user_data.profile.nickname,
-            gender=user_data.profile.gender,
-            birth_year=user_data.profile.birth_year,
-            height=user_data.profile.height,
-            region=user_data.profile.region,
-            job=user_data.profile.job,
-            intro=user_data.profile.intro,
-            photos=user_data.profile.photos,
-            visible=user_data.profile.visible
-        )
+    if profile:
+        profile_data = serialize_profile(profile, "self")
 
+    preferences = await get_own_preferences_async(db, current_user.id)
     preferences_data = None
-    if user_data.preferences:
+    if preferences:
         preferences_data = schemas.Preferences(
-            user_id=user_data.preferences.user_id,
-            target_gender=user_data.preferences.target_gender,
-            age_min=user_data.preferences.age_min,
-            age_max=user_data.preferences.age_max,
-            regions=user_data.preferences.regions,
-            keywords=user_data.preferences.keywords,
-            blocks=user_data.preferences.blocks
+            user_id=preferences.user_id,
+            target_gender=preferences.target_gender,
+            age_min=preferences.age_min,
+            age_max=preferences.age_max,
+            regions=preferences.regions,
+            keywords=preferences.keywords,
+            blocks=preferences.blocks
         )
 
     return schemas.MeResponse(
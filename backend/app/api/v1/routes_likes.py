@@ -1,19 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, get_current_user
-from app.db import models, schemas
-from app.db.crud import like as crud_like, match as crud_match
+from app.core.config import settings
+from app.core.deps import get_async_db, get_current_user
+from app.core.user_cache import AuthUser
+from app.db import schemas
+from app.db.crud import like as crud_like
 
 router = APIRouter(tags=["likes"])
 
 
 @router.post("/likes", response_model=schemas.LikeResponse)
-def create_like(
+async def create_like(
     like_data: schemas.LikeRequest,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a like and check for mutual matching"""
     try:
@@ -27,41 +28,23 @@ def create_like(
                 detail="Cannot like yourself"
             )
 
-        # Check if target user exists
-        target_user = db.query(models.User).filter(models.User.id == to_user_id).first()
-        if not target_user:
+        # Insert the like and, if mutual, the match in one statement
+        result = await db.run_sync(
+            crud_like.create_like_and_match, from_user_id, to_user_id, like_data.batchWeek
+        )
+
+        if not result.target_exists:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Target user not found"
             )
 
-        if target_user.banned:
+        if result.target_banned:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot like banned user"
             )
 
-        # Check if like already exists
-        existing_like = crud_like.get_like(db, from_user_id, to_user_id, like_data.batchWeek)
-        if existing_like:
-            return schemas.LikeResponse(ok=True)  # Already liked
-
-        # Create the like
-        try:
-            crud_like.create_like(db, from_user_id, to_user_id, like_data.batchWeek)
-        except IntegrityError:
-            db.rollback()
-            # Like already exists (race condition)
-            return schemas.LikeResponse(ok=True)
-
-        # Check for mutual like
-        if crud_like.check_mutual_like(db, from_user_id, to_user_id, like_data.batchWeek):
-            # Check if match already exists
-            existing_match = crud_match.get_match_by_users(db, from_user_id, to_user_id)
-            if not existing_match:
-                # Create new match with pending status
-                crud_match.create_match(db, from_user_id, to_user_id, "pending")
-
         return schemas.LikeResponse(ok=True)
 
     except HTTPException:
@@ -70,4 +53,62 @@ def create_like(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create like: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/likes/batch", response_model=schemas.LikeBatchResponse)
+async def create_likes_batch(
+    batch_data: schemas.LikeBatchRequest,
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Like several users from the weekly deck at once, creating any mutual matches"""
+    try:
+        from_user_id = str(current_user.id)
+        to_user_ids = list(dict.fromkeys(str(to_user_id) for to_user_id in batch_data.toUserIds))
+
+        if not to_user_ids or len(to_user_ids) > settings.LIKE_BATCH_MAX_TARGETS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Send between 1 and {settings.LIKE_BATCH_MAX_TARGETS} target users"
+            )
+
+        targets = [to_user_id for to_user_id in to_user_ids if to_user_id != from_user_id]
+        rows = {}
+        if targets:
+            rows = {
+                str(row.to_user): row
+                for row in await db.run_sync(
+                    crud_like.create_likes_and_matches, from_user_id, targets, batch_data.batchWeek
+                )
+            }
+
+        results = []
+        for to_user_id in to_user_ids:
+            row = rows.get(to_user_id)
+            if row is None:
+                like_status = "self"
+            elif not row.found:
+                like_status = "not_found"
+            elif row.banned:
+                like_status = "banned"
+            elif row.liked:
+                like_status = "liked"
+            else:
+                like_status = "already_liked"
+
+            results.append(schemas.LikeBatchItem(
+                toUserId=to_user_id,
+                status=like_status,
+                matched=bool(row is not None and row.matched)
+            ))
+
+        return schemas.LikeBatchResponse(results=results)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create likes: {str(e)}"
+        )
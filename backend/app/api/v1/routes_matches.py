@@ -1,35 +1,51 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, get_current_user
-from app.db import models, schemas
+from app.core.responses import FastJSONResponse, etag_headers, not_modified, weak_etag
+from app.core.deps import get_async_read_db, get_current_user, get_read_db
+from app.core.profile_cache import get_profile
+from app.core.user_cache import AuthUser
+from app.db import schemas
+from app.db.pagination import NEXT_CURSOR_HEADER, InvalidCursor, cursor_headers
+from app.db.instrumentation import query_budget
 from app.db.crud import match as crud_match
+from app.db.serializers import serialize_profile
 
 router = APIRouter(tags=["matches"])
 
 
 @router.get("/matches", response_model=List[schemas.Match])
-def get_matches(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@query_budget(3)
+async def get_matches(
+    request: Request,
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(50, ge=1, le=100, description="Page size"),
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Get all matches for current user"""
-    try:
-        matches = crud_match.get_user_matches(db, str(current_user.id))
-
-        result = []
-        for match in matches:
-            result.append(schemas.Match(
-                id=match.id,
-                user_a=match.user_a,
-                user_b=match.user_b,
-                created_at=match.created_at,
-                status=match.status
-            ))
+    """Get matches for current user, newest first
 
-        return result
+    Sends a weak ETag; a matching If-None-Match gets 304 without loading the page.
+    """
+    try:
+        version = await db.run_sync(crud_match.get_user_matches_version, str(current_user.id))
+        etag = weak_etag("matches", str(current_user.id), cursor, limit, *version)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+        rows, next_cursor = await db.run_sync(
+            crud_match.get_user_match_rows, str(current_user.id), limit, cursor
+        )
+        return FastJSONResponse([row._asdict() for row in rows], headers={**cursor_headers(next_cursor), **etag_headers(etag)})
 
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -38,10 +54,11 @@ def get_matches(
 
 
 @router.get("/matches/{match_id}", response_model=schemas.MatchDetail)
+@query_budget(3)
 def get_match_detail(
     match_id: str,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get detailed match information"""
     try:
@@ -61,27 +78,16 @@ def get_match_detail(
             )
 
         # Get the other user's profile
-        other_user = crud_match.get_other_user(match, str(current_user.id))
-        if not other_user or not other_user.profile:
+        other_user_id = crud_match.get_other_user_id(match, str(current_user.id))
+        other_profile = get_profile(db, other_user_id) if other_user_id else None
+        if not other_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Other user profile not found"
             )
 
         # Apply visibility settings to other user's profile
-        other_profile = other_user.profile
-        visible_profile = schemas.Profile(
-            user_id=other_profile.user_id,
-            nickname=other_profile.nickname,
-            gender=other_profile.gender,
-            birth_year=other_profile.birth_year if other_profile.visible.get('age', True) else None,
-            height=other_profile.height if other_profile.visible.get('height', True) else None,
-            region=other_profile.region if other_profile.visible.get('region', True) else None,
-            job=other_profile.job if other_profile.visible.get('job', True) else None,
-            intro=other_profile.intro if other_profile.visible.get('intro', True) else None,
-            photos=other_profile.photos,  # Photos are visible in active matches
-            visible=other_profile.visible
-        )
+        visible_profile = serialize_profile(other_profile, "match")
 
         match_schema = schemas.Match(
             id=match.id,
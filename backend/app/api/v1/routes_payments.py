@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.core.deps import get_db, get_current_user
-from app.db import models, schemas
+from app.core.user_cache import AuthUser
+from app.db import schemas
 from app.db.crud import payment as crud_payment, match as crud_match
 
 router = APIRouter(tags=["payments"])
@@ -12,7 +13,7 @@ router = APIRouter(tags=["payments"])
 @router.post("/payments/intent", response_model=schemas.Payment)
 def create_payment_intent(
     payment_data: schemas.PaymentIntentRequest,
-    current_user: models.User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create payment intent for a match"""
@@ -102,7 +103,7 @@ def create_payment_intent(
 @router.get("/payments/{payment_id}", response_model=schemas.Payment)
 def get_payment(
     payment_id: str,
-    current_user: models.User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get payment details"""
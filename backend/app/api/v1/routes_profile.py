@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_db, get_current_user
-from app.db import models, schemas
+from app.core.user_cache import AuthUser
+from app.db import schemas
 from app.db.crud import user as crud_user
+from app.db.serializers import serialize_profile
 
 router = APIRouter(tags=["profile"])
 
@@ -11,7 +13,7 @@ router = APIRouter(tags=["profile"])
 @router.put("/profile", response_model=schemas.Profile)
 def update_profile(
     profile_data: schemas.ProfileUpdate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update user profile"""
@@ -34,18 +36,7 @@ def update_profile(
         # Update profile
         profile = crud_user.update_profile(db, str(current_user.id), profile_data)
 
-        return schemas.Profile(
-            user_id=profile.user_id,
-            nickname=profile.nickname,
-            gender=profile.gender,
-            birth_year=profile.birth_year,
-            height=profile.height,
-            region=profile.region,
-            job=profile.job,
-            intro=profile.intro,
-            photos=profile.photos,
-            visible=profile.visible
-        )
+        return serialize_profile(profile, "self")
     except HTTPException:
         raise
     except Exception as e:
@@ -58,7 +49,7 @@ def update_profile(
 @router.put("/preferences", response_model=schemas.Preferences)
 def update_preferences(
     preferences_data: schemas.PreferencesUpdate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update user preferences"""
@@ -1,21 +1,31 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, get_current_user
-from app.db import models, schemas
+from app.core.responses import FastJSONResponse, etag_headers, not_modified, weak_etag
+from app.core.deps import get_async_read_db, get_current_user
+from app.core.profile_cache import get_profile_versions_async, get_profiles_async
+from app.core.user_cache import AuthUser
+from app.db import schemas
+from app.db.instrumentation import query_budget
 from app.db.crud import recommendation as crud_recommendation
+from app.db.serializers import serialize_profile
 
 router = APIRouter(tags=["recommendations"])
 
 
 @router.get("/recommendations", response_model=List[schemas.RecommendationItem])
-def get_recommendations(
+@query_budget(5)
+async def get_recommendations(
+    request: Request,
     week: str = Query(..., description="Week in format YYYY-Www (e.g., 2024-W37)"),
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Get recommendations for current user for a specific week"""
+    """Get recommendations for current user for a specific week
+
+    Sends a weak ETag; a matching If-None-Match gets 304 without loading the list.
+    """
     try:
         # Validate week format (basic validation)
         if not week or len(week) < 8 or 'W' not in week:
@@ -24,30 +34,36 @@ def get_recommendations(
                 detail="Invalid week format. Use YYYY-Www format (e.g., 2024-W37)"
             )
 
-        recommendations = crud_recommendation.get_recommendations(
-            db, str(current_user.id), week
+        marker, target_ids = await db.run_sync(
+            crud_recommendation.get_recommendations_version, str(current_user.id), week
+        )
+        profile_versions = await get_profile_versions_async(target_ids)
+        etag = weak_etag(
+            "recommendations", str(current_user.id), week, *marker, max(profile_versions.values(), default=None)
+        )
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+        recommendations = await db.run_sync(
+            crud_recommendation.get_recommendations, str(current_user.id), week
+        )
+
+        profiles = await get_profiles_async(
+            db,
+            [rec.target_user_id for rec in recommendations],
+            fresh_as_of=profile_versions
         )
 
         result = []
         for rec in recommendations:
-            if rec.target_user and rec.target_user.profile:
-                target_profile = rec.target_user.profile
+            target_profile = profiles.get(str(rec.target_user_id))
+            if target_profile:
 
                 # Apply visibility settings
-                visible_profile = schemas.Profile(
-                    user_id=target_profile.user_id,
-                    nickname=target_profile.nickname,
-                    gender=target_profile.gender,
-                    birth_year=target_profile.birth_year if target_profile.visible.get('age', True) else None,
-                    height=target_profile.height if target_profile.visible.get('height', True) else None,
-                    region=target_profile.region if target_profile.visible.get('region', True) else None,
-                    job=target_profile.job if target_profile.visible.get('job', True) else None,
-                    intro=target_profile.intro if target_profile.visible.get('intro', True) else None,
-                    photos=target_profile.photos,  # Photos are always visible for recommendations
-                    visible=target_profile.visible
-                )
+                visible_profile = serialize_profile(target_profile, "recommendation")
 
-                result.append(schemas.RecommendationItem(
+                result.append(dict(
                     id=rec.id,
                     target_user_id=rec.target_user_id,
                     batch_week=rec.batch_week,
@@ -57,7 +73,7 @@ def get_recommendations(
                     target_profile=visible_profile
                 ))
 
-        return result
+        return FastJSONResponse(result, headers=etag_headers(etag))
 
     except HTTPException:
         raise
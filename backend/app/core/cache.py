@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import redis
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+_redis_client: Optional[redis.Redis] = None
+_redis_down_until = 0.0
+
+# Seconds to skip Redis after a connection error
+REDIS_RETRY_SECONDS = 30.0
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Shared Redis client, or None while Redis is disabled or unreachable"""
+    global _redis_client
+    if not settings.CACHE_REDIS_ENABLED or time.monotonic() < _redis_down_until:
+        return None
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1,
+            decode_responses=True
+        )
+    return _redis_client
+
+
+def set_redis_client(client: Optional[redis.Redis]) -> None:
+    """Replace the shared Redis client (e.g. with fakeredis in tests)"""
+    global _redis_client, _redis_down_until
+    _redis_client = client
+    _redis_down_until = 0.0
+
+
+def _redis_failed(error: Exception) -> None:
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+    logger.warning("Redis unavailable, using local cache only", error=str(error))
+
+
+class RedisTier:
+    """Namespaced Redis cache operations that degrade to no-ops when Redis is down"""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: Hashable) -> Optional[str]:
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            return client.get(self._key(key))
+        except redis.RedisError as e:
+            _redis_failed(e)
+            return None
+
+    def get_many(self, keys: List[Hashable]) -> List[Optional[str]]:
+        client = get_redis()
+        if client is None or not keys:
+            return [None] * len(keys)
+        try:
+            return client.mget([self._key(key) for key in keys])
+        except redis.RedisError as e:
+            _redis_failed(e)
+            return [None] * len(keys)
+
+    def set(self, key: Hashable, value: str, ttl: int, nx: bool = False) -> None:
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.set(self._key(key), value, ex=ttl, nx=nx)
+        except redis.RedisError as e:
+            _redis_failed(e)
+
+    def set_many(self, items: Dict[Hashable, str], ttl: int, nx: bool = False) -> None:
+        client = get_redis()
+        if client is None or not items:
+            return
+        try:
+            pipeline = client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipeline.set(self._key(key), value, ex=ttl, nx=nx)
+            pipeline.execute()
+        except redis.RedisError as e:
+            _redis_failed(e)
+
+    def delete(self, *keys: Hashable) -> None:
+        client = get_redis()
+        if client is None or not keys:
+            return
+        try:
+            client.delete(*[self._key(key) for key in keys])
+        except redis.RedisError as e:
+            _redis_failed(e)
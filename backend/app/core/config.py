@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     API_BASE_PATH: str = "/"
     CORS_ORIGINS: str = "http://localhost:3000"
     LOG_LEVEL: str = "INFO"
+    REQUEST_LOG_SAMPLE_RATE: float = 0.0  # Fraction of ordinary requests to log
+    REQUEST_LOG_SLOW_MS: int = 1000  # Requests at least this slow are always logged
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 10  # Background database/Redis check behind /healthz
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2
+    READY_MAX_POOL_SATURATION: float = 0.9  # /readyz fails when an API pool is this full
 
     # Database
     DB_HOST: str = "localhost"
@@ -17,9 +22,44 @@ class Settings(BaseSettings):
     DB_NAME: str = "kakao_match"
     DB_USER: str = "app"
     DB_PASSWORD: str
+    # Per worker process, each database (primary and every replica) can get up
+    # to DB_POOL_SIZE + DB_MAX_OVERFLOW + ASYNC_DB_POOL_SIZE + ASYNC_DB_MAX_OVERFLOW
+    # API connections (20 at the defaults); the primary also serves the batch pool
+    DB_POOL_SIZE: int = 5  # Sync route handlers
+    DB_MAX_OVERFLOW: int = 5
+    ASYNC_DB_POOL_SIZE: int = 5  # Async route handlers
+    ASYNC_DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Replace connections older than this many seconds
+    DB_POOL_PRE_PING: bool = True
+    BATCH_DB_POOL_SIZE: int = 2  # Separate pool for batch jobs and scripts
+    BATCH_DB_MAX_OVERFLOW: int = 2
+    DB_REPLICA_URLS: str = ""  # Comma-separated read replica URLs for read-only endpoints
+    DB_REPLICA_RETRY_SECONDS: int = 30  # Skip a failed replica for this long
+    DB_READ_AFTER_WRITE_SECONDS: int = 5  # Read from the primary for this long after a write (client-held cookie/header)
+    SLOW_QUERY_MS: int = 200  # Statements at least this slow are logged with their fingerprint
+    QUERY_STATS_WINDOW_SECONDS: int = 3600  # Rolling window of the per-fingerprint aggregates
+    QUERY_STATS_MAX_FINGERPRINTS: int = 1000
+
+    # Tracing (OTLP/JSON spans per request, CRUD call, statement and build stage)
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0  # Fraction of requests traced when the caller sent no traceparent
+    TRACING_EXPORT_PATH: str = ""  # Append span batches here as JSON lines
+    TRACING_OTLP_ENDPOINT: str = ""  # OTLP/HTTP collector base URL, e.g. http://localhost:4318
+    TRACING_SERVICE_NAME: str = "shh-match-backend"
+    TRACING_MAX_SPANS_PER_TRACE: int = 5000  # CRUD and statement spans past this are dropped
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_REDIS_ENABLED: bool = True
+
+    # Caching
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 15
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    PROFILE_CACHE_TTL_SECONDS: int = 3600
+    PROFILE_CACHE_LOCAL_TTL_SECONDS: int = 15
+    PROFILE_CACHE_MAX_ENTRIES: int = 20000
 
     # Security
     PASSWORD_HASH_SCHEME: str = "bcrypt"
@@ -27,6 +67,21 @@ class Settings(BaseSettings):
     JWT_AUDIENCE: str = "kakao-match-web"
     JWT_EXPIRE_MINUTES: int = 10080  # 7 days
     JWT_ALG: str = "HS256"
+    JWT_CACHE_TTL_SECONDS: int = 300  # How long a verified token skips re-verification
+    JWT_CACHE_MAX_ENTRIES: int = 10000
+
+    # Recommendations
+    REGION_FILTER_RADIUS_KM: float = 0  # Widen preferred regions to neighbours within this distance
+    SCORING_STRATEGY_WEIGHTS: str = "baseline:100"  # A/B split, e.g. "baseline:90,experiment:10"
+    SCORING_CHUNK_SIZE: int = 500  # Users scored together in one vectorized pass
+    RECS_ACTIVE_DAYS: int = 14  # Likes/signups within this window raise delivery priority
+    RECS_STAGGER_BUCKETS: int = 1  # Split the weekly build into this many user-id hash buckets
+    RECS_STAGGER_WINDOW_MINUTES: int = 0  # Spread bucket runs over this many minutes
+    RECS_PROFILE_DIR: str = ""  # Write a collapsed-stack profile of each scheduled build here
+    SNAPSHOT_PATH: str = ""  # Population snapshot file (on a private path) for scoring features; empty disables
+
+    # Likes
+    LIKE_BATCH_MAX_TARGETS: int = 50  # Most targets accepted by POST /likes/batch
 
     # Timezone
     TZ: str = "Asia/Seoul"
@@ -37,6 +92,21 @@ class Settings(BaseSettings):
     def database_url(self) -> str:
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def async_database_url(self) -> str:
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def async_replica_urls(self) -> List[str]:
+        return [
+            url.replace("postgresql://", "postgresql+asyncpg://", 1).replace("sqlite://", "sqlite+aiosqlite://", 1)
+            for url in self.replica_urls
+        ]
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
@@ -1,11 +1,13 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import AsyncGenerator, Generator, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
-from app.db import models
+from app.db.routing import reads_from_primary
+from app.db.session import AsyncSessionLocal, SessionLocal, async_read_router, read_router
 from app.core.security import decode_jwt
+from app.core.user_cache import AuthUser, get_auth_user_async
 
 security = HTTPBearer()
 
@@ -19,10 +21,37 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Async database dependency"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Database dependency for read-only endpoints, served by a replica when available"""
+    connection = read_router.connect(reads_from_primary(request))
+    db = Session(bind=connection, autoflush=False)
+    try:
+        yield db
+    finally:
+        db.close()
+        connection.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Async variant of get_read_db"""
+    connection = await async_read_router.connect_async(reads_from_primary(request))
+    try:
+        async with AsyncSession(bind=connection, autoflush=False, expire_on_commit=False) as db:
+            yield db
+    finally:
+        await connection.close()
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
     credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> models.User:
+) -> AuthUser:
     """Get current authenticated user"""
     token = credentials.credentials
     payload = decode_jwt(token)
@@ -42,7 +71,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await get_auth_user_async(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,7 +88,7 @@ def get_current_user(
     return user
 
 
-def admin_only(current_user: models.User = Depends(get_current_user)) -> models.User:
+async def admin_only(current_user: AuthUser = Depends(get_current_user)) -> AuthUser:
     """Ensure current user is an admin"""
     if current_user.role != "admin":
         raise HTTPException(
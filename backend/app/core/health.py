@@ -0,0 +1,173 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+import structlog
+from sqlalchemy import text
+
+from app.db.session import health_engine
+from .cache import get_redis
+from .config import settings
+from .metrics import pool_stats
+
+logger = structlog.get_logger()
+
+# Pools whose saturation takes a worker out of rotation
+API_POOLS = ("api", "api_async")
+
+
+async def check_database(engine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_redis() -> None:
+    client = get_redis()
+    if client is None:
+        raise ConnectionError("Redis unavailable, retrying later")
+    await asyncio.to_thread(client.ping)
+
+
+class HealthMonitor:
+    """Database and Redis checks run on an interval, with the result kept in memory
+
+    /healthz serves the pre-rendered body of the last check, so probes never
+    touch the database. The status is healthy, degraded (Redis down: caches
+    fall back to the database) or unhealthy (database down).
+    """
+
+    def __init__(self, engine, interval: float, timeout: float):
+        self.engine = engine
+        self.interval = interval
+        self.timeout = timeout
+        self.status = "unknown"
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.checked_at: Optional[datetime] = None
+        self.body = self._render()
+        self._task: Optional[asyncio.Task] = None
+
+    def _render(self) -> bytes:
+        return orjson.dumps(
+            {"status": self.status, "timestamp": self.checked_at or datetime.now(timezone.utc)},
+            option=orjson.OPT_UTC_Z
+        )
+
+    async def _run_check(self, check: Callable[[], Awaitable[None]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+        except Exception as e:
+            return {"status": "error", "error": str(e)[:200] or type(e).__name__}
+        return {"status": "ok", "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    async def check(self) -> str:
+        """Run every check once and cache the result"""
+        checks = {"database": await self._run_check(lambda: check_database(self.engine))}
+        if settings.CACHE_REDIS_ENABLED:
+            checks["redis"] = await self._run_check(check_redis)
+        else:
+            checks["redis"] = {"status": "disabled"}
+
+        if checks["database"]["status"] != "ok":
+            status = "unhealthy"
+        elif checks["redis"]["status"] == "error":
+            status = "degraded"
+        else:
+            status = "healthy"
+
+        if status != self.status and self.status != "unknown":
+            logger.warning("Health status changed", previous=self.status, status=status, checks=checks)
+        self.status = status
+        self.checks = checks
+        self.checked_at = datetime.now(timezone.utc)
+        self.body = self._render()
+        return status
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last completed check"""
+        if self.checked_at is None:
+            return None
+        return (datetime.now(timezone.utc) - self.checked_at).total_seconds()
+
+    @property
+    def stale(self) -> bool:
+        """True if checks stopped completing (e.g. the event loop is blocked)"""
+        age = self.age
+        return age is None or age > 3 * self.interval + self.timeout
+
+    async def _loop(self) -> None:
+        # Startup runs the first check before serving
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Health check failed: {str(e)}", exc_info=True)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def pool_saturation() -> Dict[str, Dict[str, Any]]:
+    """Checked-out connections of every pool as a fraction of pool size plus overflow"""
+    result = {}
+    for name, stats in pool_stats().items():
+        capacity = stats["size"] + stats["max_overflow"]
+        result[name] = {
+            "checked_out": stats["checked_out"],
+            "capacity": capacity,
+            "saturation": round(stats["checked_out"] / capacity, 3) if capacity else 0.0,
+            "timeouts": stats["timeouts"],
+        }
+    return result
+
+
+def readiness(monitor: HealthMonitor, scheduler_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Whether this worker should receive traffic, with the reasons if not
+
+    Scheduler and job state are reported but never fail readiness; a failed
+    weekly build does not stop the API from serving.
+    """
+    pools = pool_saturation()
+    reasons = []
+    if monitor.status in ("unknown", "unhealthy"):
+        reasons.append(f"health {monitor.status}")
+    elif monitor.stale:
+        reasons.append("health checks stale")
+    for name in API_POOLS:
+        if name in pools and pools[name]["saturation"] >= settings.READY_MAX_POOL_SATURATION:
+            reasons.append(f"pool {name} saturated")
+
+    return {
+        "status": "not_ready" if reasons else "ready",
+        "reasons": reasons,
+        "timestamp": datetime.now(timezone.utc),
+        "health": {
+            "status": monitor.status,
+            "checked_at": monitor.checked_at,
+            "age_seconds": round(monitor.age, 3) if monitor.age is not None else None,
+            "checks": monitor.checks,
+        },
+        "pools": pools,
+        "scheduler": scheduler_state,
+    }
+
+
+health_monitor = HealthMonitor(
+    health_engine,
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS
+)
@@ -0,0 +1,205 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Checkout counters for one connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, wait: float, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_checkouts += overflow
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def record_timeout(self, wait: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+
+_pool_metrics: Dict[str, PoolMetrics] = {}
+_engines: Dict[str, Engine] = {}
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    """Counters for a named pool, created on first use"""
+    metrics = _pool_metrics.get(name)
+    if metrics is None:
+        metrics = _pool_metrics.setdefault(name, PoolMetrics(name))
+    return metrics
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout and counts overflow connections and timeouts
+
+    The pool name is taken from pool_logging_name, which survives pool
+    recreation on engine.dispose().
+    """
+
+    def _do_get(self):
+        metrics = get_pool_metrics(self._orig_logging_name or "default")
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            metrics.record_timeout(time.perf_counter() - started)
+            raise
+        metrics.record_checkout(time.perf_counter() - started, self.overflow() > 0)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def register_engine(name: str, engine) -> None:
+    """Expose an engine's pool gauges under name (sync or async engine)"""
+    _engines[name] = getattr(engine, "sync_engine", engine)
+    get_pool_metrics(name)
+
+
+def pool_stats() -> Dict[str, Dict[str, float]]:
+    """Current gauges and counters of every registered pool"""
+    stats = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        metrics = get_pool_metrics(name)
+        stats[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": max(getattr(pool, "_max_overflow", 0), 0),
+            "checkouts": metrics.checkouts,
+            "overflow_checkouts": metrics.overflow_checkouts,
+            "timeouts": metrics.timeouts,
+            "wait_seconds_total": round(metrics.wait_seconds_total, 6),
+            "wait_seconds_max": round(metrics.wait_seconds_max, 6),
+        }
+    return stats
+
+
+# Prometheus name, type and help for each pool_stats() field
+_POOL_METRICS = (
+    ("size", "db_pool_size", "gauge", "Configured pool size"),
+    ("checked_out", "db_pool_checked_out", "gauge", "Connections currently checked out"),
+    ("overflow", "db_pool_overflow", "gauge", "Overflow connections currently open"),
+    ("max_overflow", "db_pool_max_overflow", "gauge", "Configured overflow limit"),
+    ("checkouts", "db_pool_checkouts_total", "counter", "Connection checkouts"),
+    ("overflow_checkouts", "db_pool_overflow_checkouts_total", "counter", "Checkouts served by an overflow connection"),
+    ("timeouts", "db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection"),
+    ("wait_seconds_total", "db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection"),
+    ("wait_seconds_max", "db_pool_wait_seconds_max", "gauge", "Longest wait for a connection"),
+)
+
+
+# Upper bounds of the request latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LATENCY_BUCKETS_NS = tuple(int(bound * 1e9) for bound in LATENCY_BUCKETS)
+
+
+class LatencyHistogram:
+    """Request latency histogram for one (method, route, status), with database totals"""
+
+    __slots__ = ("counts", "sum_ns", "count", "queries", "db_ns")
+
+    def __init__(self):
+        self.counts = [0] * (len(_LATENCY_BUCKETS_NS) + 1)  # Last slot: above the largest bound
+        self.sum_ns = 0
+        self.count = 0
+        self.queries = 0
+        self.db_ns = 0
+
+    def observe(self, duration_ns: int, queries: int = 0, db_ns: int = 0) -> None:
+        self.counts[bisect_left(_LATENCY_BUCKETS_NS, duration_ns)] += 1
+        self.sum_ns += duration_ns
+        self.count += 1
+        self.queries += queries
+        self.db_ns += db_ns
+
+
+_request_histograms: Dict[Tuple[str, str, int], LatencyHistogram] = {}
+_request_lock = threading.Lock()
+
+
+def record_request(method: str, route: str, status: int, duration_ns: int, queries: int = 0, db_ns: int = 0) -> None:
+    """Add one request to the latency histogram of its route template and status"""
+    key = (method, route, status)
+    with _request_lock:
+        histogram = _request_histograms.get(key)
+        if histogram is None:
+            histogram = _request_histograms[key] = LatencyHistogram()
+        histogram.observe(duration_ns, queries, db_ns)
+
+
+def request_histograms() -> Dict[Tuple[str, str, int], LatencyHistogram]:
+    """Snapshot of the request latency histograms"""
+    with _request_lock:
+        snapshot = {}
+        for key, histogram in _request_histograms.items():
+            copy = LatencyHistogram()
+            copy.counts = list(histogram.counts)
+            copy.sum_ns = histogram.sum_ns
+            copy.count = histogram.count
+            copy.queries = histogram.queries
+            copy.db_ns = histogram.db_ns
+            snapshot[key] = copy
+        return snapshot
+
+
+def _render_request_histograms(lines: List[str]) -> None:
+    histograms = sorted(request_histograms().items())
+    metric = "http_request_duration_seconds"
+    lines.append(f"# HELP {metric} Request latency by route template and status")
+    lines.append(f"# TYPE {metric} histogram")
+    for (method, route, status), histogram in histograms:
+        labels = f'method="{method}",route="{route}",status="{status}"'
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{metric}_sum{{{labels}}} {histogram.sum_ns / 1e9}")
+        lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+    for metric, description, value in (
+        ("http_request_db_queries_total", "SQL statements run by requests", lambda h: h.queries),
+        ("http_request_db_seconds_total", "Database time spent by requests", lambda h: h.db_ns / 1e9),
+    ):
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} counter")
+        for (method, route, status), histogram in histograms:
+            lines.append(f'{metric}{{method="{method}",route="{route}",status="{status}"}} {value(histogram)}')
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format"""
+    stats = pool_stats()
+    lines: List[str] = []
+    for field, metric, kind, description in _POOL_METRICS:
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, values in stats.items():
+            lines.append(f'{metric}{{pool="{name}"}} {values[field]}')
+    _render_request_histograms(lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,291 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db import models
+from .cache import RedisTier, TTLCache, get_redis
+from .config import settings
+
+# Bump when snapshot fields change so Redis entries written by older code are ignored
+SNAPSHOT_VERSION = 1
+
+
+class ProfileSnapshot(NamedTuple):
+    """Cached profile; attribute-compatible with models.Profile for serialize_profile"""
+    user_id: str
+    nickname: str
+    gender: str
+    birth_year: int
+    height: Optional[int]
+    region: Optional[str]
+    job: Optional[str]
+    intro: Optional[str]
+    photos: list
+    visible: dict
+    updated_at: Optional[float]  # POSIX timestamp of profiles.updated_at
+
+
+class PreferencesSnapshot(NamedTuple):
+    """Cached preferences; attribute-compatible with models.Preferences"""
+    user_id: str
+    target_gender: str
+    age_min: int
+    age_max: int
+    regions: list
+    keywords: list
+    blocks: list
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+
+def profile_snapshot(profile: Any) -> ProfileSnapshot:
+    """Snapshot of a Profile model or row"""
+    return ProfileSnapshot(
+        user_id=str(profile.user_id),
+        nickname=profile.nickname,
+        gender=profile.gender,
+        birth_year=profile.birth_year,
+        height=profile.height,
+        region=profile.region,
+        job=profile.job,
+        intro=profile.intro,
+        photos=list(profile.photos or []),
+        visible=dict(profile.visible or {}),
+        updated_at=_timestamp(profile.updated_at)
+    )
+
+
+def preferences_snapshot(preferences: Any) -> PreferencesSnapshot:
+    """Snapshot of a Preferences model or row"""
+    return PreferencesSnapshot(
+        user_id=str(preferences.user_id),
+        target_gender=preferences.target_gender,
+        age_min=preferences.age_min,
+        age_max=preferences.age_max,
+        regions=list(preferences.regions or []),
+        keywords=list(preferences.keywords or []),
+        blocks=[str(user_id) for user_id in preferences.blocks or []]
+    )
+
+
+def _load_profiles(db: Session, keys: List[str]) -> Dict[str, ProfileSnapshot]:
+    rows = (
+        db.query(*[getattr(models.Profile, field) for field in ProfileSnapshot._fields])
+        .filter(models.Profile.user_id.in_(keys))
+        .all()
+    )
+    return {str(row.user_id): profile_snapshot(row) for row in rows}
+
+
+def _load_preferences(db: Session, keys: List[str]) -> Dict[str, PreferencesSnapshot]:
+    rows = (
+        db.query(*[getattr(models.Preferences, field) for field in PreferencesSnapshot._fields])
+        .filter(models.Preferences.user_id.in_(keys))
+        .all()
+    )
+    return {str(row.user_id): preferences_snapshot(row) for row in rows}
+
+
+def _cache_keys(user_ids: Iterable[Any]) -> List[str]:
+    keys = []
+    for user_id in user_ids:
+        try:
+            keys.append(str(uuid.UUID(str(user_id))))
+        except ValueError:
+            continue
+    return list(dict.fromkeys(keys))
+
+
+class SnapshotCache:
+    """Read-through cache of per-user snapshots: in-process LRU in front of Redis
+
+    Reads fill Redis with SET NX so a slow reader never replaces a newer
+    write-through. Invalidation only reaches this process's local tier, so
+    other workers see edits within the local TTL.
+    """
+
+    def __init__(self, namespace: str, snapshot_type: type, loader: Callable[[Session, List[str]], Dict[str, Any]]):
+        self.snapshot_type = snapshot_type
+        self._loader = loader
+        self._local = TTLCache(
+            maxsize=settings.PROFILE_CACHE_MAX_ENTRIES,
+            ttl=settings.PROFILE_CACHE_LOCAL_TTL_SECONDS
+        )
+        self._redis = RedisTier(f"{namespace}:v{SNAPSHOT_VERSION}")
+
+    def _get_local(self, keys: List[str], local: bool) -> Tuple[Dict[str, Any], List[str]]:
+        found = {}
+        remote = []
+        for key in keys:
+            snapshot = self._local.get(key) if local else None
+            if snapshot is None:
+                remote.append(key)
+            else:
+                found[key] = snapshot
+        return found, remote
+
+    def _get_remote(self, keys: List[str]) -> Dict[str, Any]:
+        # One MGET for everything the local tier did not have
+        found = {}
+        for key, cached in zip(keys, self._redis.get_many(keys)):
+            if cached is not None:
+                snapshot = self.snapshot_type(*json.loads(cached))
+                self._local.set(key, snapshot)
+                found[key] = snapshot
+        return found
+
+    def _store(self, loaded: Dict[str, Any], overwrite: bool = False) -> None:
+        for key, snapshot in loaded.items():
+            self._local.set(key, snapshot)
+        self._redis.set_many(
+            {key: json.dumps(snapshot, ensure_ascii=False) for key, snapshot in loaded.items()},
+            settings.PROFILE_CACHE_TTL_SECONDS,
+            nx=not overwrite
+        )
+
+    def _fill(self, db: Session, keys: List[str], overwrite: bool = False) -> Dict[str, Any]:
+        loaded = self._loader(db, keys)
+        self._store(loaded, overwrite)
+        return loaded
+
+    def get_many(self, db: Session, user_ids: Iterable[Any], local: bool = True) -> Dict[str, Any]:
+        """Snapshots by user id string, loading misses from the database in one query"""
+        found, remote = self._get_local(_cache_keys(user_ids), local)
+        if remote:
+            found.update(self._get_remote(remote))
+        missing = [key for key in remote if key not in found]
+        if missing:
+            found.update(self._fill(db, missing))
+        return found
+
+    async def get_many_async(self, db: AsyncSession, user_ids: Iterable[Any], local: bool = True) -> Dict[str, Any]:
+        """Async variant of get_many
+
+        Redis calls are blocking, so they run in a worker thread rather than on
+        the event loop; local hits never leave it.
+        """
+        found, remote = self._get_local(_cache_keys(user_ids), local)
+        if remote and get_redis() is not None:
+            found.update(await asyncio.to_thread(self._get_remote, remote))
+        missing = [key for key in remote if key not in found]
+        if missing:
+            loaded = await db.run_sync(self._loader, missing)
+            await asyncio.to_thread(self._store, loaded)
+            found.update(loaded)
+        return found
+
+    def refresh(self, db: Session, user_ids: Iterable[Any]) -> Dict[str, Any]:
+        """Reload snapshots from the database, replacing cached entries"""
+        return self._fill(db, _cache_keys(user_ids), overwrite=True)
+
+    async def refresh_async(self, db: AsyncSession, user_ids: Iterable[Any]) -> Dict[str, Any]:
+        """Async variant of refresh"""
+        loaded = await db.run_sync(self._loader, _cache_keys(user_ids))
+        await asyncio.to_thread(self._store, loaded, True)
+        return loaded
+
+    def put(self, snapshot: Any) -> None:
+        """Write-through after the row was committed"""
+        self._local.set(snapshot.user_id, snapshot)
+        self._redis.set(
+            snapshot.user_id,
+            json.dumps(snapshot, ensure_ascii=False),
+            settings.PROFILE_CACHE_TTL_SECONDS
+        )
+
+    def delete(self, user_id: Any) -> None:
+        key = str(user_id)
+        self._local.delete(key)
+        self._redis.delete(key)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+
+profiles = SnapshotCache("profile", ProfileSnapshot, _load_profiles)
+preferences = SnapshotCache("preferences", PreferencesSnapshot, _load_preferences)
+# profiles.updated_at timestamp of each user's last write-through; a local
+# snapshot older than it was edited on another worker
+profile_versions = RedisTier(f"profile-version:v{SNAPSHOT_VERSION}")
+
+
+def get_profiles(db: Session, user_ids: Iterable[Any]) -> Dict[str, ProfileSnapshot]:
+    """Profiles by user id string for many users in one cache round trip"""
+    return profiles.get_many(db, user_ids)
+
+
+def get_profile_versions(user_ids: Iterable[Any]) -> Dict[str, float]:
+    """Last written-through profile version by user id string, in one MGET
+
+    Users without a recorded write (or with Redis down) are left out.
+    """
+    keys = _cache_keys(user_ids)
+    return {
+        key: float(version)
+        for key, version in zip(keys, profile_versions.get_many(keys))
+        if version is not None
+    }
+
+
+async def get_profile_versions_async(user_ids: Iterable[Any]) -> Dict[str, float]:
+    """Async get_profile_versions; the MGET runs in a worker thread"""
+    if get_redis() is None:
+        return {}
+    return await asyncio.to_thread(get_profile_versions, user_ids)
+
+
+async def get_profiles_async(
+    db: AsyncSession,
+    user_ids: Iterable[Any],
+    fresh_as_of: Optional[Dict[str, float]] = None
+) -> Dict[str, ProfileSnapshot]:
+    """Async get_profiles; reloads every snapshot older than its fresh_as_of entry
+
+    fresh_as_of maps user id strings to profile versions read for the list
+    (e.g. for an ETag, from get_profile_versions), so the body never lags
+    behind its tag.
+    """
+    found = await profiles.get_many_async(db, user_ids)
+    if fresh_as_of:
+        stale = [
+            key for key, snapshot in found.items()
+            if key in fresh_as_of and (snapshot.updated_at or 0) < fresh_as_of[key]
+        ]
+        if stale:
+            found.update(await profiles.refresh_async(db, stale))
+    return found
+
+
+def get_profile(db: Session, user_id: Any) -> Optional[ProfileSnapshot]:
+    """Single-user get_profiles"""
+    return profiles.get_many(db, [user_id]).get(str(user_id))
+
+
+async def get_own_profile_async(db: AsyncSession, user_id: Any) -> Optional[ProfileSnapshot]:
+    """A user's own profile, read past the local tier so their edits show on every worker"""
+    return (await profiles.get_many_async(db, [user_id], local=False)).get(str(user_id))
+
+
+async def get_own_preferences_async(db: AsyncSession, user_id: Any) -> Optional[PreferencesSnapshot]:
+    """A user's own preferences, read past the local tier like get_own_profile_async"""
+    return (await preferences.get_many_async(db, [user_id], local=False)).get(str(user_id))
+
+
+def cache_profile(profile: models.Profile) -> None:
+    """Write a committed profile through to both tiers and bump its version"""
+    snapshot = profile_snapshot(profile)
+    profiles.put(snapshot)
+    if snapshot.updated_at is not None:
+        profile_versions.set(snapshot.user_id, repr(snapshot.updated_at), settings.PROFILE_CACHE_TTL_SECONDS)
+
+
+def cache_preferences(preferences_row: models.Preferences) -> None:
+    """Write committed preferences through to both tiers"""
+    preferences.put(preferences_snapshot(preferences_row))
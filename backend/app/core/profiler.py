@@ -0,0 +1,184 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set
+
+# Leaf frames of threads that are only waiting (lock, selector, work queue)
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+_labels: Dict[Any, str] = {}
+_path_prefixes = sorted({path for path in sys.path if path}, key=len, reverse=True)
+
+
+def _label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        for prefix in _path_prefixes:
+            if filename.startswith(prefix):
+                filename = filename[len(prefix):].lstrip(os.sep)
+                break
+        label = _labels[code] = f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+    return label
+
+
+class ProfileCapture:
+    """Thread-based statistical profiler aggregating collapsed stacks
+
+    A background thread samples the Python stacks of other threads every
+    interval. With path set, it samples only while a request under that path
+    is in flight and stops after that many requests; samples then cover every
+    busy thread at that moment, not just the matching request. With
+    thread_ids set, only those threads are sampled.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        interval: float = 0.005,
+        path: Optional[str] = None,
+        requests: Optional[int] = None,
+        thread_ids: Optional[Set[int]] = None,
+        include_idle: bool = False
+    ):
+        self.seconds = seconds
+        self.interval = interval
+        self.path = path
+        self.thread_ids = thread_ids
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.requests_seen = 0
+        self._requests_left = requests
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def start(self) -> "ProfileCapture":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._done.set()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def matches(self, path: str) -> bool:
+        return self.path is not None and path.startswith(self.path) and not self.finished
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.requests_seen += 1
+            if self._requests_left is not None:
+                self._requests_left -= 1
+                if self._requests_left <= 0:
+                    self._done.set()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        deadline = time.monotonic() + self.seconds
+        while not self._done.is_set() and time.monotonic() < deadline:
+            if self.path is None or self._in_flight:
+                self._sample(own, names)
+            self._done.wait(self.interval)
+        self._done.set()
+
+    def _sample(self, own: int, names: Dict[int, str]) -> None:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                continue
+            code = frame.f_code
+            if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(_label(frame.f_code))
+                frame = frame.f_back
+            if thread_id not in names:
+                names.update((thread.ident, thread.name) for thread in threading.enumerate())
+            name = names.get(thread_id, str(thread_id))
+            stack.append(f"thread:{name}")
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Profile in the collapsed-stack format (flamegraph.pl, speedscope, etc.)"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def speedscope(self, name: str = "profile") -> Dict[str, Any]:
+        """Profile in the speedscope sampled-profile JSON format, weighted in milliseconds"""
+        frames: Dict[str, int] = {}
+        samples = []
+        weights = []
+        for stack, count in self.stacks.most_common():
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack.split(";")])
+            weights.append(count * self.interval * 1000)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": frame} for frame in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "shh-match",
+        }
+
+
+# The one capture this worker may run at a time
+_active: Optional[ProfileCapture] = None
+_active_lock = threading.Lock()
+
+
+def start_capture(**kwargs) -> Optional[ProfileCapture]:
+    """Start a capture on this worker, or None if one is already running"""
+    global _active
+    with _active_lock:
+        if _active is not None and not _active.finished:
+            return None
+        _active = ProfileCapture(**kwargs).start()
+        return _active
+
+
+def active_capture() -> Optional[ProfileCapture]:
+    """Running capture of this worker, if any"""
+    capture = _active
+    return capture if capture is not None and not capture.finished else None
+
+
+@contextmanager
+def profile_current_thread(interval: float = 0.005, seconds: float = 24 * 3600) -> Iterator[ProfileCapture]:
+    """Sample only the calling thread for the duration of the block (e.g. a batch job)"""
+    capture = ProfileCapture(
+        seconds=seconds, interval=interval, thread_ids={threading.get_ident()}
+    ).start()
+    try:
+        yield capture
+    finally:
+        capture.stop()
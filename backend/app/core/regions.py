@@ -0,0 +1,112 @@
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Region table: (code name, latitude, longitude) of each province-level region.
+# The list index is the region code stored in profiles.region_code, so new
+# regions must only ever be appended.
+REGIONS: List[Tuple[str, float, float]] = [
+    ("서울", 37.5665, 126.9780),
+    ("부산", 35.1796, 129.0756),
+    ("대구", 35.8714, 128.6014),
+    ("인천", 37.4563, 126.7052),
+    ("광주", 35.1595, 126.8526),
+    ("대전", 36.3504, 127.3845),
+    ("울산", 35.5384, 129.3114),
+    ("세종", 36.4800, 127.2890),
+    ("경기", 37.2752, 127.0095),
+    ("강원", 37.8813, 127.7298),
+    ("충북", 36.6424, 127.4890),
+    ("충남", 36.6588, 126.6728),
+    ("전북", 35.8242, 127.1480),
+    ("전남", 34.8161, 126.4629),
+    ("경북", 36.5760, 128.5056),
+    ("경남", 35.2383, 128.6925),
+    ("제주", 33.4996, 126.5312),
+]
+
+# Alternative spellings users type for each region
+REGION_ALIASES: Dict[str, List[str]] = {
+    "서울": ["서울시", "서울특별시"],
+    "부산": ["부산시", "부산광역시"],
+    "대구": ["대구시", "대구광역시"],
+    "인천": ["인천시", "인천광역시"],
+    "광주": ["광주시", "광주광역시"],
+    "대전": ["대전시", "대전광역시"],
+    "울산": ["울산시", "울산광역시"],
+    "세종": ["세종시", "세종특별자치시"],
+    "경기": ["경기도"],
+    "강원": ["강원도", "강원특별자치도"],
+    "충북": ["충청북도"],
+    "충남": ["충청남도"],
+    "전북": ["전라북도", "전북특별자치도"],
+    "전남": ["전라남도"],
+    "경북": ["경상북도"],
+    "경남": ["경상남도"],
+    "제주": ["제주도", "제주특별자치도"],
+}
+
+# Distance (km) at which region affinity decays to zero
+REGION_AFFINITY_RADIUS_KM = 150.0
+
+_CODES: Dict[str, int] = {}
+for _code, (_name, _, _) in enumerate(REGIONS):
+    _CODES[_name] = _code
+    for _alias in REGION_ALIASES.get(_name, []):
+        _CODES[_alias] = _code
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def _build_matrices() -> Tuple[Tuple[Tuple[float, ...], ...], Tuple[Tuple[float, ...], ...]]:
+    """Precompute the region distance and affinity matrices"""
+    distances = []
+    affinities = []
+    for _, lat1, lon1 in REGIONS:
+        distance_row = []
+        affinity_row = []
+        for _, lat2, lon2 in REGIONS:
+            distance = _haversine_km(lat1, lon1, lat2, lon2)
+            distance_row.append(distance)
+            affinity_row.append(max(0.0, 1.0 - distance / REGION_AFFINITY_RADIUS_KM))
+        distances.append(tuple(distance_row))
+        affinities.append(tuple(affinity_row))
+    return tuple(distances), tuple(affinities)
+
+
+# Built once at import time; scoring only does index lookups on these
+REGION_DISTANCE_KM, REGION_AFFINITY = _build_matrices()
+
+
+def region_code(region: Optional[str]) -> Optional[int]:
+    """Map a free-text region (e.g. "서울 강남구") to its region code"""
+    if not region:
+        return None
+    parts = region.split()
+    if not parts:
+        return None
+    return _CODES.get(parts[0])
+
+
+def region_affinity(code_a: Optional[int], code_b: Optional[int]) -> float:
+    """Affinity between two region codes in [0, 1] (1.0 for the same region)"""
+    if code_a is None or code_b is None:
+        return 0.0
+    return REGION_AFFINITY[code_a][code_b]
+
+
+def codes_within(regions: Iterable[str], radius_km: float) -> Set[int]:
+    """Region codes within radius_km of any of the given regions"""
+    codes = {code for code in map(region_code, regions) if code is not None}
+    nearby = set(codes)
+    for code in codes:
+        row = REGION_DISTANCE_KM[code]
+        nearby.update(other for other, distance in enumerate(row) if distance <= radius_km)
+    return nearby
@@ -0,0 +1,66 @@
+import hashlib
+import uuid
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    # Pydantic serializes Decimal as a string (e.g. Recommendation.score "5.500")
+    if isinstance(value, Decimal):
+        return str(value)
+    # orjson only handles uuid.UUID itself, not subclasses such as asyncpg's
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content the way FastJSONResponse renders it"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-encoded response for content the route already shaped to its response model
+
+    Returning it bypasses FastAPI's response_model validation, so only use it
+    with trusted internal data. UUIDs, datetimes (UTC as "Z") and Decimals
+    encode the same way as through the Pydantic response models.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Clients may reuse a cached body but must revalidate it with If-None-Match
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts: Any) -> str:
+    """Weak ETag for content identified by cheap version markers"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """Headers advertising an ETag for conditional GETs"""
+    return {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the request's If-None-Match covers etag, else None
+
+    Uses the weak comparison from RFC 9110, ignoring W/ prefixes.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    opaque = etag.removeprefix("W/")
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == opaque:
+            return Response(status_code=304, headers=etag_headers(etag))
+    return None
@@ -1,15 +1,28 @@
+import os
+from contextlib import contextmanager
+
 import structlog
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime
+from apscheduler.triggers.date import DateTrigger
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
 from zoneinfo import ZoneInfo
 
-from app.services.recommendation_service import build_weekly_recommendations
+from app.core.config import settings
+from app.core.profiler import profile_current_thread
+from app.core.tracing import start_trace
+from app.db.instrumentation import track_queries
+from app.db.session import BatchSessionLocal
+from app.services.recommendation_service import build_weekly_recommendations, refresh_population_snapshot
 
 logger = structlog.get_logger()
 
 scheduler: AsyncIOScheduler = None
 
+# Outcome of the latest run of each job on this worker, for /readyz
+job_runs: Dict[str, Dict[str, Any]] = {}
+
 
 def init_scheduler():
     """Initialize the scheduler"""
@@ -51,23 +64,137 @@ def shutdown_scheduler():
         logger.info("Scheduler shutdown")
 
 
+def _record_run(job_id: str, started: datetime, error: Optional[str] = None, **details) -> None:
+    finished = datetime.now(timezone.utc)
+    job_runs[job_id] = {
+        "status": "failed" if error else "succeeded",
+        "started_at": started,
+        "finished_at": finished,
+        "duration_seconds": round((finished - started).total_seconds(), 3),
+        "error": error,
+        **details
+    }
+
+
+def scheduler_state() -> Dict[str, Any]:
+    """Whether the scheduler runs, its pending jobs and the latest run of each job"""
+    jobs = []
+    if scheduler and scheduler.running:
+        jobs = [
+            {"id": job.id, "name": job.name, "next_run_time": job.next_run_time}
+            for job in scheduler.get_jobs()
+        ]
+    return {
+        "running": bool(scheduler and scheduler.running),
+        "jobs": jobs,
+        "last_runs": dict(job_runs)
+    }
+
+
+@contextmanager
+def _job_profile(name: str):
+    """Sample the job's thread and write a collapsed-stack profile to RECS_PROFILE_DIR, if set"""
+    if not settings.RECS_PROFILE_DIR:
+        yield
+        return
+
+    with profile_current_thread() as capture:
+        yield
+    os.makedirs(settings.RECS_PROFILE_DIR, exist_ok=True)
+    path = os.path.join(settings.RECS_PROFILE_DIR, f"{name}-{datetime.now():%Y%m%dT%H%M%S}.collapsed")
+    with open(path, "w") as f:
+        f.write(capture.collapsed())
+    logger.info("Job profile written", path=path, samples=capture.samples)
+
+
 def run_weekly_recommendations():
     """Job function to run weekly recommendations"""
+    started = datetime.now(timezone.utc)
     try:
         # Generate current week label
         now = datetime.now(tz=ZoneInfo("Asia/Seoul"))
         year, week, _ = now.isocalendar()
         week_label = f"{year}-W{week:02d}"
 
+        buckets = settings.RECS_STAGGER_BUCKETS
+        if buckets > 1 and scheduler:
+            # One population snapshot shared by every bucket run
+            db = BatchSessionLocal()
+            try:
+                refresh_population_snapshot(db)
+            except Exception as e:
+                logger.warning(f"Failed to build population snapshot: {str(e)}")
+            finally:
+                db.close()
+
+            # Spread the build over the stagger window, one user-id hash bucket per run
+            interval = timedelta(minutes=settings.RECS_STAGGER_WINDOW_MINUTES) / buckets
+            for bucket in range(buckets):
+                scheduler.add_job(
+                    run_weekly_recommendation_bucket,
+                    trigger=DateTrigger(run_date=now + interval * bucket, timezone=ZoneInfo("Asia/Seoul")),
+                    args=[week_label, bucket, buckets],
+                    id=f'weekly-recommendations-{week_label}-{bucket}',
+                    name=f'Weekly Recommendations Generation (bucket {bucket + 1}/{buckets})',
+                    replace_existing=True
+                )
+
+            logger.info(
+                f"Scheduled staggered weekly recommendation generation",
+                week=week_label,
+                buckets=buckets,
+                window_minutes=settings.RECS_STAGGER_WINDOW_MINUTES
+            )
+            _record_run("weekly-recommendations", started, week=week_label, buckets_scheduled=buckets)
+            return
+
         logger.info(f"Starting weekly recommendation generation", week=week_label)
 
-        result = build_weekly_recommendations(week_label)
+        with (
+            start_trace("job weekly-recommendations", sampled=True, week=week_label),
+            track_queries("job:weekly-recommendations") as queries,
+            _job_profile(f"recs-{week_label}")
+        ):
+            result = build_weekly_recommendations(week_label)
 
         logger.info(
             f"Weekly recommendation generation completed",
             week=week_label,
-            result=result
+            result=result,
+            queries=queries.count,
+            db_time=queries.duration
+        )
+        _record_run("weekly-recommendations", started, week=week_label, queries=queries.count)
+
+    except Exception as e:
+        logger.error(f"Failed to run weekly recommendations: {str(e)}", exc_info=True)
+        _record_run("weekly-recommendations", started, error=str(e))
+
+
+def run_weekly_recommendation_bucket(week_label: str, bucket: int, buckets: int):
+    """Job function to run weekly recommendations for one delivery bucket"""
+    started = datetime.now(timezone.utc)
+    job_id = f"weekly-recommendations-bucket-{bucket}"
+    try:
+        logger.info(f"Starting weekly recommendation bucket", week=week_label, bucket=bucket, buckets=buckets)
+
+        with (
+            start_trace("job weekly-recommendations", sampled=True, week=week_label, bucket=bucket),
+            track_queries(f"job:weekly-recommendations-bucket-{bucket}") as queries,
+            _job_profile(f"recs-{week_label}-bucket{bucket}")
+        ):
+            result = build_weekly_recommendations(week_label, bucket=bucket, buckets=buckets)
+
+        logger.info(
+            f"Weekly recommendation bucket completed",
+            week=week_label,
+            bucket=bucket,
+            result=result,
+            queries=queries.count,
+            db_time=queries.duration
         )
+        _record_run(job_id, started, week=week_label, queries=queries.count)
 
     except Exception as e:
-        logger.error(f"Failed to run weekly recommendations: {str(e)}", exc_info=True)
\ No newline at end of file
+        logger.error(f"Failed to run weekly recommendation bucket {bucket}: {str(e)}", exc_info=True)
+        _record_run(job_id, started, error=str(e))
@@ -1,10 +1,17 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Any, Dict
+import hashlib
+import time
 import jwt
 import bcrypt
 from pydantic import BaseModel
+from .cache import TTLCache
 from .config import settings
 
+# Already-verified tokens keyed by their SHA-256 digest. Entries never outlive
+# the token's exp claim.
+_verified_tokens = TTLCache(maxsize=settings.JWT_CACHE_MAX_ENTRIES, ttl=settings.JWT_CACHE_TTL_SECONDS)
+
 
 class JwtPayload(BaseModel):
     sub: str
@@ -30,7 +37,14 @@ def create_jwt(user_id: str, role: str = "user") -> str:
 
 
 def decode_jwt(token: str) -> Optional[Dict[str, Any]]:
-    """Decode and verify a JWT token"""
+    """Decode and verify a JWT token, skipping verification for recently verified tokens"""
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+
+    payload = _verified_tokens.get(key)
+    if payload is not None and payload["exp"] > now:
+        return dict(payload)
+
     try:
         payload = jwt.decode(
             token,
@@ -39,10 +53,19 @@ def decode_jwt(token: str) -> Optional[Dict[str, Any]]:
             issuer=settings.JWT_ISSUER,
             audience=settings.JWT_AUDIENCE,
         )
-        return payload
     except jwt.PyJWTError:
         return None
 
+    ttl = min(settings.JWT_CACHE_TTL_SECONDS, payload.get("exp", now) - now)
+    if ttl > 0:
+        _verified_tokens.set(key, dict(payload), ttl=ttl)
+    return payload
+
+
+def token_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters of the verified-token cache"""
+    return _verified_tokens.stats()
+
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
@@ -0,0 +1,139 @@
+import random
+import time
+
+import structlog
+
+from app.db.instrumentation import QueryBudgetExceeded, track_queries
+from .config import settings
+from .metrics import record_request
+from .profiler import active_capture
+from .tracing import SPAN_KIND_SERVER, STATUS_ERROR, start_trace
+
+logger = structlog.get_logger()
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route (e.g. /api/v1/matches/{match_id})
+
+    Route templates keep label cardinality bounded; unrouted paths share one
+    label. Some FastAPI versions report an included route without its router
+    prefix, which is then recovered from the request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+
+    path = scope["path"]
+    if route.path_regex.match(path):
+        return template
+    index = path.find("/", 1)
+    while index != -1:
+        if route.path_regex.match(path[index:]):
+            return path[:index] + template
+        index = path.find("/", index + 1)
+    return template
+
+
+def _header(scope, name: bytes):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware recording request latency per route template and status
+
+    Slow and failed requests are always logged; other requests only at
+    REQUEST_LOG_SAMPLE_RATE. Latency is measured with perf_counter_ns and
+    covers sending the response body. SQL statements and database time are
+    counted alongside, and checked against the endpoint's query_budget.
+    With tracing enabled, each sampled request is the root span of its trace.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.slow_ns = settings.REQUEST_LOG_SLOW_MS * 1_000_000
+        self.sample_rate = settings.REQUEST_LOG_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # Unless the app starts a response before failing
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        # Requests matching a running path-scoped profiler capture switch its sampling on
+        capture = active_capture()
+        if capture is not None and capture.matches(scope["path"]):
+            capture.request_started()
+        else:
+            capture = None
+
+        traceparent = _header(scope, b"traceparent") if settings.TRACING_ENABLED else None
+
+        started = time.perf_counter_ns()
+        with (
+            start_trace(scope["method"], SPAN_KIND_SERVER, traceparent) as trace_span,
+            track_queries(lambda: f"{scope['method']} {route_template(scope)}") as queries
+        ):
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                duration_ns = time.perf_counter_ns() - started
+                if capture is not None:
+                    capture.request_finished()
+                route = route_template(scope)
+                record_request(scope["method"], route, status, duration_ns, queries.count, queries.duration_ns)
+                if trace_span is not None:
+                    trace_span.name = f"{scope['method']} {route}"
+                    trace_span.attributes.update({
+                        "http.request.method": scope["method"],
+                        "http.route": route,
+                        "url.path": scope["path"],
+                        "http.response.status_code": status,
+                        "db.queries": queries.count,
+                    })
+                    if status >= 500:
+                        trace_span.status = STATUS_ERROR
+
+                if duration_ns >= self.slow_ns or status >= 500:
+                    logger.warning(
+                        "Slow or failed request",
+                        method=scope["method"],
+                        path=scope["path"],
+                        route=route,
+                        status_code=status,
+                        process_time=duration_ns / 1e9,
+                        queries=queries.count,
+                        db_time=queries.duration,
+                        trace_id=trace_span.trace_id if trace_span is not None else None
+                    )
+                elif self.sample_rate and random.random() < self.sample_rate:
+                    logger.info(
+                        "Request completed",
+                        method=scope["method"],
+                        path=scope["path"],
+                        route=route,
+                        status_code=status,
+                        process_time=duration_ns / 1e9,
+                        queries=queries.count,
+                        db_time=queries.duration
+                    )
+
+        self._check_budget(scope, route, queries.count)
+
+    def _check_budget(self, scope, route: str, count: int) -> None:
+        budget = getattr(getattr(scope.get("route"), "endpoint", None), "query_budget", None)
+        if budget is None or count <= budget:
+            return
+        if settings.APP_ENV == "test":
+            raise QueryBudgetExceeded(f"{scope['method']} {route} ran {count} queries, budget {budget}")
+        logger.warning("Query budget exceeded", method=scope["method"], route=route, queries=count, budget=budget)
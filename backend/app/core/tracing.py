@@ -0,0 +1,400 @@
+import atexit
+import functools
+import inspect
+import os
+import random
+import re
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextvars import ContextVar
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.db.instrumentation import fingerprint
+from .config import settings
+
+logger = structlog.get_logger()
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Trace:
+    """Spans recorded so far for one trace, capped at TRACING_MAX_SPANS_PER_TRACE"""
+
+    __slots__ = ("trace_id", "spans", "dropped", "root")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans = 0
+        self.dropped = 0
+        self.root: Optional["Span"] = None
+
+
+class Span:
+    """One timed operation, exported in the OTLP/JSON span format when it ends"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "attributes",
+                 "start_ns", "end_ns", "_started", "status", "status_message", "events")
+
+    def __init__(self, trace: Trace, name: str, kind: int, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.status_message = None
+        self.events: List[Dict[str, Any]] = []
+        self.end_ns = None
+        # Wall clock for the timestamps, monotonic clock for the duration
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        trace.spans += 1
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = str(error)[:500]
+        self.events.append({
+            "name": "exception",
+            "timeUnixNano": str(time.time_ns()),
+            "attributes": _attributes({
+                "exception.type": type(error).__qualname__,
+                "exception.message": self.status_message,
+            }),
+        })
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            if self.trace.dropped and self is self.trace.root:
+                self.attributes["tracing.dropped_spans"] = self.trace.dropped
+            self.end_ns = self.start_ns + time.perf_counter_ns() - self._started
+            exporter.export(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _attributes(self.attributes),
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.events:
+            span["events"] = self.events
+        return span
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"key": key, "value": _attribute_value(value)}
+        for key, value in attributes.items() if value is not None
+    ]
+
+
+# Span of the enclosing operation; None outside traces and in unsampled ones
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+class _SpanScope:
+    """Makes a span current for the with block and ends it on exit"""
+
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span: Span):
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+        if exc is not None:
+            self.span.record_exception(exc)
+        self.span.end()
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NOOP = _NoopScope()
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_trace(
+    name: str,
+    kind: int = SPAN_KIND_INTERNAL,
+    traceparent: Optional[str] = None,
+    sampled: Optional[bool] = None,
+    **attributes: Any
+):
+    """Root span of a request or job, as a context manager yielding the span (or None)
+
+    A valid W3C traceparent continues the caller's trace and sampling decision;
+    otherwise TRACING_SAMPLE_RATE decides unless sampled is given.
+    """
+    if not settings.TRACING_ENABLED:
+        return _NOOP
+
+    parent_id = None
+    match = _TRACEPARENT.match(traceparent.strip().lower()) if traceparent else None
+    if match:
+        trace_id, parent_id, flags = match.groups()
+        if sampled is None:
+            sampled = bool(int(flags, 16) & 1)
+    else:
+        trace_id = "%032x" % random.getrandbits(128)
+    if sampled is None:
+        sampled = random.random() < settings.TRACING_SAMPLE_RATE
+    if not sampled:
+        return _NOOP
+    trace = Trace(trace_id)
+    trace.root = Span(trace, name, kind, parent_id, attributes)
+    return _SpanScope(trace.root)
+
+
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any):
+    """Child span of the current span, as a context manager yielding the span (or None)
+
+    Outside a sampled trace this is a shared no-op, so stages can be wrapped
+    unconditionally.
+    """
+    parent = _current.get()
+    if parent is None:
+        return _NOOP
+    return _SpanScope(Span(parent.trace, name, kind, parent.span_id, attributes))
+
+
+def _capped_child(name: str, kind: int, attributes: Dict[str, Any]) -> Optional[Span]:
+    """Child span for high-volume operations (CRUD calls, statements), or None past the cap"""
+    parent = _current.get()
+    if parent is None:
+        return None
+    if parent.trace.spans >= settings.TRACING_MAX_SPANS_PER_TRACE:
+        parent.trace.dropped += 1
+        return None
+    return Span(parent.trace, name, kind, parent.span_id, attributes)
+
+
+def traced(name: str) -> Callable:
+    """Decorator recording each call of a function as a child span"""
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            child = _capped_child(name, SPAN_KIND_INTERNAL, {
+                "code.namespace": function.__module__,
+                "code.function": function.__qualname__,
+            })
+            if child is None:
+                return function(*args, **kwargs)
+            with _SpanScope(child):
+                return function(*args, **kwargs)
+        wrapper.__traced__ = True
+        return wrapper
+    return decorator
+
+
+def instrument_module(module: ModuleType, prefix: str) -> int:
+    """Trace every function of a CRUD module that takes a db session; returns how many"""
+    count = 0
+    for attribute, function in list(vars(module).items()):
+        if (
+            not inspect.isfunction(function)
+            or function.__module__ != module.__name__
+            or getattr(function, "__traced__", False)
+        ):
+            continue
+        parameters = list(inspect.signature(function).parameters)
+        if not parameters or parameters[0] != "db":
+            continue
+        setattr(module, attribute, traced(f"{prefix}.{attribute}")(function))
+        count += 1
+    return count
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    words = statement.split(None, 1)
+    child = _capped_child(words[0].upper() if words else "query", SPAN_KIND_CLIENT, {
+        "db.system": conn.dialect.name,
+    })
+    conn.info.setdefault("trace_spans", []).append(child)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    child = conn.info["trace_spans"].pop()
+    if child is not None:
+        key, normalized = fingerprint(statement)
+        child.attributes["db.statement"] = normalized[:2000]
+        child.attributes["db.fingerprint"] = key
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            child.attributes["db.rows"] = cursor.rowcount
+        child.end()
+
+
+def _handle_error(exception_context):
+    spans = exception_context.connection.info.get("trace_spans") if exception_context.connection else None
+    if spans:
+        child = spans.pop()
+        if child is not None:
+            child.attributes["db.statement"] = fingerprint(exception_context.statement or "")[1][:2000]
+            child.record_exception(exception_context.original_exception)
+            child.end()
+
+
+class SpanExporter:
+    """Batches ended spans in a background thread and writes them as OTLP/JSON
+
+    Each batch is one ExportTraceServiceRequest: appended as a line to
+    TRACING_EXPORT_PATH (readable by the collector's otlpjsonfile receiver)
+    and/or posted to the OTLP/HTTP endpoint. Spans beyond the queue size are
+    dropped rather than slowing requests down.
+    """
+
+    def __init__(self, max_queue: int = 10000, batch_size: int = 512, interval: float = 2.0):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: deque = deque(maxlen=max_queue)
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def export(self, span: Span) -> None:
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(span)
+        if self._pid != os.getpid():
+            self._start()
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self) -> None:
+        # Started per process on first use, so forked workers get their own thread
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="span-exporter", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            self._write(orjson.dumps(self._payload(batch)))
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": _attributes({
+                "service.name": settings.TRACING_SERVICE_NAME,
+                "deployment.environment": settings.APP_ENV,
+                "process.pid": os.getpid(),
+            })},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }]}
+
+    def _write(self, payload: bytes) -> None:
+        try:
+            if settings.TRACING_EXPORT_PATH:
+                # One append per batch keeps lines from several workers intact
+                with open(settings.TRACING_EXPORT_PATH, "ab") as f:
+                    f.write(payload + b"\n")
+            if settings.TRACING_OTLP_ENDPOINT:
+                request = urllib.request.Request(
+                    settings.TRACING_OTLP_ENDPOINT.rstrip("/") + "/v1/traces",
+                    data=payload,
+                    headers={"Content-Type": "application/json"},
+                    method="POST"
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+        except Exception as e:
+            logger.warning("Span export failed", error=str(e))
+
+
+exporter = SpanExporter()
+
+_installed = False
+
+
+def install_tracing() -> None:
+    """Trace CRUD functions and SQL statements if TRACING_ENABLED
+
+    Nothing is wrapped or listened to while tracing is disabled, so its cost
+    is then limited to a context variable lookup per request and stage.
+    """
+    global _installed
+    if _installed or not settings.TRACING_ENABLED:
+        return
+
+    from app.db.crud import like, match, payment, recommendation, user
+    for module in (like, match, payment, recommendation, user):
+        instrument_module(module, f"crud.{module.__name__.rsplit('.', 1)[-1]}")
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    atexit.register(exporter.flush)
+    _installed = True
+    logger.info(
+        "Tracing enabled",
+        sample_rate=settings.TRACING_SAMPLE_RATE,
+        path=settings.TRACING_EXPORT_PATH or None,
+        endpoint=settings.TRACING_OTLP_ENDPOINT or None
+    )
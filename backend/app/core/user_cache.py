@@ -0,0 +1,97 @@
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db import models
+from .cache import RedisTier, TTLCache, get_redis
+from .config import settings
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """Authenticated user as resolved from the token (id, role and ban status only)"""
+    id: uuid.UUID
+    role: str
+    banned: bool
+
+
+# In-process tier in front of Redis. Invalidation only reaches this process's
+# local tier, so other workers see ban/role changes within the local TTL.
+_local = TTLCache(maxsize=settings.USER_CACHE_MAX_ENTRIES, ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS)
+_redis = RedisTier("auth-user")
+
+
+def _cache_key(user_id: str) -> Optional[str]:
+    try:
+        return str(uuid.UUID(str(user_id)))
+    except ValueError:
+        return None
+
+
+def _get_remote(key: str) -> Optional[AuthUser]:
+    cached = _redis.get(key)
+    if cached is None:
+        return None
+    data = json.loads(cached)
+    user = AuthUser(id=uuid.UUID(key), role=data["role"], banned=data["banned"])
+    _local.set(key, user)
+    return user
+
+
+def _load(db: Session, key: str) -> Optional[AuthUser]:
+    row = (
+        db.query(models.User.id, models.User.role, models.User.banned)
+        .filter(models.User.id == key)
+        .first()
+    )
+    if row is None:
+        return None
+    return AuthUser(id=row.id, role=row.role or "user", banned=bool(row.banned))
+
+
+def _store(key: str, user: AuthUser) -> None:
+    _local.set(key, user)
+    _redis.set(key, json.dumps({"role": user.role, "banned": user.banned}), settings.USER_CACHE_TTL_SECONDS)
+
+
+def get_auth_user(db: Session, user_id: str) -> Optional[AuthUser]:
+    """Resolve a user id to its role and ban status, hitting the database only on a cache miss"""
+    key = _cache_key(user_id)
+    if key is None:
+        return None
+    user = _local.get(key) or _get_remote(key)
+    if user is None:
+        user = _load(db, key)
+        if user is not None:
+            _store(key, user)
+    return user
+
+
+async def get_auth_user_async(db: AsyncSession, user_id: str) -> Optional[AuthUser]:
+    """Async variant of get_auth_user; Redis calls run in a worker thread, off the event loop"""
+    key = _cache_key(user_id)
+    if key is None:
+        return None
+    user = _local.get(key)
+    if user is None and get_redis() is not None:
+        user = await asyncio.to_thread(_get_remote, key)
+    if user is None:
+        user = await db.run_sync(_load, key)
+        if user is not None:
+            await asyncio.to_thread(_store, key, user)
+    return user
+
+
+def invalidate_user(user_id: str) -> None:
+    """Drop a user from both cache tiers after a ban or role change"""
+    key = _cache_key(user_id)
+    if key is None:
+        return
+    _local.delete(key)
+    _redis.delete(key)
+
@@ -1,9 +1,11 @@
 from typing import List, Optional
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, text
 import uuid
 
 from app.db import models
+from app.db.crud.match import canonical_pair
 
 
 def create_like(
@@ -24,6 +26,143 @@ def create_like(
     return like
 
 
+# Inserts the like and, if the reverse like exists, the match. Every branch
+# reads the same snapshot, so concurrent likes on a pair are serialized with
+# an advisory lock taken first (see create_like_and_match).
+_LIKE_AND_MATCH = text("""
+WITH target AS (
+    SELECT id, banned FROM users WHERE id = CAST(:to_user AS uuid)
+),
+new_like AS (
+    INSERT INTO likes (from_user, to_user, batch_week)
+    SELECT CAST(:from_user AS uuid), id, :batch_week FROM target WHERE NOT COALESCE(banned, false)
+    ON CONFLICT (from_user, to_user, batch_week) DO NOTHING
+    RETURNING id
+),
+new_match AS (
+    INSERT INTO matches (id, user_a, user_b, status)
+    SELECT CAST(:match_id AS uuid), CAST(:user_a AS uuid), CAST(:user_b AS uuid), 'pending'
+    WHERE EXISTS (SELECT 1 FROM new_like)
+      AND EXISTS (
+          SELECT 1 FROM likes
+          WHERE from_user = CAST(:to_user AS uuid)
+            AND to_user = CAST(:from_user AS uuid)
+            AND batch_week = :batch_week
+      )
+    ON CONFLICT (user_a, user_b) DO NOTHING
+    RETURNING id
+)
+SELECT
+    EXISTS (SELECT 1 FROM target) AS target_exists,
+    COALESCE((SELECT banned FROM target), false) AS target_banned,
+    (SELECT id FROM new_like) AS like_id,
+    (SELECT id FROM new_match) AS match_id
+""")
+
+
+def create_like_and_match(
+    db: Session,
+    from_user_id: str,
+    to_user_id: str,
+    batch_week: str
+) -> Row:
+    """Create a like and, when it is mutual, a pending match in one transaction
+
+    Returns a row with target_exists, target_banned, like_id (None if the like
+    already existed) and match_id (None unless this like created the match).
+    """
+    user_a_id, user_b_id = canonical_pair(from_user_id, to_user_id)
+
+    # Without the lock, two simultaneous reciprocal likes would each miss
+    # the other's uncommitted like and no match would be created
+    db.execute(
+        text("SELECT pg_advisory_xact_lock(hashtextextended(:pair, 0))"),
+        {"pair": f"like:{user_a_id}:{user_b_id}"}
+    )
+    result = db.execute(_LIKE_AND_MATCH, {
+        "from_user": str(from_user_id),
+        "to_user": str(to_user_id),
+        "batch_week": batch_week,
+        "match_id": str(uuid.uuid4()),
+        "user_a": user_a_id,
+        "user_b": user_b_id
+    }).one()
+    db.commit()
+    return result
+
+
+# Set-based variant of _LIKE_AND_MATCH for many targets of one user. Match
+# ids come from gen_random_uuid(), built into PostgreSQL 13+ (older servers
+# need the pgcrypto extension).
+_LIKES_AND_MATCHES = text("""
+WITH target AS (
+    SELECT input.to_user, users.id IS NOT NULL AS found, COALESCE(users.banned, false) AS banned
+    FROM unnest(CAST(:to_users AS uuid[])) AS input(to_user)
+    LEFT JOIN users ON users.id = input.to_user
+),
+new_likes AS (
+    INSERT INTO likes (from_user, to_user, batch_week)
+    SELECT CAST(:from_user AS uuid), to_user, :batch_week FROM target WHERE found AND NOT banned
+    ON CONFLICT (from_user, to_user, batch_week) DO NOTHING
+    RETURNING to_user
+),
+new_matches AS (
+    INSERT INTO matches (id, user_a, user_b, status)
+    SELECT
+        gen_random_uuid(),
+        LEAST(CAST(:from_user AS uuid), new_likes.to_user),
+        GREATEST(CAST(:from_user AS uuid), new_likes.to_user),
+        'pending'
+    FROM new_likes
+    JOIN likes ON likes.from_user = new_likes.to_user
+        AND likes.to_user = CAST(:from_user AS uuid)
+        AND likes.batch_week = :batch_week
+    ON CONFLICT (user_a, user_b) DO NOTHING
+    RETURNING user_a, user_b
+)
+SELECT
+    target.to_user,
+    target.found,
+    target.banned,
+    new_likes.to_user IS NOT NULL AS liked,
+    new_matches.user_a IS NOT NULL AS matched
+FROM target
+LEFT JOIN new_likes ON new_likes.to_user = target.to_user
+LEFT JOIN new_matches ON target.to_user IN (new_matches.user_a, new_matches.user_b)
+""")
+
+
+def create_likes_and_matches(
+    db: Session,
+    from_user_id: str,
+    to_user_ids: List[str],
+    batch_week: str
+) -> List[Row]:
+    """Batch variant of create_like_and_match for distinct targets of one user
+
+    Returns one row per target with to_user, found, banned, liked and matched.
+    """
+    pairs = sorted(
+        "like:{}:{}".format(*canonical_pair(from_user_id, to_user_id))
+        for to_user_id in to_user_ids
+    )
+    # Lock pairs in a fixed order so overlapping batches can't deadlock
+    db.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(hashtextextended(pair, 0)) "
+            "FROM unnest(CAST(:pairs AS text[])) AS pair ORDER BY pair"
+        ),
+        {"pairs": pairs}
+    )
+    rows = db.execute(_LIKES_AND_MATCHES, {
+        "from_user": str(from_user_id),
+        "to_users": [str(to_user_id) for to_user_id in to_user_ids],
+        "batch_week": batch_week
+    }).all()
+    db.commit()
+    return rows
+
+
 def get_like(
     db: Session,
     from_user_id: str,
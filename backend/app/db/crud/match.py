@@ -1,9 +1,21 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, func, select, tuple_, union_all
+from sqlalchemy.sql import Select
 import uuid
 
 from app.db import models
+from app.db.pagination import decode_cursor, encode_cursor, paginate
+
+
+def canonical_pair(user_a_id: str, user_b_id: str) -> Tuple[str, str]:
+    """Order a user pair the way matches store it (smaller UUID first)"""
+    user_a_id, user_b_id = str(user_a_id), str(user_b_id)
+    if user_a_id > user_b_id:
+        return user_b_id, user_a_id
+    return user_a_id, user_b_id
 
 
 def create_match(
@@ -12,20 +24,16 @@ def create_match(
     user_b_id: str,
     status: str = "pending"
 ) -> models.Match:
-    """Create a new match"""
-    # Ensure consistent ordering (smaller UUID first)
-    if str(user_a_id) > str(user_b_id):
-        user_a_id, user_b_id = user_b_id, user_a_id
-
-    match = models.Match(
-        user_a=user_a_id,
-        user_b=user_b_id,
-        status=status
+    """Create a match for a pair, or return the existing one"""
+    user_a_id, user_b_id = canonical_pair(user_a_id, user_b_id)
+
+    db.execute(
+        insert(models.Match)
+        .values(id=uuid.uuid4(), user_a=user_a_id, user_b=user_b_id, status=status)
+        .on_conflict_do_nothing(index_elements=["user_a", "user_b"])
     )
-    db.add(match)
     db.commit()
-    db.refresh(match)
-    return match
+    return get_match_by_users(db, user_a_id, user_b_id)
 
 
 def get_match_by_users(
@@ -34,50 +42,86 @@ def get_match_by_users(
     user_b_id: str
 ) -> Optional[models.Match]:
     """Get match between two users"""
+    user_a_id, user_b_id = canonical_pair(user_a_id, user_b_id)
     return (
         db.query(models.Match)
-        .filter(
-            or_(
-                and_(models.Match.user_a == user_a_id, models.Match.user_b == user_b_id),
-                and_(models.Match.user_a == user_b_id, models.Match.user_b == user_a_id)
-            )
-        )
+        .filter(models.Match.user_a == user_a_id, models.Match.user_b == user_b_id)
         .first()
     )
 
 
 def get_match_by_id(db: Session, match_id: str) -> Optional[models.Match]:
     """Get match by ID"""
-    return (
-        db.query(models.Match)
-        .options(
-            joinedload(models.Match.user_a_rel).joinedload(models.User.profile),
-            joinedload(models.Match.user_b_rel).joinedload(models.User.profile),
-            joinedload(models.Match.payment)
-        )
-        .filter(models.Match.id == match_id)
-        .first()
-    )
+    return db.query(models.Match).filter(models.Match.id == match_id).first()
 
 
-def get_user_matches(db: Session, user_id: str) -> List[models.Match]:
-    """Get all matches for a user"""
-    return (
-        db.query(models.Match)
-        .options(
-            joinedload(models.Match.user_a_rel).joinedload(models.User.profile),
-            joinedload(models.Match.user_b_rel).joinedload(models.User.profile),
-            joinedload(models.Match.payment)
-        )
-        .filter(
-            or_(
-                models.Match.user_a == user_id,
-                models.Match.user_b == user_id
-            )
-        )
-        .order_by(models.Match.created_at.desc())
-        .all()
-    )
+def user_match_rows_query(user_id: str, limit: int = 50, cursor: Optional[str] = None) -> Select:
+    """Statement behind get_user_match_rows, fetching one row past the page
+
+    Each side of the pair is read from its own (user, created_at, id) index
+    and the two sorted runs are combined with UNION ALL instead of an OR.
+    """
+    key = [models.Match.created_at, models.Match.id]
+    after = tuple_(*key) < tuple_(*decode_cursor(cursor, key)) if cursor else None
+
+    def side(column):
+        query = select(
+            models.Match.id,
+            models.Match.user_a,
+            models.Match.user_b,
+            models.Match.created_at,
+            models.Match.status
+        ).where(column == user_id)
+        if after is not None:
+            query = query.where(after)
+        return query.order_by(*[c.desc() for c in key]).limit(limit + 1)
+
+    matches = union_all(side(models.Match.user_a), side(models.Match.user_b)).subquery()
+    return select(matches).order_by(matches.c.created_at.desc(), matches.c.id.desc()).limit(limit + 1)
+
+
+def get_user_match_rows(
+    db: Session,
+    user_id: str,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[Row], Optional[str]]:
+    """Lean page of a user's matches (id, user_a, user_b, created_at, status), newest first"""
+    rows = db.execute(user_match_rows_query(user_id, limit, cursor)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([rows[-1].created_at, rows[-1].id])
+
+
+def user_matches_version_query(user_id: str) -> Select:
+    """Statement behind get_user_matches_version
+
+    Like user_match_rows_query, each side of the pair is read from its own
+    index and the sides are combined with UNION ALL (a pair never has the
+    same user on both sides).
+    """
+    def side(column):
+        return select(models.Match.created_at, models.Match.status).where(column == user_id)
+
+    matches = union_all(side(models.Match.user_a), side(models.Match.user_b)).subquery()
+    return select(
+        func.count(),
+        func.max(matches.c.created_at),
+        *[
+            func.count().filter(matches.c.status == match_status)
+            for match_status in ("pending", "active", "closed")
+        ]
+    ).select_from(matches)
+
+
+def get_user_matches_version(db: Session, user_id: str) -> Tuple:
+    """Cheap change marker for a user's matches: count, newest created_at and per-status counts
+
+    Statuses only move forward (pending -> active -> closed), so any status
+    change shifts at least one of the per-status counts.
+    """
+    return tuple(db.execute(user_matches_version_query(user_id)).one())
 
 
 def update_match_status(
@@ -98,22 +142,19 @@ def get_matches_for_admin(
     db: Session,
     status: Optional[str] = None,
     page: int = 0,
-    limit: int = 50
-) -> List[models.Match]:
-    """Get matches for admin with optional status filter"""
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[models.Match], Optional[str]]:
+    """Get a page of matches for admin with optional status filter, and the next page cursor"""
     query = (
         db.query(models.Match)
-        .options(
-            joinedload(models.Match.user_a_rel).joinedload(models.User.profile),
-            joinedload(models.Match.user_b_rel).joinedload(models.User.profile),
-            joinedload(models.Match.payment)
-        )
+        .options(joinedload(models.Match.payment))
     )
 
     if status:
         query = query.filter(models.Match.status == status)
 
-    return query.order_by(models.Match.created_at.desc()).offset(page * limit).limit(limit).all()
+    return paginate(query, [models.Match.created_at, models.Match.id], cursor, limit, page * limit)
 
 
 def user_can_access_match(match: models.Match, user_id: str) -> bool:
@@ -121,10 +162,10 @@ def user_can_access_match(match: models.Match, user_id: str) -> bool:
     return str(match.user_a) == str(user_id) or str(match.user_b) == str(user_id)
 
 
-def get_other_user(match: models.Match, user_id: str) -> Optional[models.User]:
-    """Get the other user in a match"""
+def get_other_user_id(match: models.Match, user_id: str) -> Optional[uuid.UUID]:
+    """Get the id of the other user in a match"""
     if str(match.user_a) == str(user_id):
-        return match.user_b_rel
+        return match.user_b
     elif str(match.user_b) == str(user_id):
-        return match.user_a_rel
+        return match.user_a
     return None
\ No newline at end of file
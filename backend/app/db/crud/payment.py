@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
 from datetime import datetime
@@ -7,6 +7,7 @@ import random
 import string
 
 from app.db import models
+from app.db.pagination import paginate
 
 
 def generate_payment_code(user_id: str) -> str:
@@ -84,9 +85,10 @@ def get_payments_for_admin(
     db: Session,
     status: Optional[str] = None,
     page: int = 0,
-    limit: int = 50
-) -> List[models.Payment]:
-    """Get payments for admin with optional status filter"""
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[models.Payment], Optional[str]]:
+    """Get a page of payments for admin with optional status filter, and the next page cursor"""
     query = (
         db.query(models.Payment)
         .options(joinedload(models.Payment.match))
@@ -98,7 +100,7 @@ def get_payments_for_admin(
     elif status == "pending":
         query = query.filter(models.Payment.verified_at.is_(None))
 
-    return query.order_by(models.Payment.id.desc()).offset(page * limit).limit(limit).all()
+    return paginate(query, [models.Payment.id], cursor, limit, page * limit)
 
 
 def user_can_access_payment(payment: models.Payment, user_id: str) -> bool:
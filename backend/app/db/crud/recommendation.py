@@ -1,17 +1,21 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, func
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from sqlalchemy import and_, or_, func
 from datetime import datetime, timedelta
 import uuid
 
 from app.db import models
+from app.core.config import settings
+from app.core.regions import codes_within, region_affinity
 
 
 def get_recommendations(db: Session, user_id: str, week: str) -> List[models.Recommendation]:
-    """Get recommendations for a user for a specific week"""
+    """Get recommendations for a user for a specific week
+
+    Target profiles come from the profile cache, not a join.
+    """
     return (
         db.query(models.Recommendation)
-        .options(joinedload(models.Recommendation.target_user).joinedload(models.User.profile))
         .filter(
             and_(
                 models.Recommendation.user_id == user_id,
@@ -23,12 +27,41 @@ def get_recommendations(db: Session, user_id: str, week: str) -> List[models.Rec
     )
 
 
+def get_recommendations_version(db: Session, user_id: str, week: str) -> Tuple[tuple, List[str]]:
+    """Cheap change marker for a user's recommendations of a week, and their target user ids
+
+    The marker covers new rows and responded flags; edits to the embedded
+    target profiles are versioned by the profile cache for the returned ids.
+    """
+    rows = (
+        db.query(
+            models.Recommendation.id,
+            models.Recommendation.target_user_id,
+            models.Recommendation.responded
+        )
+        .filter(
+            and_(
+                models.Recommendation.user_id == user_id,
+                models.Recommendation.batch_week == week
+            )
+        )
+        .all()
+    )
+    marker = (
+        len(rows),
+        max((row.id for row in rows), default=None),
+        sum(1 for row in rows if row.responded)
+    )
+    return marker, [str(row.target_user_id) for row in rows]
+
+
 def create_recommendation(
     db: Session,
     user_id: str,
     target_user_id: str,
     batch_week: str,
-    score: float
+    score: float,
+    strategy: Optional[str] = None
 ) -> models.Recommendation:
     """Create a new recommendation"""
     recommendation = models.Recommendation(
@@ -36,6 +69,7 @@ def create_recommendation(
         target_user_id=target_user_id,
         batch_week=batch_week,
         score=score,
+        strategy=strategy,
         sent_at=datetime.utcnow()
     )
     db.add(recommendation)
@@ -100,6 +134,7 @@ def get_potential_matches(db: Session, user_id: str) -> List[models.User]:
         db.query(models.User)
         .join(models.Profile, models.User.id == models.Profile.user_id)
         .join(models.Preferences, models.User.id == models.Preferences.user_id)
+        .options(contains_eager(models.User.profile))
         .filter(
             # Not the same user
             models.User.id != user_id,
@@ -117,9 +152,14 @@ def get_potential_matches(db: Session, user_id: str) -> List[models.User]:
         )
     )
 
-    # Region filter if specified
+    # Region filter if specified, optionally widened to neighbouring regions
     if prefs.regions:
-        query = query.filter(models.Profile.region.in_(prefs.regions))
+        region_filter = models.Profile.region.in_(prefs.regions)
+        if settings.REGION_FILTER_RADIUS_KM > 0:
+            nearby_codes = codes_within(prefs.regions, settings.REGION_FILTER_RADIUS_KM)
+            if nearby_codes:
+                region_filter = or_(region_filter, models.Profile.region_code.in_(nearby_codes))
+        query = query.filter(region_filter)
 
     # Exclude blocked users
     if prefs.blocks:
@@ -144,8 +184,11 @@ def calculate_match_score(user: models.User, candidate: models.User) -> float:
     elif age_diff <= 10:
         score += 1.0
 
-    # Region match
-    if user.profile.region and candidate.profile.region:
+    # Region proximity (same region = 2.0, decaying with distance)
+    if user.profile.region_code is not None and candidate.profile.region_code is not None:
+        score += 2.0 * region_affinity(user.profile.region_code, candidate.profile.region_code)
+    elif user.profile.region and candidate.profile.region:
+        # Regions outside the region table only match exactly
         if user.profile.region == candidate.profile.region:
             score += 2.0
 
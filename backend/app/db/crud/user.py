@@ -1,9 +1,13 @@
-from typing import Optional, List
-from sqlalchemy.orm import Session, joinedload
+from typing import Optional, List, Tuple
+from sqlalchemy.orm import Session
 from sqlalchemy import and_
 import uuid
 
 from app.db import models, schemas
+from app.core.regions import region_code
+from app.core.profile_cache import cache_preferences, cache_profile
+from app.core.user_cache import invalidate_user
+from app.db.pagination import paginate
 
 
 def get_user_by_id(db: Session, user_id: str) -> Optional[models.User]:
@@ -25,14 +29,24 @@ def create_user(db: Session, kakao_user_id: str) -> models.User:
     return user
 
 
-def get_user_with_profile_and_preferences(db: Session, user_id: str) -> Optional[models.User]:
-    """Get user with profile and preferences"""
-    return (
-        db.query(models.User)
-        .options(joinedload(models.User.profile), joinedload(models.User.preferences))
-        .filter(models.User.id == user_id)
-        .first()
-    )
+def update_user_status(
+    db: Session,
+    user_id: str,
+    banned: Optional[bool] = None,
+    role: Optional[str] = None
+) -> Optional[models.User]:
+    """Update a user's ban status and/or role"""
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if user:
+        if banned is not None:
+            user.banned = banned
+        if role is not None:
+            user.role = role
+        db.commit()
+        db.refresh(user)
+        # Cached auth lookups must not outlive a ban or role change
+        invalidate_user(user_id)
+    return user
 
 
 def create_default_profile(db: Session, user_id: str, nickname: str = "사용자") -> models.Profile:
@@ -75,9 +89,11 @@ def update_profile(db: Session, user_id: str, profile_data: schemas.ProfileUpdat
 
     for field, value in profile_data.dict(exclude_unset=True).items():
         setattr(profile, field, value)
+    profile.region_code = region_code(profile.region)
 
     db.commit()
     db.refresh(profile)
+    cache_profile(profile)
     return profile
 
 
@@ -94,16 +110,23 @@ def update_preferences(db: Session, user_id: str, preferences_data: schemas.Pref
 
     db.commit()
     db.refresh(preferences)
+    cache_preferences(preferences)
     return preferences
 
 
-def get_users_for_admin(db: Session, query: str = "", page: int = 0, limit: int = 50) -> List[models.User]:
-    """Get users for admin with optional search"""
-    users_query = db.query(models.User).options(joinedload(models.User.profile))
+def get_users_for_admin(
+    db: Session,
+    query: str = "",
+    page: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[models.User], Optional[str]]:
+    """Get a page of users for admin with optional search, and the next page cursor"""
+    users_query = db.query(models.User)
 
     if query:
         users_query = users_query.join(models.Profile, models.User.id == models.Profile.user_id, isouter=True).filter(
             models.Profile.nickname.ilike(f"%{query}%")
         )
 
-    return users_query.offset(page * limit).limit(limit).all()
\ No newline at end of file
+    return paginate(users_query, [models.User.created_at, models.User.id], cursor, limit, page * limit)
\ No newline at end of file
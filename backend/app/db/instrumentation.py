@@ -0,0 +1,226 @@
+import hashlib
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+
+class QueryStats:
+    """Statements executed and database time spent within one request or job"""
+
+    __slots__ = ("count", "duration_ns", "_source")
+
+    def __init__(self, source: Union[str, Callable[[], str], None] = None):
+        self.count = 0
+        self.duration_ns = 0
+        self._source = source
+
+    @property
+    def duration(self) -> float:
+        return self.duration_ns / 1e9
+
+    @property
+    def source(self) -> Optional[str]:
+        """Route or job the statements ran for (resolved lazily, e.g. after routing)"""
+        return self._source() if callable(self._source) else self._source
+
+
+# Mutated in place, so statements run in worker threads (sync routes, run_sync)
+# still count towards the request that copied the context
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_ns", []).append(time.perf_counter_ns())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration_ns = time.perf_counter_ns() - conn.info["query_started_ns"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration_ns += duration_ns
+
+    key, normalized = fingerprint(statement)
+    query_log.record(key, normalized, duration_ns)
+    if duration_ns >= settings.SLOW_QUERY_MS * 1_000_000:
+        logger.warning(
+            "Slow query",
+            fingerprint=key,
+            statement=normalized[:1000],
+            duration=duration_ns / 1e9,
+            source=stats.source if stats is not None else None
+        )
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started_ns") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+_LITERALS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # String literals
+    (re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+\b|%s"), "?"),  # Bind parameters of any paramstyle (not ::casts)
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # Numbers
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),  # IN lists and VALUES rows
+    (re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+"), "(...)"),  # Multi-row VALUES
+    (re.compile(r"\s+"), " "),
+)
+
+_fingerprints: Dict[str, tuple] = {}
+_FINGERPRINT_CACHE_SIZE = 2048
+
+
+def fingerprint(statement: str) -> tuple:
+    """(short hash, normalized text) of a statement with literals and parameters replaced"""
+    cached = _fingerprints.get(statement)
+    if cached is not None:
+        return cached
+
+    normalized = statement
+    for pattern, replacement in _LITERALS:
+        normalized = pattern.sub(replacement, normalized)
+    normalized = normalized.strip()
+    result = (hashlib.blake2b(normalized.encode(), digest_size=6).hexdigest(), normalized)
+
+    # Statements come from a bounded set of code paths; the cap guards against ad-hoc SQL
+    if len(_fingerprints) >= _FINGERPRINT_CACHE_SIZE:
+        _fingerprints.clear()
+    _fingerprints[statement] = result
+    return result
+
+
+class QueryLog:
+    """Per-fingerprint count, total and max time over a rolling window
+
+    Keeps the current and the previous window, so reports cover between one
+    and two windows of traffic.
+    """
+
+    def __init__(self, window_seconds: float, max_fingerprints: int):
+        self.window_seconds = window_seconds
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self._window_started = time.monotonic()
+        self._current: Dict[str, list] = {}
+        self._previous: Dict[str, list] = {}
+
+    def _rotate(self, now: float) -> None:
+        if now - self._window_started < self.window_seconds:
+            return
+        # A window with no traffic in between leaves nothing worth keeping
+        self._previous = self._current if now - self._window_started < 2 * self.window_seconds else {}
+        self._current = {}
+        self._window_started = now
+
+    def record(self, key: str, statement: str, duration_ns: int) -> None:
+        with self._lock:
+            self._rotate(time.monotonic())
+            entry = self._current.get(key)
+            if entry is None:
+                if len(self._current) >= self.max_fingerprints:
+                    key, statement = "other", "(fingerprints over QUERY_STATS_MAX_FINGERPRINTS)"
+                    entry = self._current.get(key)
+                if entry is None:
+                    entry = self._current[key] = [statement, 0, 0, 0]
+            entry[1] += 1
+            entry[2] += duration_ns
+            entry[3] = max(entry[3], duration_ns)
+
+    def top(self, limit: int = 20, order_by: str = "total") -> List[Dict[str, Any]]:
+        """Fingerprints with the most total time, calls or slowest single run"""
+        with self._lock:
+            self._rotate(time.monotonic())
+            merged: Dict[str, list] = {}
+            for window in (self._previous, self._current):
+                for key, (statement, count, total_ns, max_ns) in window.items():
+                    entry = merged.setdefault(key, [statement, 0, 0, 0])
+                    entry[1] += count
+                    entry[2] += total_ns
+                    entry[3] = max(entry[3], max_ns)
+
+        sort_key = {"total": 2, "count": 1, "max": 3}[order_by]
+        rows = sorted(merged.items(), key=lambda item: item[1][sort_key], reverse=True)[:limit]
+        return [
+            {
+                "fingerprint": key,
+                "statement": statement,
+                "count": count,
+                "total_seconds": total_ns / 1e9,
+                "mean_seconds": total_ns / count / 1e9,
+                "max_seconds": max_ns / 1e9,
+            }
+            for key, (statement, count, total_ns, max_ns) in rows
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._current = {}
+            self._previous = {}
+            self._window_started = time.monotonic()
+
+
+query_log = QueryLog(settings.QUERY_STATS_WINDOW_SECONDS, settings.QUERY_STATS_MAX_FINGERPRINTS)
+
+_installed = False
+
+
+def install_query_counter() -> None:
+    """Count, time and fingerprint statements of every engine (sync, async, batch and replicas)"""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _installed = True
+
+
+@contextmanager
+def track_queries(source: Union[str, Callable[[], str], None] = None) -> Iterator[QueryStats]:
+    """Count statements and database time of the enclosed request or job
+
+    source names the route or job in slow query logs.
+    """
+    stats = QueryStats(source)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """An endpoint ran more statements than its declared query budget"""
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare the most statements an endpoint may run per request
+
+    RequestTimingMiddleware logs requests over budget, and raises
+    QueryBudgetExceeded in the test environment so the test fails.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """Fail if the enclosed code runs more than max_queries statements"""
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(f"{stats.count} queries, budget {max_queries}")
@@ -0,0 +1,38 @@
+"""Add profiles.region_code
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-09-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.regions import REGIONS, REGION_ALIASES
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('profiles', sa.Column('region_code', sa.SmallInteger(), nullable=True))
+
+    # Backfill codes from the first word of the free-text region
+    for code, (name, _, _) in enumerate(REGIONS):
+        names = [name] + REGION_ALIASES.get(name, [])
+        op.execute(
+            sa.text(
+                "UPDATE profiles SET region_code = :code "
+                "WHERE split_part(region, ' ', 1) = ANY(:names)"
+            ).bindparams(code=code, names=names)
+        )
+
+    op.create_index('idx_profiles_region_code', 'profiles', ['region_code'])
+
+
+def downgrade():
+    op.drop_index('idx_profiles_region_code', table_name='profiles')
+    op.drop_column('profiles', 'region_code')
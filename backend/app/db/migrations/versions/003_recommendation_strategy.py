@@ -0,0 +1,23 @@
+"""Add recommendations.strategy
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-09-29 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('recommendations', sa.Column('strategy', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('recommendations', 'strategy')
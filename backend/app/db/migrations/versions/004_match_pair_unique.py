@@ -0,0 +1,70 @@
+"""Unique canonical user pair on matches
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-10-06 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Store every pair in canonical order (user_a < user_b)
+    op.execute(
+        "UPDATE matches SET user_a = user_b, user_b = user_a WHERE user_a > user_b"
+    )
+
+    # Deleting a duplicate cascades to its payment, so a pair paid for more
+    # than once has to be merged by hand before the pair can become unique
+    paid_twice = op.get_bind().execute(sa.text("""
+        SELECT matches.user_a, matches.user_b, array_agg(matches.id::text ORDER BY matches.created_at) AS match_ids
+        FROM matches
+        JOIN payments ON payments.match_id = matches.id
+        GROUP BY matches.user_a, matches.user_b
+        HAVING count(*) > 1
+    """)).all()
+    if paid_twice:
+        pairs = "; ".join(
+            f"{row.user_a}/{row.user_b}: matches {', '.join(row.match_ids)}" for row in paid_twice
+        )
+        raise RuntimeError(
+            f"{len(paid_twice)} user pair(s) have more than one paid match. Move or refund the extra "
+            f"payments so each pair keeps at most one, then rerun the migration. {pairs}"
+        )
+
+    # Keep one match per pair: the one with a payment, then the most advanced, then the oldest
+    op.execute("""
+        DELETE FROM matches
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT
+                    matches.id,
+                    row_number() OVER (
+                        PARTITION BY matches.user_a, matches.user_b
+                        ORDER BY
+                            payments.id IS NULL,
+                            CASE matches.status WHEN 'active' THEN 0 WHEN 'pending' THEN 1 ELSE 2 END,
+                            matches.created_at,
+                            matches.id
+                    ) AS duplicate
+                FROM matches
+                LEFT JOIN payments ON payments.match_id = matches.id
+            ) ranked
+            WHERE duplicate > 1
+        )
+    """)
+
+    op.create_check_constraint('check_match_pair_order', 'matches', sa.text('user_a < user_b'))
+    op.create_index('uq_matches_pair', 'matches', ['user_a', 'user_b'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_matches_pair', table_name='matches')
+    op.drop_constraint('check_match_pair_order', 'matches', type_='check')
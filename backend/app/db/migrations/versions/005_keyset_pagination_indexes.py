@@ -0,0 +1,27 @@
+"""Indexes for keyset pagination
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-10-13 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Admin listings page newest first on (created_at, id); payments page on their primary key
+    op.create_index('idx_users_created', 'users', ['created_at', 'id'])
+    op.create_index('idx_matches_created', 'matches', ['created_at', 'id'])
+    op.create_index('idx_matches_status_created', 'matches', ['status', 'created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('idx_matches_status_created', table_name='matches')
+    op.drop_index('idx_matches_created', table_name='matches')
+    op.drop_index('idx_users_created', table_name='users')
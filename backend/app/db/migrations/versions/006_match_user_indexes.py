@@ -0,0 +1,25 @@
+"""Per-user match list indexes
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-10-13 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One sorted run per side of the pair for GET /matches (see crud.match.get_user_match_rows)
+    op.create_index('idx_matches_user_a_created', 'matches', ['user_a', 'created_at', 'id'])
+    op.create_index('idx_matches_user_b_created', 'matches', ['user_b', 'created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('idx_matches_user_b_created', table_name='matches')
+    op.drop_index('idx_matches_user_a_created', table_name='matches')
@@ -0,0 +1,26 @@
+"""Profile change marker for recommendation ETags
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-10-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'profiles',
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column('profiles', 'updated_at')
@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime
 from sqlalchemy import (
-    Column, String, Boolean, Integer, Text, JSON, ForeignKey,
-    CheckConstraint, UniqueConstraint, TIMESTAMP, DECIMAL, BIGINT
+    Column, String, Boolean, Integer, SmallInteger, Text, JSON, ForeignKey,
+    CheckConstraint, UniqueConstraint, Index, TIMESTAMP, DECIMAL, BIGINT
 )
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
@@ -25,8 +25,8 @@ class User(Base):
     preferences = relationship('Preferences', uselist=False, back_populates='user', cascade='all, delete-orphan')
     sent_likes = relationship('Like', foreign_keys='Like.from_user', back_populates='sender', cascade='all, delete-orphan')
     received_likes = relationship('Like', foreign_keys='Like.to_user', back_populates='receiver', cascade='all, delete-orphan')
-    recommendations = relationship('Recommendation', back_populates='user', cascade='all, delete-orphan')
-    exposure_logs = relationship('ExposureLog', foreign_keys='ExposureLog.user_id', cascade='all, delete-orphan')
+    recommendations = relationship('Recommendation', foreign_keys='Recommendation.user_id', back_populates='user', cascade='all, delete-orphan')
+    exposure_logs = relationship('ExposureLog', foreign_keys='ExposureLog.user_id', back_populates='user', cascade='all, delete-orphan')
 
 
 class Profile(Base):
@@ -38,10 +38,12 @@ class Profile(Base):
     birth_year = Column(Integer, nullable=False)
     height = Column(Integer)
     region = Column(String)
+    region_code = Column(SmallInteger)  # Index into app.core.regions.REGIONS
     job = Column(String)
     intro = Column(Text)
     photos = Column(JSON, nullable=False, default=list)
     visible = Column(JSON, nullable=False, default=lambda: {"age": True, "height": False, "region": True, "job": True, "intro": True})
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
 
     __table_args__ = (
         CheckConstraint(gender.in_(['M', 'F']), name='check_gender'),
@@ -83,7 +85,7 @@ class ExposureLog(Base):
     # UniqueConstraint with date functions are complex in PostgreSQL
 
     # Relationships
-    user = relationship('User', foreign_keys=[user_id])
+    user = relationship('User', foreign_keys=[user_id], back_populates='exposure_logs')
     target_user = relationship('User', foreign_keys=[target_user_id])
 
 
@@ -95,6 +97,7 @@ class Recommendation(Base):
     target_user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     batch_week = Column(String, nullable=False)
     score = Column(DECIMAL(6, 3), default=0)
+    strategy = Column(String)  # Scoring strategy that produced the score
     sent_at = Column(TIMESTAMP(timezone=True))
     responded = Column(Boolean, default=False)
 
@@ -103,7 +106,7 @@ class Recommendation(Base):
     )
 
     # Relationships
-    user = relationship('User', back_populates='recommendations')
+    user = relationship('User', foreign_keys=[user_id], back_populates='recommendations')
     target_user = relationship('User', foreign_keys=[target_user_id])
 
 
@@ -136,7 +139,9 @@ class Match(Base):
 
     __table_args__ = (
         CheckConstraint(status.in_(['pending', 'active', 'closed']), name='check_status'),
-        # Note: User pair uniqueness will be handled at application level
+        # One match per pair, stored in canonical order (see crud.match.canonical_pair)
+        CheckConstraint('user_a < user_b', name='check_match_pair_order'),
+        Index('uq_matches_pair', 'user_a', 'user_b', unique=True),
     )
 
     # Relationships
@@ -0,0 +1,76 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """A cursor token that is not one this API handed out"""
+
+
+def cursor_headers(next_cursor: Optional[str]) -> Dict[str, str]:
+    """Response headers advertising the next page, if any"""
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor token for the sort key of the last row on a page"""
+    payload = [value.isoformat() if isinstance(value, datetime) else str(value) for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """Sort key values from a cursor token; raises InvalidCursor if it is malformed"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(payload, list) or len(payload) != len(columns):
+        raise InvalidCursor("Invalid cursor")
+
+    values = []
+    for column, value in zip(columns, payload):
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif python_type is uuid.UUID:
+                values.append(uuid.UUID(value))
+            else:
+                values.append(python_type(value))
+        except (TypeError, ValueError, AttributeError) as e:
+            raise InvalidCursor("Invalid cursor") from e
+    return values
+
+
+def paginate(
+    query: Query,
+    columns: Sequence,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0
+) -> Tuple[list, Optional[str]]:
+    """Keyset page of query, newest first by columns, and the cursor of the next page
+
+    The columns must be unique together and belong to the queried entity. The
+    offset only supports clients still paging by page number.
+    """
+    if cursor:
+        query = query.filter(tuple_(*columns) < tuple_(*decode_cursor(cursor, columns)))
+    query = query.order_by(*[column.desc() for column in columns])
+    if offset and not cursor:
+        query = query.offset(offset)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in columns])
@@ -0,0 +1,119 @@
+import itertools
+import time
+from typing import Dict, List, Optional, Sequence
+
+import structlog
+from fastapi import Request
+from sqlalchemy import exc
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection
+from starlette.datastructures import MutableHeaders
+
+logger = structlog.get_logger()
+
+# Set on successful writes to the time until which the caller reads from the
+# primary. Browsers return the cookie; other clients echo the header back.
+READ_PRIMARY_COOKIE = "read_primary_until"
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+
+class ReadAfterWriteMiddleware:
+    """ASGI middleware telling callers of successful writes to read from the primary
+
+    The marker travels with the client rather than living in one worker's
+    memory, so it holds whichever worker serves the next read. Only installed
+    when read replicas are configured.
+    """
+
+    def __init__(self, app, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = f"{time.time() + self.sticky_seconds:.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(READ_PRIMARY_HEADER, until)
+                headers.append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}={until}; HttpOnly; Max-Age={max(1, int(self.sticky_seconds))}; "
+                    "Path=/; SameSite=lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_marker)
+
+
+def reads_from_primary(request: Request) -> bool:
+    """True while the caller is inside the read-after-write window of its last write"""
+    for value in (request.headers.get(READ_PRIMARY_HEADER), request.cookies.get(READ_PRIMARY_COOKIE)):
+        try:
+            if value and float(value) > time.time():
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+class ReplicaRouter:
+    """Routes read-only sessions to replicas, round-robin, falling back to the primary
+
+    A replica that fails to hand out a connection is skipped for retry_seconds
+    (tracked per process); one whose pool is exhausted is only passed over.
+    Callers that just wrote ask for the primary (see reads_from_primary) so
+    they see their own writes despite replication lag.
+    """
+
+    def __init__(self, primary, replicas: Sequence = (), retry_seconds: float = 30):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._down_until: Dict[int, float] = {}
+
+    def mark_down(self, engine) -> None:
+        self._down_until[id(engine)] = time.monotonic() + self.retry_seconds
+
+    def candidates(self, primary: bool = False) -> List:
+        """Engines to try in order: healthy replicas, rotated, then the primary"""
+        if not self.replicas or primary:
+            return [self.primary]
+
+        now = time.monotonic()
+        start = next(self._counter) % len(self.replicas)
+        rotated = self.replicas[start:] + self.replicas[:start]
+        healthy = [engine for engine in rotated if self._down_until.get(id(engine), 0) <= now]
+        return healthy + [self.primary]
+
+    def _failed(self, engine, error: Exception) -> None:
+        if isinstance(error, exc.TimeoutError):
+            # Pool exhausted: the replica is busy, not down
+            logger.warning("Read replica pool exhausted, trying next", replica=str(engine.url))
+            return
+        self.mark_down(engine)
+        logger.warning("Read replica unavailable, trying next", replica=str(engine.url), error=str(error))
+
+    def connect(self, primary: bool = False) -> Connection:
+        """Connection for a read-only unit of work"""
+        for engine in self.candidates(primary):
+            if engine is self.primary:
+                return engine.connect()
+            try:
+                return engine.connect()
+            except (exc.DBAPIError, exc.TimeoutError) as e:
+                self._failed(engine, e)
+
+    async def connect_async(self, primary: bool = False) -> AsyncConnection:
+        """Async variant of connect"""
+        for engine in self.candidates(primary):
+            if engine is self.primary:
+                return await engine.connect()
+            try:
+                return await engine.connect()
+            except (exc.DBAPIError, exc.TimeoutError) as e:
+                self._failed(engine, e)
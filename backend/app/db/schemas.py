@@ -115,6 +115,21 @@ class LikeResponse(BaseModel):
     ok: bool
 
 
+class LikeBatchRequest(BaseModel):
+    toUserIds: List[UUID4]
+    batchWeek: str
+
+
+class LikeBatchItem(BaseModel):
+    toUserId: UUID4
+    status: str  # liked, already_liked, not_found, banned, self
+    matched: bool = False
+
+
+class LikeBatchResponse(BaseModel):
+    results: List[LikeBatchItem]
+
+
 # Match schemas
 class Match(BaseModel):
     id: UUID4
@@ -197,7 +212,30 @@ class AdminPayment(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class QueryFingerprint(BaseModel):
+    fingerprint: str
+    statement: str
+    count: int
+    total_seconds: float
+    mean_seconds: float
+    max_seconds: float
+
+
+class QueryStatsResponse(BaseModel):
+    window_seconds: int
+    queries: List[QueryFingerprint]
+
+
 # Health check
 class HealthResponse(BaseModel):
     status: str
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+
+class ReadinessResponse(BaseModel):
+    status: str
+    reasons: List[str]
+    timestamp: datetime
+    health: Dict[str, Any]
+    pools: Dict[str, Dict[str, Any]]
+    scheduler: Dict[str, Any]
\ No newline at end of file
@@ -0,0 +1,59 @@
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.responses import dumps
+
+# Profile fields in response order, with the visibility key that hides each one
+# (None: always shown)
+PROFILE_FIELDS: Tuple[Tuple[str, Optional[str]], ...] = (
+    ("user_id", None),
+    ("nickname", None),
+    ("gender", None),
+    ("birth_year", "age"),
+    ("height", "height"),
+    ("region", "region"),
+    ("job", "job"),
+    ("intro", "intro"),
+    ("photos", None),
+    ("visible", None),
+)
+
+# Viewer context -> whether the profile owner's visibility settings apply
+CONTEXTS = {
+    "self": False,
+    "admin": False,
+    "recommendation": True,
+    "match": True,
+}
+
+# Per context: (field, getter, visibility key) with keys dropped where masking is off
+_PLANS = {
+    context: tuple(
+        (name, attrgetter(name), key if masked else None)
+        for name, key in PROFILE_FIELDS
+    )
+    for context, masked in CONTEXTS.items()
+}
+
+_user_id = attrgetter("user_id")
+_visible = attrgetter("visible")
+
+
+def serialize_profile(profile: Any, context: str) -> Dict[str, Any]:
+    """JSON-ready dict of a profile as seen from a viewer context"""
+    visible = _visible(profile) or {}
+    data = {}
+    for name, getter, key in _PLANS[context]:
+        data[name] = None if key is not None and not visible.get(key, True) else getter(profile)
+    data["user_id"] = str(_user_id(profile))
+    return data
+
+
+def serialize_profiles(profiles: Iterable[Any], context: str) -> List[Dict[str, Any]]:
+    """serialize_profile over many profiles"""
+    return [serialize_profile(profile, context) for profile in profiles]
+
+
+def dumps_profiles(profiles: Iterable[Any], context: str) -> bytes:
+    """Profiles as seen from a viewer context, encoded as FastJSONResponse would"""
+    return dumps(serialize_profiles(profiles, context))
@@ -1,6 +1,77 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.core.metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, register_engine
+from app.db.instrumentation import install_query_counter
+from app.db.routing import ReplicaRouter
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+
+def pool_options(name: str, pool_size: int, max_overflow: int) -> dict:
+    """Engine keyword arguments for a named, instrumented connection pool"""
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_logging_name": name,
+    }
+
+
+# API traffic
+engine = create_engine(
+    settings.database_url,
+    poolclass=InstrumentedQueuePool,
+    **pool_options("api", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async stack for async route handlers. Sync CRUD functions run on it through
+# AsyncSession.run_sync, so they are shared by both stacks. Its pool is sized
+# separately from the sync one; together they make up the per-worker budget.
+async_engine = create_async_engine(
+    settings.async_database_url,
+    poolclass=InstrumentedAsyncQueuePool,
+    **pool_options("api_async", settings.ASYNC_DB_POOL_SIZE, settings.ASYNC_DB_MAX_OVERFLOW)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Batch jobs and scripts get their own pool so a weekly build can't starve API requests
+batch_engine = create_engine(
+    settings.database_url,
+    poolclass=InstrumentedQueuePool,
+    **pool_options("batch", settings.BATCH_DB_POOL_SIZE, settings.BATCH_DB_MAX_OVERFLOW)
+)
+BatchSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=batch_engine)
+
+# Health checks connect outside the API pool, so a saturated pool shows up as
+# saturation in /readyz rather than as a database outage
+health_engine = create_async_engine(settings.async_database_url, poolclass=NullPool)
+
+# Optional read replicas for read-only endpoints
+replica_engines = [
+    create_engine(url, poolclass=InstrumentedQueuePool, **pool_options(f"replica{i}", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW))
+    for i, url in enumerate(settings.replica_urls)
+]
+async_replica_engines = [
+    create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **pool_options(f"replica{i}_async", settings.ASYNC_DB_POOL_SIZE, settings.ASYNC_DB_MAX_OVERFLOW))
+    for i, url in enumerate(settings.async_replica_urls)
+]
+read_router = ReplicaRouter(
+    engine, replica_engines, settings.DB_REPLICA_RETRY_SECONDS
+)
+async_read_router = ReplicaRouter(
+    async_engine, async_replica_engines, settings.DB_REPLICA_RETRY_SECONDS
+)
+
+register_engine("api", engine)
+register_engine("api_async", async_engine)
+register_engine("batch", batch_engine)
+for i, (replica, async_replica) in enumerate(zip(replica_engines, async_replica_engines)):
+    register_engine(f"replica{i}", replica)
+    register_engine(f"replica{i}_async", async_replica)
+
+# Per-request and per-job statement counts (see app.db.instrumentation)
+install_query_counter()
@@ -1,15 +1,21 @@
 from contextlib import asynccontextmanager
-from datetime import datetime
 import structlog
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 import uvicorn
 
 from app.core.config import settings
-from app.core.scheduling import init_scheduler, start_scheduler, shutdown_scheduler
+from app.core.health import health_monitor, readiness
+from app.core.metrics import render_prometheus
+from app.core.responses import FastJSONResponse
+from app.core.timing import RequestTimingMiddleware
+from app.core.tracing import install_tracing
+from app.db.pagination import NEXT_CURSOR_HEADER
+from app.db.routing import READ_PRIMARY_HEADER, ReadAfterWriteMiddleware
+from app.core.scheduling import init_scheduler, start_scheduler, shutdown_scheduler, scheduler_state
 from app.db import schemas
 from app.api.v1 import (
     routes_auth,
@@ -55,10 +61,15 @@ async def lifespan(app: FastAPI):
         start_scheduler()
         logger.info("Scheduler started")
 
+        # First check before serving, then in the background
+        await health_monitor.check()
+        health_monitor.start()
+
     yield
 
     # Shutdown
     if settings.APP_ENV != "test":
+        await health_monitor.stop()
         shutdown_scheduler()
         logger.info("Scheduler stopped")
 
@@ -81,34 +92,17 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", READ_PRIMARY_HEADER],
     )
 
-    # Request logging middleware
-    @app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        start_time = datetime.utcnow()
-
-        # Log request
-        logger.info(
-            "Request started",
-            method=request.method,
-            path=request.url.path,
-            client=request.client.host if request.client else None
-        )
-
-        response = await call_next(request)
-
-        # Log response
-        process_time = (datetime.utcnow() - start_time).total_seconds()
-        logger.info(
-            "Request completed",
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
-            process_time=process_time
-        )
+    # Request latency histograms, with sampled or slow-only request logging
+    # (and the root span of each traced request)
+    app.add_middleware(RequestTimingMiddleware)
+    install_tracing()
 
-        return response
+    # Read-after-write: callers that just wrote read from the primary for a while
+    if settings.replica_urls:
+        app.add_middleware(ReadAfterWriteMiddleware, sticky_seconds=settings.DB_READ_AFTER_WRITE_SECONDS)
 
     # Exception handlers
     @app.exception_handler(RequestValidationError)
@@ -154,29 +148,21 @@ def create_app() -> FastAPI:
     # Health check endpoint
     @app.get("/healthz", response_model=schemas.HealthResponse)
     async def health_check():
-        """Health check endpoint"""
-        try:
-            # Test database connection
-            from app.db.session import SessionLocal
-            db = SessionLocal()
-            try:
-                db.execute("SELECT 1")
-                db_status = "healthy"
-            except Exception:
-                db_status = "unhealthy"
-            finally:
-                db.close()
-
-            return schemas.HealthResponse(
-                status="healthy" if db_status == "healthy" else "degraded",
-                timestamp=datetime.utcnow()
-            )
-        except Exception as e:
-            logger.error(f"Health check failed: {str(e)}")
-            return schemas.HealthResponse(
-                status="unhealthy",
-                timestamp=datetime.utcnow()
-            )
+        """Health check endpoint, served from the last background check"""
+        return Response(content=health_monitor.body, media_type="application/json")
+
+    # Readiness endpoint
+    @app.get("/readyz", response_model=schemas.ReadinessResponse)
+    async def readiness_check():
+        """Readiness: health checks, pool saturation and scheduler state; 503 when not ready"""
+        result = readiness(health_monitor, scheduler_state())
+        return FastJSONResponse(result, status_code=200 if result["status"] == "ready" else 503)
+
+    # Metrics endpoint (Prometheus text format)
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def metrics():
+        """Connection pool and request latency metrics"""
+        return render_prometheus()
 
     # Root endpoint
     @app.get("/")
@@ -0,0 +1,171 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import structlog
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, aliased
+
+from app.db import models
+from app.services.scoring import ScoringFunction
+
+logger = structlog.get_logger()
+
+FEATURE_COLUMNS = (
+    "stored_score",
+    "user_birth_year",
+    "target_birth_year",
+    "user_region_code",
+    "target_region_code",
+    "region_text_match",
+    "target_intro_len",
+    "target_photo_count",
+)
+
+
+@dataclass
+class History:
+    """Historical recommendations as columnar arrays (one row per recommendation)"""
+    group: np.ndarray  # Dense id of the (batch_week, user_id) deck the row belongs to
+    liked: np.ndarray
+    matched: np.ndarray
+    features: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.group)
+
+
+def load_history(
+    db: Session,
+    week_from: str,
+    week_to: str,
+    chunk_size: int = 50000
+) -> History:
+    """Load recommendations, likes and matches for a range of batch weeks
+
+    Candidate features come from the current profiles, not from the profiles
+    as they were when the recommendation was made.
+    """
+    rec = models.Recommendation
+    user_profile = aliased(models.Profile)
+    target_profile = aliased(models.Profile)
+
+    query = (
+        db.query(
+            func.dense_rank().over(order_by=(rec.batch_week, rec.user_id)),
+            models.Like.id.isnot(None),
+            models.Match.id.isnot(None),
+            rec.score,
+            user_profile.birth_year,
+            target_profile.birth_year,
+            func.coalesce(user_profile.region_code, -1),
+            func.coalesce(target_profile.region_code, -1),
+            func.coalesce(user_profile.region == target_profile.region, False),
+            func.coalesce(func.length(target_profile.intro), 0),
+            func.coalesce(func.json_array_length(target_profile.photos), 0),
+        )
+        .join(user_profile, user_profile.user_id == rec.user_id)
+        .join(target_profile, target_profile.user_id == rec.target_user_id)
+        .outerjoin(
+            models.Like,
+            and_(
+                models.Like.from_user == rec.user_id,
+                models.Like.to_user == rec.target_user_id,
+                models.Like.batch_week == rec.batch_week
+            )
+        )
+        .outerjoin(
+            models.Match,
+            and_(
+                models.Match.user_a == func.least(rec.user_id, rec.target_user_id),
+                models.Match.user_b == func.greatest(rec.user_id, rec.target_user_id)
+            )
+        )
+        .filter(rec.batch_week >= week_from, rec.batch_week <= week_to)
+    )
+
+    columns: List[List] = [[] for _ in range(3 + len(FEATURE_COLUMNS))]
+    result = db.execute(query.statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        for column, values in zip(columns, zip(*rows)):
+            column.extend(values)
+
+    logger.info("Loaded recommendation history", week_from=week_from, week_to=week_to, rows=len(columns[0]))
+
+    dtypes = (np.float64, np.int32, np.int32, np.int16, np.int16, bool, np.int32, np.int32)
+    return History(
+        group=np.asarray(columns[0], dtype=np.int64) - 1,
+        liked=np.asarray(columns[1], dtype=bool),
+        matched=np.asarray(columns[2], dtype=bool),
+        features={
+            name: np.asarray(values, dtype=dtype)
+            for name, values, dtype in zip(FEATURE_COLUMNS, columns[3:], dtypes)
+        }
+    )
+
+
+def _ranks_within_group(group: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """Rank (0 = best) of each row within its group, ordered by descending score"""
+    order = np.lexsort((-scores, group))
+    sorted_group = group[order]
+    starts = np.flatnonzero(np.r_[True, sorted_group[1:] != sorted_group[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order)) - group_start
+    return ranks
+
+
+def evaluate(history: History, scoring_function: ScoringFunction, k: int = 5) -> Dict[str, float]:
+    """Re-rank each historical deck with scoring_function and measure the top k"""
+    if len(history) == 0:
+        return {"decks": 0, "precision_at_k": 0.0, "like_rate": 0.0, "match_rate": 0.0}
+
+    scores = np.asarray(scoring_function(history.features), dtype=np.float64)
+    top = _ranks_within_group(history.group, scores) < k
+
+    decks = int(history.group.max()) + 1
+    deck_sizes = np.bincount(history.group, minlength=decks)
+    deck_likes = np.bincount(history.group, weights=history.liked & top, minlength=decks)
+    shown = top.sum()
+
+    return {
+        "decks": decks,
+        "precision_at_k": float(np.mean(deck_likes / np.minimum(deck_sizes, k))),
+        "like_rate": float((history.liked & top).sum() / shown),
+        "match_rate": float((history.matched & top).sum() / shown),
+    }
+
+
+def compare(
+    history: History,
+    scoring_functions: Dict[str, ScoringFunction],
+    k: int = 5,
+    baseline: Optional[str] = None
+) -> Dict[str, Dict[str, float]]:
+    """Evaluate several scoring functions, with deltas against a baseline"""
+    results = {name: evaluate(history, fn, k) for name, fn in scoring_functions.items()}
+
+    if baseline in results:
+        reference = results[baseline]
+        for metrics in results.values():
+            for metric in ("precision_at_k", "like_rate", "match_rate"):
+                metrics[f"{metric}_delta"] = metrics[metric] - reference[metric]
+
+    return results
+
+
+def format_report(results: Dict[str, Dict[str, float]], k: int) -> str:
+    """Render comparison results as a plain-text table"""
+    header = f"{'scoring':<20}{'precision@' + str(k):>14}{'like rate':>12}{'match rate':>12}"
+    lines = [header, "-" * len(header)]
+    for name, metrics in results.items():
+        line = (
+            f"{name:<20}"
+            f"{metrics['precision_at_k']:>14.4f}"
+            f"{metrics['like_rate']:>12.4f}"
+            f"{metrics['match_rate']:>12.4f}"
+        )
+        if "precision_at_k_delta" in metrics:
+            line += f"   (Δp@k {metrics['precision_at_k_delta']:+.4f})"
+        lines.append(line)
+    return "\n".join(lines)
@@ -1,57 +1,194 @@
-from typing import Dict, Any
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+import hashlib
+import numpy as np
 import structlog
-from sqlalchemy.orm import Session
+from sqlalchemy import BigInteger, String, and_, cast, exists, func, literal
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.orm import Session, aliased, contains_eager
 
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.core.tracing import span
+from app.db.session import BatchSessionLocal
 from app.db import models
 from app.db.crud import recommendation as crud_recommendation, user as crud_user
+from app.services.scoring import ScoringStrategy, assign_strategy, build_features, get_strategy
+from app.services.snapshot import Snapshot, build_snapshot, snapshot_features
 
 logger = structlog.get_logger()
 
 
-def build_weekly_recommendations(week_label: str) -> Dict[str, Any]:
-    """Build weekly recommendations for all users"""
-    db = SessionLocal()
+# Delivery order of the weekly build, highest priority first
+PRIORITY_TIERS = ("pending_likes", "active", "new", "dormant")
+
+
+def delivery_bucket(user_id: str, buckets: int) -> int:
+    """Stable hash bucket of a user for staggered delivery"""
+    if buckets <= 1:
+        return 0
+    digest = hashlib.md5(f"delivery:{user_id}".encode()).hexdigest()
+    return int(digest[:15], 16) % buckets
+
+
+def delivery_bucket_sql(user_id_column, buckets: int):
+    """PostgreSQL expression of delivery_bucket, so a bucket run only loads its own users
+
+    The first 15 hex digits of the md5 are cast through bit(60), which keeps
+    the bigint positive.
+    """
+    digest = func.substr(func.md5(literal("delivery:") + cast(user_id_column, String)), 1, 15)
+    return func.mod(cast(cast(literal("x") + digest, BIT(60)), BigInteger), buckets)
+
+
+def get_priority_tiers(db: Session, users: List[models.User]) -> Dict[str, List[models.User]]:
+    """Split users into delivery tiers: pending likes, recently active, new signups, dormant"""
+    since = datetime.now(timezone.utc) - timedelta(days=settings.RECS_ACTIVE_DAYS)
+
+    # Users with a recent like they haven't answered
+    reverse_like = aliased(models.Like)
+    pending_likes = {
+        str(row[0]) for row in (
+            db.query(models.Like.to_user)
+            .filter(
+                models.Like.created_at >= since,
+                ~exists().where(and_(
+                    reverse_like.from_user == models.Like.to_user,
+                    reverse_like.to_user == models.Like.from_user
+                ))
+            )
+            .distinct()
+        )
+    }
+
+    # Users who sent a like recently
+    active = {
+        str(row[0]) for row in (
+            db.query(models.Like.from_user)
+            .filter(models.Like.created_at >= since)
+            .distinct()
+        )
+    }
+
+    tiers: Dict[str, List[models.User]] = {tier: [] for tier in PRIORITY_TIERS}
+    for user in users:
+        user_id = str(user.id)
+        if user_id in pending_likes:
+            tiers["pending_likes"].append(user)
+        elif user_id in active:
+            tiers["active"].append(user)
+        elif user.created_at and user.created_at >= since:
+            tiers["new"].append(user)
+        else:
+            tiers["dormant"].append(user)
+    return tiers
+
+
+def refresh_population_snapshot(db: Session) -> None:
+    """Rebuild the population snapshot at SNAPSHOT_PATH (no-op when unset)"""
+    if settings.SNAPSHOT_PATH:
+        build_snapshot(db, settings.SNAPSHOT_PATH)
+
+
+def open_population_snapshot(db: Session, rebuild: bool) -> Optional[Snapshot]:
+    """Map the population snapshot for scoring, or None to score from ORM rows
+
+    Bucket runs of a staggered build reuse the snapshot built when the buckets
+    were scheduled; one older than the stagger window plus an hour is ignored.
+    """
+    if not settings.SNAPSHOT_PATH:
+        return None
+    try:
+        if rebuild:
+            refresh_population_snapshot(db)
+        snapshot = Snapshot(settings.SNAPSHOT_PATH)
+    except Exception as e:
+        logger.warning("Population snapshot unavailable, scoring from database rows", error=str(e))
+        return None
+
+    max_age = timedelta(minutes=settings.RECS_STAGGER_WINDOW_MINUTES, hours=1)
+    if datetime.utcnow() - snapshot.created_at > max_age:
+        logger.warning("Population snapshot is stale, scoring from database rows", created_at=str(snapshot.created_at))
+        snapshot.close()
+        return None
+    return snapshot
+
+
+def build_weekly_recommendations(week_label: str, bucket: Optional[int] = None, buckets: int = 1) -> Dict[str, Any]:
+    """Build weekly recommendations for all users (or one delivery bucket), highest priority first
+
+    Scoring features come from the memory-mapped population snapshot, rebuilt
+    at the start of a full build, and from ORM rows for users it lacks.
+    """
+    db = BatchSessionLocal()
+    snapshot = None
     result = {
         "week": week_label,
+        "bucket": bucket,
         "users_processed": 0,
         "recommendations_created": 0,
+        "strategies": {},
+        "tiers": {},
         "errors": []
     }
 
     try:
         # Get all active users with profiles and preferences
-        users = (
-            db.query(models.User)
-            .join(models.Profile, models.User.id == models.Profile.user_id)
-            .join(models.Preferences, models.User.id == models.Preferences.user_id)
-            .filter(
-                models.User.banned == False,
-                models.User.role != 'admin'
+        with span("recs.load_users") as stage:
+            query = (
+                db.query(models.User)
+                .join(models.Profile, models.User.id == models.Profile.user_id)
+                .join(models.Preferences, models.User.id == models.Preferences.user_id)
+                .options(contains_eager(models.User.profile))
+                .filter(
+                    models.User.banned == False,
+                    models.User.role != 'admin'
+                )
             )
-            .all()
-        )
+            in_sql = db.get_bind().dialect.name == "postgresql"
+            if bucket is not None and in_sql:
+                query = query.filter(delivery_bucket_sql(models.User.id, buckets) == bucket)
+            users = query.all()
 
-        logger.info(f"Building recommendations for {len(users)} users", week=week_label)
+            if bucket is not None and not in_sql:
+                users = [user for user in users if delivery_bucket(str(user.id), buckets) == bucket]
+            if stage is not None:
+                stage.set_attribute("users", len(users))
 
-        for user in users:
-            try:
-                user_recommendations = build_recommendations_for_user(db, user, week_label)
-                result["users_processed"] += 1
-                result["recommendations_created"] += user_recommendations
+        logger.info(f"Building recommendations for {len(users)} users", week=week_label, bucket=bucket)
 
-            except Exception as e:
-                logger.error(f"Failed to build recommendations for user {user.id}: {str(e)}")
-                result["errors"].append({
-                    "user_id": str(user.id),
-                    "error": str(e)
-                })
+        with span("recs.snapshot"):
+            snapshot = open_population_snapshot(db, rebuild=bucket is None)
+
+        with span("recs.priority_tiers"):
+            tiers = get_priority_tiers(db, users)
+
+        for tier, tier_users in tiers.items():
+            tier_result = {"users": len(tier_users), "users_processed": 0, "recommendations_created": 0, "errors": []}
+            with span("recs.tier", tier=tier, users=len(tier_users)):
+                build_recommendations_for_users(
+                    db, tier_users, week_label, tier_result, result["strategies"], snapshot
+                )
+
+            result["users_processed"] += tier_result["users_processed"]
+            result["recommendations_created"] += tier_result["recommendations_created"]
+            result["errors"].extend(tier_result.pop("errors"))
+            result["tiers"][tier] = tier_result
+
+            logger.info(
+                f"Completed priority tier {tier}",
+                week=week_label,
+                bucket=bucket,
+                **tier_result
+            )
 
         logger.info(
             f"Completed recommendation generation",
             week=week_label,
+            bucket=bucket,
             users_processed=result["users_processed"],
             recommendations_created=result["recommendations_created"],
+            strategies=result["strategies"],
             errors_count=len(result["errors"])
         )
 
@@ -60,42 +197,160 @@ def build_weekly_recommendations(week_label: str) -> Dict[str, Any]:
         result["errors"].append({"general_error": str(e)})
 
     finally:
+        if snapshot is not None:
+            snapshot.close()
         db.close()
 
     return result
 
 
-def build_recommendations_for_user(db: Session, user, week_label: str, max_recommendations: int = 10) -> int:
-    """Build recommendations for a single user"""
+def build_recommendations_for_users(
+    db: Session,
+    users: List[models.User],
+    week_label: str,
+    result: Dict[str, Any],
+    strategy_counts: Dict[str, int],
+    snapshot: Optional[Snapshot] = None
+) -> None:
+    """Group users by their A/B strategy and score each group in bulk"""
+    cohorts: Dict[str, List[models.User]] = defaultdict(list)
+    for user in users:
+        cohorts[assign_strategy(str(user.id))].append(user)
+
+    for strategy_name, cohort in cohorts.items():
+        strategy_counts[strategy_name] = strategy_counts.get(strategy_name, 0) + len(cohort)
+        try:
+            strategy = get_strategy(strategy_name)
+        except ValueError as e:
+            logger.error(f"Skipping {len(cohort)} users: {str(e)}", week=week_label)
+            result["errors"].append({"strategy": strategy_name, "error": str(e)})
+            continue
+
+        chunk_size = settings.SCORING_CHUNK_SIZE
+        for start in range(0, len(cohort), chunk_size):
+            build_recommendations_for_cohort(
+                db, cohort[start:start + chunk_size], strategy, week_label, result, snapshot=snapshot
+            )
+
+
+def get_new_candidates(db: Session, user) -> List[models.User]:
+    """Get potential matches for a user that were not recently exposed"""
     user_id = str(user.id)
 
     # Get recently exposed users (to avoid showing same users repeatedly)
-    recent_exposures = crud_recommendation.get_recent_exposures(db, user_id, weeks=12)
+    recent_exposures = set(crud_recommendation.get_recent_exposures(db, user_id, weeks=12))
 
     # Get potential matches based on preferences
     candidates = crud_recommendation.get_potential_matches(db, user_id)
 
     # Filter out recently exposed candidates
-    filtered_candidates = [
+    return [
         candidate for candidate in candidates
         if str(candidate.id) not in recent_exposures
     ]
 
-    if not filtered_candidates:
-        logger.info(f"No new candidates for user {user_id}", week=week_label)
-        return 0
 
-    # Score candidates
-    scored_candidates = []
-    for candidate in filtered_candidates:
-        score = crud_recommendation.calculate_match_score(user, candidate)
-        scored_candidates.append((candidate, score))
+def build_pair_features(
+    strategy: ScoringStrategy,
+    pairs: List[Tuple[models.User, models.User]],
+    snapshot: Optional[Snapshot] = None
+) -> Dict[str, np.ndarray]:
+    """Feature columns from snapshot rows, with ORM rows for pairs the snapshot lacks"""
+    if snapshot is None:
+        return build_features(strategy, pairs)
+
+    user_rows = snapshot.indices_of([user.id for user, _ in pairs])
+    candidate_rows = snapshot.indices_of([candidate.id for _, candidate in pairs])
+    missing = (user_rows < 0) | (candidate_rows < 0)
+    if missing.all():
+        return build_features(strategy, pairs)
+
+    features = snapshot_features(
+        snapshot, strategy.features, np.where(missing, 0, user_rows), np.where(missing, 0, candidate_rows)
+    )
+    if missing.any():
+        # Users who signed up after the snapshot, or candidates it leaves out
+        fallback = build_features(strategy, [pair for pair, lacking in zip(pairs, missing) if lacking])
+        for name, column in features.items():
+            column = column.astype(np.result_type(column, fallback[name]))
+            column[missing] = fallback[name]
+            features[name] = column
+    return features
+
+
+def build_recommendations_for_cohort(
+    db: Session,
+    users: List[models.User],
+    strategy: ScoringStrategy,
+    week_label: str,
+    result: Dict[str, Any],
+    max_recommendations: int = 10,
+    snapshot: Optional[Snapshot] = None
+) -> None:
+    """Build recommendations for users sharing a strategy, scoring all pairs in one pass"""
+    candidates_by_user: List[Tuple[models.User, List[models.User]]] = []
+    with span("recs.candidates", users=len(users)):
+        for user in users:
+            try:
+                candidates = get_new_candidates(db, user)
+            except Exception as e:
+                logger.error(f"Failed to build recommendations for user {user.id}: {str(e)}")
+                result["errors"].append({"user_id": str(user.id), "error": str(e)})
+                continue
+
+            if not candidates:
+                logger.info(f"No new candidates for user {user.id}", week=week_label)
+                result["users_processed"] += 1
+                continue
+
+            candidates_by_user.append((user, candidates))
+
+    pairs = [(user, candidate) for user, candidates in candidates_by_user for candidate in candidates]
+    if not pairs:
+        return
+
+    try:
+        with span("recs.score", strategy=strategy.name, pairs=len(pairs)):
+            scores = strategy.function(build_pair_features(strategy, pairs, snapshot))
+    except Exception as e:
+        logger.error(f"Failed to score {len(candidates_by_user)} users with {strategy.name}: {str(e)}")
+        result["errors"].extend(
+            {"user_id": str(user.id), "error": str(e)} for user, _ in candidates_by_user
+        )
+        return
 
-    # Sort by score and take top candidates
-    scored_candidates.sort(key=lambda x: x[1], reverse=True)
-    top_candidates = scored_candidates[:max_recommendations]
+    with span("recs.save", users=len(candidates_by_user)):
+        offset = 0
+        for user, candidates in candidates_by_user:
+            user_scores = scores[offset:offset + len(candidates)]
+            offset += len(candidates)
+
+            # Take top candidates by score
+            top = np.argsort(-user_scores, kind="stable")[:max_recommendations]
+            try:
+                result["recommendations_created"] += save_recommendations(
+                    db,
+                    user,
+                    [(candidates[i], float(user_scores[i])) for i in top],
+                    week_label,
+                    strategy.name
+                )
+                result["users_processed"] += 1
+            except Exception as e:
+                logger.error(f"Failed to build recommendations for user {user.id}: {str(e)}")
+                result["errors"].append({"user_id": str(user.id), "error": str(e)})
+
+
+def save_recommendations(
+    db: Session,
+    user,
+    top_candidates: List[Tuple[models.User, float]],
+    week_label: str,
+    strategy_name: str
+) -> int:
+    """Store a user's top scored candidates as recommendations"""
+    user_id = str(user.id)
 
-    # Create recommendations
     recommendations_created = 0
     for candidate, score in top_candidates:
         try:
@@ -112,7 +367,7 @@ def build_recommendations_for_user(db: Session, user, week_label: str, max_recom
 
             if not existing:
                 crud_recommendation.create_recommendation(
-                    db, user_id, str(candidate.id), week_label, float(score)
+                    db, user_id, str(candidate.id), week_label, score, strategy_name
                 )
                 crud_recommendation.log_exposure(
                     db, user_id, str(candidate.id), "weekly_rec"
@@ -126,7 +381,8 @@ def build_recommendations_for_user(db: Session, user, week_label: str, max_recom
 
     logger.info(
         f"Created {recommendations_created} recommendations for user {user_id}",
-        week=week_label
+        week=week_label,
+        strategy=strategy_name
     )
 
-    return recommendations_created
\ No newline at end of file
+    return recommendations_created
@@ -0,0 +1,147 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.regions import REGION_AFFINITY
+
+# Scoring functions take a dict of equally sized feature columns (one row per
+# user/candidate pair) and return one score per row.
+ScoringFunction = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+# Affinity matrix padded with a zero row/column so that region code -1
+# ("unknown region") indexes to zero affinity
+_AFFINITY = np.zeros((len(REGION_AFFINITY) + 1, len(REGION_AFFINITY) + 1), dtype=np.float32)
+_AFFINITY[:-1, :-1] = REGION_AFFINITY
+
+
+def _code(region_code) -> int:
+    return -1 if region_code is None else region_code
+
+
+# Feature name -> (dtype, extractor(user, candidate)) for building feature
+# columns from ORM users with loaded profiles
+FEATURE_EXTRACTORS: Dict[str, Tuple[type, Callable]] = {
+    "user_birth_year": (np.int32, lambda u, c: u.profile.birth_year),
+    "target_birth_year": (np.int32, lambda u, c: c.profile.birth_year),
+    "user_region_code": (np.int16, lambda u, c: _code(u.profile.region_code)),
+    "target_region_code": (np.int16, lambda u, c: _code(c.profile.region_code)),
+    "region_text_match": (bool, lambda u, c: bool(u.profile.region) and u.profile.region == c.profile.region),
+    "target_intro_len": (np.int32, lambda u, c: len(c.profile.intro or "")),
+    "target_photo_count": (np.int32, lambda u, c: len(c.profile.photos or [])),
+}
+
+
+@dataclass(frozen=True)
+class ScoringStrategy:
+    """A named, vectorized scoring function and the feature columns it reads"""
+    name: str
+    function: ScoringFunction
+    features: Tuple[str, ...]
+
+
+STRATEGIES: Dict[str, ScoringStrategy] = {}
+
+
+def register_strategy(name: str, features: Sequence[str]):
+    """Register a vectorized scoring function as a strategy"""
+    unknown = set(features) - set(FEATURE_EXTRACTORS)
+    if unknown:
+        raise ValueError(f"Unknown features for strategy {name}: {', '.join(sorted(unknown))}")
+
+    def decorator(function: ScoringFunction) -> ScoringFunction:
+        STRATEGIES[name] = ScoringStrategy(name=name, function=function, features=tuple(features))
+        return function
+
+    return decorator
+
+
+def get_strategy(name: str) -> ScoringStrategy:
+    """Get a registered strategy by name"""
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown scoring strategy: {name}")
+
+
+@register_strategy("baseline", features=(
+    "user_birth_year",
+    "target_birth_year",
+    "user_region_code",
+    "target_region_code",
+    "region_text_match",
+    "target_intro_len",
+    "target_photo_count",
+))
+def baseline_score(features: Dict[str, np.ndarray]) -> np.ndarray:
+    """Vectorized equivalent of crud.recommendation.calculate_match_score"""
+    age_diff = np.abs(features["user_birth_year"] - features["target_birth_year"])
+    score = np.select([age_diff <= 2, age_diff <= 5, age_diff <= 10], [3.0, 2.0, 1.0], 0.0)
+
+    user_region = features["user_region_code"]
+    target_region = features["target_region_code"]
+    known = (user_region >= 0) & (target_region >= 0)
+    score += np.where(
+        known,
+        2.0 * _AFFINITY[user_region, target_region],
+        np.where(features["region_text_match"], 2.0, 0.0),
+    )
+
+    score += features["target_intro_len"] > 20
+    score += features["target_photo_count"] >= 2
+
+    return score + 1.0
+
+
+def stored_score(features: Dict[str, np.ndarray]) -> np.ndarray:
+    """Score that was stored on the recommendation when it was created"""
+    return features["stored_score"]
+
+
+def scoring_functions() -> Dict[str, ScoringFunction]:
+    """Functions available to the offline evaluator"""
+    return {
+        "stored": stored_score,
+        **{name: strategy.function for name, strategy in STRATEGIES.items()},
+    }
+
+
+def _parse_weights(spec: str) -> List[Tuple[str, int]]:
+    """Parse "name:weight,name:weight" into (name, weight) pairs"""
+    weights = []
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition(":")
+        weights.append((name.strip(), int(weight or 1)))
+    return weights
+
+
+def assign_strategy(user_id: str, spec: Optional[str] = None) -> str:
+    """Deterministically assign a user to a strategy by hashing the user id"""
+    weights = _parse_weights(spec if spec is not None else settings.SCORING_STRATEGY_WEIGHTS)
+    total = sum(weight for _, weight in weights)
+    if total <= 0:
+        return "baseline"
+
+    digest = hashlib.sha256(str(user_id).encode()).digest()
+    bucket = int.from_bytes(digest[:8], "big") % total
+    for name, weight in weights:
+        if bucket < weight:
+            return name
+        bucket -= weight
+    return weights[-1][0]
+
+
+def build_features(strategy: ScoringStrategy, pairs: Sequence[Tuple]) -> Dict[str, np.ndarray]:
+    """Build the strategy's feature columns for (user, candidate) pairs"""
+    return {
+        name: np.fromiter(
+            (FEATURE_EXTRACTORS[name][1](user, candidate) for user, candidate in pairs),
+            dtype=FEATURE_EXTRACTORS[name][0],
+            count=len(pairs)
+        )
+        for name in strategy.features
+    }
@@ -0,0 +1,207 @@
+import json
+import mmap
+import os
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Union
+import uuid
+
+import numpy as np
+import structlog
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+logger = structlog.get_logger()
+
+MAGIC = b"SHHSNAP2"
+ALIGNMENT = 64
+
+GENDER_CODES = {"M": 0, "F": 1}
+
+# Column name -> (dtype, per-row shape)
+SNAPSHOT_COLUMNS = {
+    "user_id": (np.uint8, (16,)),
+    "birth_year": (np.int16, ()),
+    "gender": (np.int8, ()),
+    "target_gender": (np.int8, ()),
+    "region_code": (np.int16, ()),
+    "region_id": (np.int32, ()),  # Index into the header's region texts, -1 when unset
+    "age_min": (np.int16, ()),
+    "age_max": (np.int16, ()),
+    "intro_len": (np.int32, ()),
+    "photo_count": (np.int16, ()),
+}
+
+
+def write_snapshot(path: str, columns: Dict[str, np.ndarray], regions: Sequence[str] = ()) -> None:
+    """Write columns to a snapshot file, sorted by user id, replacing it atomically
+
+    regions are the distinct region texts that region_id indexes into.
+    """
+    rows = len(columns["user_id"])
+    order = np.argsort(np.ascontiguousarray(columns["user_id"]).view("S16").ravel(), kind="stable")
+
+    header = {"rows": rows, "created_at": datetime.utcnow().isoformat(), "regions": list(regions), "columns": []}
+    blocks = []
+    offset = 0
+    for name, (dtype, shape) in SNAPSHOT_COLUMNS.items():
+        data = np.ascontiguousarray(np.asarray(columns[name], dtype=dtype)[order]).reshape((rows,) + shape)
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        header["columns"].append({"name": name, "offset": offset})
+        blocks.append((offset, data))
+        offset += data.nbytes
+
+    header_bytes = json.dumps(header).encode()
+    data_start = -(-(len(MAGIC) + 4 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(4, "little"))
+        f.write(header_bytes)
+        for block_offset, data in blocks:
+            f.seek(data_start + block_offset)
+            f.write(data.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def build_snapshot(db: Session, path: str, chunk_size: int = 50000) -> int:
+    """Export the active population (users with profile and preferences) to path"""
+    query = (
+        db.query(
+            models.User.id,
+            models.Profile.birth_year,
+            models.Profile.gender,
+            models.Preferences.target_gender,
+            models.Profile.region_code,
+            models.Profile.region,
+            models.Preferences.age_min,
+            models.Preferences.age_max,
+            func.coalesce(func.length(models.Profile.intro), 0),
+            func.coalesce(func.json_array_length(models.Profile.photos), 0),
+        )
+        .join(models.Profile, models.User.id == models.Profile.user_id)
+        .join(models.Preferences, models.User.id == models.Preferences.user_id)
+        .filter(
+            models.User.banned == False,
+            models.User.role != 'admin'
+        )
+    )
+
+    names = list(SNAPSHOT_COLUMNS)
+    columns: Dict[str, List] = {name: [] for name in names}
+    regions: Dict[str, int] = {}
+    result = db.execute(query.statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        for (user_id, birth_year, gender, target_gender, region_code, region,
+             age_min, age_max, intro_len, photo_count) in rows:
+            columns["user_id"].append(user_id.bytes)
+            columns["birth_year"].append(birth_year)
+            columns["gender"].append(GENDER_CODES[gender])
+            columns["target_gender"].append(GENDER_CODES[target_gender])
+            columns["region_code"].append(-1 if region_code is None else region_code)
+            columns["region_id"].append(regions.setdefault(region, len(regions)) if region else -1)
+            columns["age_min"].append(age_min)
+            columns["age_max"].append(age_max)
+            columns["intro_len"].append(intro_len)
+            columns["photo_count"].append(photo_count)
+
+    arrays = {name: values for name, values in columns.items() if name != "user_id"}
+    arrays["user_id"] = np.frombuffer(b"".join(columns["user_id"]), dtype=np.uint8).reshape(-1, 16)
+    write_snapshot(path, arrays, list(regions))
+
+    logger.info("Built population snapshot", path=path, rows=len(arrays["user_id"]))
+    return len(arrays["user_id"])
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a population snapshot
+
+    Every process mapping the same file shares one physical copy of the data.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a population snapshot: {path}")
+
+        header_length = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 4], "little")
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(self._mmap[header_start:header_start + header_length])
+        data_start = -(-(header_start + header_length) // ALIGNMENT) * ALIGNMENT
+
+        rows = self.header["rows"]
+        self.columns: Dict[str, np.ndarray] = {}
+        for column in self.header["columns"]:
+            dtype, shape = SNAPSHOT_COLUMNS[column["name"]]
+            self.columns[column["name"]] = np.frombuffer(
+                self._mmap,
+                dtype=dtype,
+                count=rows * int(np.prod(shape, dtype=int)),
+                offset=data_start + column["offset"]
+            ).reshape((rows,) + shape)
+        self._ids = self.columns["user_id"].view("S16").ravel()
+
+    def __len__(self) -> int:
+        return self.header["rows"]
+
+    @property
+    def created_at(self) -> datetime:
+        """When the snapshot was built (naive UTC)"""
+        return datetime.fromisoformat(self.header["created_at"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def index_of(self, user_id: Union[str, uuid.UUID]) -> Optional[int]:
+        """Row index of a user, or None if not in the snapshot"""
+        key = np.frombuffer(uuid.UUID(str(user_id)).bytes, dtype=np.uint8).view("S16")[0]
+        index = int(np.searchsorted(self._ids, key))
+        if index < len(self._ids) and self._ids[index] == key:
+            return index
+        return None
+
+    def indices_of(self, user_ids: Sequence[Union[str, uuid.UUID]]) -> np.ndarray:
+        """Row indices of many users, -1 for users not in the snapshot"""
+        keys = np.frombuffer(b"".join(uuid.UUID(str(user_id)).bytes for user_id in user_ids), dtype="S16")
+        indices = np.searchsorted(self._ids, keys)
+        found = indices < len(self._ids)
+        found[found] = self._ids[indices[found]] == keys[found]
+        return np.where(found, indices, -1)
+
+    def user_id(self, index: int) -> uuid.UUID:
+        """User id stored at a row index"""
+        return uuid.UUID(bytes=self.columns["user_id"][index].tobytes())
+
+    def close(self) -> None:
+        self.columns = {}
+        self._ids = None
+        self._mmap.close()
+
+
+# Scoring feature name -> builder(snapshot, user_rows, candidate_rows)
+SNAPSHOT_FEATURES: Dict[str, Callable[[Snapshot, np.ndarray, np.ndarray], np.ndarray]] = {
+    "user_birth_year": lambda s, u, c: s["birth_year"][u],
+    "target_birth_year": lambda s, u, c: s["birth_year"][c],
+    "user_region_code": lambda s, u, c: s["region_code"][u],
+    "target_region_code": lambda s, u, c: s["region_code"][c],
+    "region_text_match": lambda s, u, c: (s["region_id"][u] >= 0) & (s["region_id"][u] == s["region_id"][c]),
+    "target_intro_len": lambda s, u, c: s["intro_len"][c],
+    "target_photo_count": lambda s, u, c: s["photo_count"][c],
+}
+
+
+def snapshot_features(
+    snapshot: Snapshot,
+    features: Sequence[str],
+    user_rows: np.ndarray,
+    candidate_rows: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Build scoring feature columns for (user, candidate) row index pairs"""
+    return {name: SNAPSHOT_FEATURES[name](snapshot, user_rows, candidate_rows) for name in features}
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-field Pydantic profile construction vs. the shared serializer"""
+
+import json
+import sys
+import timeit
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.db import schemas
+from app.db.serializers import dumps_profiles, serialize_profiles
+
+
+def make_profiles(count: int):
+    return [
+        SimpleNamespace(
+            user_id=uuid.uuid4(),
+            nickname=f"user{i}",
+            gender="MF"[i % 2],
+            birth_year=1985 + i % 15,
+            height=160 + i % 25,
+            region="서울 강남구",
+            job="engineer",
+            intro="안녕하세요 " * 20,
+            photos=[f"https://example.com/{i}/{n}.jpg" for n in range(3)],
+            visible={"age": True, "height": i % 2 == 0, "region": True, "job": i % 3 != 0, "intro": True}
+        )
+        for i in range(count)
+    ]
+
+
+def pydantic_path(profiles):
+    """What the routes did before: mask field by field, build models, validate and dump again"""
+    items = [
+        schemas.Profile(
+            user_id=p.user_id,
+            nickname=p.nickname,
+            gender=p.gender,
+            birth_year=p.birth_year if p.visible.get('age', True) else None,
+            height=p.height if p.visible.get('height', True) else None,
+            region=p.region if p.visible.get('region', True) else None,
+            job=p.job if p.visible.get('job', True) else None,
+            intro=p.intro if p.visible.get('intro', True) else None,
+            photos=p.photos,
+            visible=p.visible
+        )
+        for p in profiles
+    ]
+    return [schemas.Profile.model_validate(item).model_dump(mode="json") for item in items]
+
+
+def main(count: int = 1000, number: int = 20):
+    profiles = make_profiles(count)
+    assert pydantic_path(profiles) == serialize_profiles(profiles, "recommendation")
+
+    def encode(items):
+        return json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode()
+
+    stages = (
+        ("dicts", pydantic_path, lambda: serialize_profiles(profiles, "recommendation")),
+        ("JSON bytes", lambda p: encode(pydantic_path(p)), lambda: dumps_profiles(profiles, "recommendation")),
+    )
+    for stage, before, after in stages:
+        old = min(timeit.repeat(lambda: before(profiles), number=number, repeat=3)) / number
+        new = min(timeit.repeat(after, number=number, repeat=3)) / number
+        print(f"{stage:10s} pydantic {old * 1e3:7.2f} ms, serializer {new * 1e3:7.2f} ms "
+              f"per {count} profiles ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
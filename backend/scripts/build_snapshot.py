@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Export the active population to a memory-mappable snapshot file"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.db.session import BatchSessionLocal
+from app.services.snapshot import build_snapshot
+
+
+def main(path: str):
+    """Build the snapshot at path"""
+    db = BatchSessionLocal()
+    try:
+        started = time.perf_counter()
+        rows = build_snapshot(db, path)
+        print(f"Wrote {rows} users to {path} in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else settings.SNAPSHOT_PATH
+    if not path:
+        sys.exit("Usage: build_snapshot.py PATH (or set SNAPSHOT_PATH)")
+    main(path)
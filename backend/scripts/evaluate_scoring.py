@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Replay historical recommendations against scoring functions"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.db.session import BatchSessionLocal
+from app.services.evaluation import compare, format_report, load_history
+from app.services.scoring import scoring_functions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("week_from", help="First batch week, e.g. 2024-W01")
+    parser.add_argument("week_to", help="Last batch week, e.g. 2024-W52")
+    parser.add_argument("-k", type=int, default=5, help="Cut-off for precision@k")
+    parser.add_argument(
+        "--scoring",
+        default="stored,baseline",
+        help="Comma-separated scoring functions (stored or any registered strategy)"
+    )
+    parser.add_argument("--baseline", default="stored", help="Scoring function to compare against")
+    args = parser.parse_args()
+    available = scoring_functions()
+
+    names = [name.strip() for name in args.scoring.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        parser.error(f"Unknown scoring functions: {', '.join(unknown)}")
+
+    db = BatchSessionLocal()
+    try:
+        started = time.perf_counter()
+        history = load_history(db, args.week_from, args.week_to)
+        loaded = time.perf_counter()
+    finally:
+        db.close()
+
+    results = compare(
+        history,
+        {name: available[name] for name in names},
+        k=args.k,
+        baseline=args.baseline
+    )
+    finished = time.perf_counter()
+
+    print(f"Weeks {args.week_from}..{args.week_to}: {len(history)} recommendations")
+    print(f"Loaded in {loaded - started:.1f}s, evaluated in {finished - loaded:.2f}s\n")
+    print(format_report(results, args.k))
+
+
+if __name__ == "__main__":
+    main()
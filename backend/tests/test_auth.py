@@ -72,4 +72,31 @@ def test_get_me_with_auth(client: TestClient):
     data = response.json()
     assert "user" in data
     assert "profile" in data
-    assert "preferences" in data
\ No newline at end of file
+    assert "preferences" in data
+
+@pytest.mark.postgres
+def test_get_me_postgres(pg_client: TestClient, make_user):
+    """Test /auth/me with the user resolved through the auth cache"""
+    user, headers = make_user(nickname="테스트유저")
+    for _ in range(2):
+        response = pg_client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["user"]["id"] == str(user.id)
+        assert data["profile"]["nickname"] == "테스트유저"
+        assert data["preferences"]["target_gender"] == "F"
+
+    _, banned_headers = make_user(banned=True)
+    assert pg_client.get("/api/v1/auth/me", headers=banned_headers).status_code == 403
+
+
+@pytest.mark.postgres
+def test_sync_kakao_then_me_postgres(pg_client: TestClient):
+    """Test that /auth/me finds a user right after sign-up"""
+    response = pg_client.post("/api/v1/auth/sync-kakao", json={"kakaoUserId": "987654321", "nickname": "새유저"})
+    assert response.status_code == 200
+
+    headers = {"Authorization": f"Bearer {response.json()['jwt']}"}
+    response = pg_client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["profile"]["nickname"] == "새유저"
@@ -0,0 +1,36 @@
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_hit_and_miss():
+    """Test basic get/set with hit and miss counters"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_ttl_cache_expiry():
+    """Test that entries expire after their TTL"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test LRU eviction when the cache is full"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    cache.delete("a")
+    assert cache.get("a") is None
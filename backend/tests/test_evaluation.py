@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.core.regions import region_code
+from app.db.crud.recommendation import calculate_match_score
+from app.services.evaluation import History, evaluate
+from app.services.scoring import baseline_score
+
+
+def _user(birth_year, region, intro="", photos=()):
+    return SimpleNamespace(profile=SimpleNamespace(
+        birth_year=birth_year,
+        region=region,
+        region_code=region_code(region),
+        intro=intro,
+        photos=list(photos)
+    ))
+
+
+def test_baseline_score_matches_calculate_match_score():
+    """Test that the vectorized baseline reproduces the per-pair score"""
+    user = _user(1992, "서울 강남구")
+    candidates = [
+        _user(1993, "서울 마포구", intro="x" * 30, photos=["a", "b"]),
+        _user(1986, "인천"),
+        _user(1975, "부산", photos=["a"]),
+        _user(1990, "강남구"),
+        _user(1991, None, intro="short"),
+    ]
+
+    features = {
+        "user_birth_year": np.full(len(candidates), user.profile.birth_year),
+        "target_birth_year": np.array([c.profile.birth_year for c in candidates]),
+        "user_region_code": np.full(len(candidates), -1 if user.profile.region_code is None else user.profile.region_code),
+        "target_region_code": np.array([-1 if c.profile.region_code is None else c.profile.region_code for c in candidates]),
+        "region_text_match": np.array([c.profile.region == user.profile.region for c in candidates]),
+        "target_intro_len": np.array([len(c.profile.intro or "") for c in candidates]),
+        "target_photo_count": np.array([len(c.profile.photos) for c in candidates]),
+    }
+
+    expected = [calculate_match_score(user, c) for c in candidates]
+    np.testing.assert_allclose(baseline_score(features), expected, rtol=1e-6)
+
+
+def test_evaluate_metrics():
+    """Test precision@k, like rate and match rate on two decks"""
+    history = History(
+        group=np.array([0, 0, 0, 1, 1]),
+        liked=np.array([True, False, False, False, True]),
+        matched=np.array([True, False, False, False, False]),
+        features={"stored_score": np.array([3.0, 2.0, 1.0, 2.0, 1.0])}
+    )
+
+    metrics = evaluate(history, lambda f: f["stored_score"], k=1)
+    assert metrics["decks"] == 2
+    assert metrics["precision_at_k"] == 0.5
+    assert metrics["like_rate"] == 0.5
+    assert metrics["match_rate"] == 0.5
+
+    reversed_metrics = evaluate(history, lambda f: -f["stored_score"], k=1)
+    assert reversed_metrics["precision_at_k"] == 0.5
+    assert reversed_metrics["match_rate"] == 0.0
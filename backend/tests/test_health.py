@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import fakeredis
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import health
+from app.core.cache import set_redis_client
+from app.core.config import settings
+from app.core.health import HealthMonitor, readiness
+
+
+def _monitor(tmp_path):
+    return HealthMonitor(
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'health.db'}"), interval=10, timeout=1
+    )
+
+
+def test_healthy_with_database_and_redis(tmp_path, monkeypatch):
+    """Test that a passing database and Redis check reports healthy"""
+    monkeypatch.setattr(settings, "CACHE_REDIS_ENABLED", True)
+    set_redis_client(fakeredis.FakeRedis(decode_responses=True))
+    try:
+        monitor = _monitor(tmp_path)
+        assert asyncio.run(monitor.check()) == "healthy"
+    finally:
+        set_redis_client(None)
+
+    assert monitor.checks["database"]["status"] == "ok"
+    assert monitor.checks["redis"]["status"] == "ok"
+    assert json.loads(monitor.body)["status"] == "healthy"
+    assert not monitor.stale
+
+
+def test_redis_down_is_degraded(tmp_path, monkeypatch):
+    """Test that a failing Redis check degrades but a failing database is unhealthy"""
+    monkeypatch.setattr(settings, "CACHE_REDIS_ENABLED", True)
+    monkeypatch.setattr(health, "get_redis", lambda: None)
+    monitor = _monitor(tmp_path)
+    assert asyncio.run(monitor.check()) == "degraded"
+
+    async def database_down(engine):
+        raise ConnectionRefusedError("connection refused")
+
+    monkeypatch.setattr(health, "check_database", database_down)
+    assert asyncio.run(monitor.check()) == "unhealthy"
+    assert monitor.checks["database"]["status"] == "error"
+
+
+def test_readiness(tmp_path, monkeypatch):
+    """Test that readiness needs a completed check and fails on a saturated API pool"""
+    monkeypatch.setattr(settings, "CACHE_REDIS_ENABLED", False)
+    monitor = _monitor(tmp_path)
+    scheduler = {"running": False, "jobs": [], "last_runs": {}}
+    assert readiness(monitor, scheduler)["reasons"] == ["health unknown"]
+
+    asyncio.run(monitor.check())
+    assert readiness(monitor, scheduler)["status"] == "ready"
+
+    monkeypatch.setattr(health, "pool_saturation", lambda: {
+        "api_async": {"checked_out": 20, "capacity": 20, "saturation": 1.0, "timeouts": 3}
+    })
+    result = readiness(monitor, scheduler)
+    assert result["status"] == "not_ready"
+    assert result["reasons"] == ["pool api_async saturated"]
+
+
+def test_healthz_served_from_memory(client, monkeypatch):
+    """Test that /healthz returns the cached result and /readyz reports 503 until ready"""
+    monitor = health.health_monitor
+    monkeypatch.setattr(monitor, "status", "unknown")
+    monkeypatch.setattr(monitor, "checks", {})
+    monkeypatch.setattr(monitor, "checked_at", None)
+    monkeypatch.setattr(monitor, "body", b'{"status":"healthy","timestamp":"2025-01-01T00:00:00Z"}')
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["reasons"][0] == "health unknown"
+    assert "pools" in response.json()
@@ -0,0 +1,96 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.timing import RequestTimingMiddleware
+from app.db.instrumentation import (
+    QueryBudgetExceeded,
+    QueryLog,
+    assert_max_queries,
+    fingerprint,
+    install_query_counter,
+    query_budget,
+    track_queries,
+)
+
+install_query_counter()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_track_queries_counts_statements(engine):
+    """Test that statements inside the block are counted with their time"""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    assert stats.count == 2
+    assert stats.duration_ns > 0
+
+
+def test_assert_max_queries(engine):
+    """Test that going over the budget fails"""
+    with engine.connect() as conn:
+        with assert_max_queries(1):
+            conn.execute(text("SELECT 1"))
+        with pytest.raises(QueryBudgetExceeded):
+            with assert_max_queries(1):
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+
+def test_endpoint_query_budget(engine, monkeypatch):
+    """Test that a sync endpoint over its declared budget fails in the test environment"""
+    monkeypatch.setattr(settings, "APP_ENV", "test")
+    app = FastAPI()
+    app.add_middleware(RequestTimingMiddleware)
+
+    @app.get("/items/{count}")
+    @query_budget(2)
+    def items(count: int):
+        with engine.connect() as conn:
+            for _ in range(count):
+                conn.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/items/2").status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="/items/{count} ran 3 queries, budget 2"):
+        client.get("/items/3")
+
+
+def test_fingerprint_normalizes_literals_and_parameters():
+    """Test that statements differing only in values share a fingerprint"""
+    key, normalized = fingerprint("SELECT * FROM t WHERE a = 'it''s' AND b = 12 AND c IN (%(c_1)s, %(c_2)s)")
+    assert normalized == "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)"
+    assert fingerprint("SELECT  *  FROM t WHERE a = 'x' AND b = 3 AND c IN (%(c_1)s)")[0] == key
+    assert fingerprint("SELECT %(id)s::UUID FROM t1")[1] == "SELECT ?::UUID FROM t1"
+
+
+def test_query_log_top_and_rotation():
+    """Test per-fingerprint aggregates, ordering and the rolling window"""
+    log = QueryLog(window_seconds=60, max_fingerprints=2)
+    log.record("a", "SELECT a", 3_000_000)
+    log.record("a", "SELECT a", 1_000_000)
+    log.record("b", "SELECT b", 5_000_000)
+    log.record("c", "SELECT c", 1_000_000)
+
+    top = log.top(order_by="total")
+    assert [row["fingerprint"] for row in top] == ["b", "a", "other"]
+    assert top[1]["count"] == 2
+    assert top[1]["max_seconds"] == 0.003
+    assert log.top(limit=1, order_by="count")[0]["fingerprint"] == "a"
+
+    log._window_started -= 60
+    log.record("c", "SELECT c", 1_000_000)
+    assert {row["fingerprint"] for row in log.top()} == {"a", "b", "c", "other"}
+    log._window_started -= 60
+    assert [row["fingerprint"] for row in log.top()] == ["c"]
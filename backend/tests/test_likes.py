@@ -0,0 +1,151 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.crud import like as crud_like
+
+WEEK = "2025-W01"
+
+
+@pytest.mark.postgres
+def test_mutual_like_creates_match(pg_client: TestClient, pg_db, make_user):
+    """Test that the second of two reciprocal likes creates one pending match"""
+    user_a, headers_a = make_user()
+    user_b, headers_b = make_user()
+
+    response = pg_client.post("/api/v1/likes", json={"toUserId": str(user_b.id), "batchWeek": WEEK}, headers=headers_a)
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+    assert pg_db.query(models.Match).count() == 0
+
+    response = pg_client.post("/api/v1/likes", json={"toUserId": str(user_a.id), "batchWeek": WEEK}, headers=headers_b)
+    assert response.status_code == 200
+    matches = pg_db.query(models.Match).all()
+    assert len(matches) == 1
+    assert {matches[0].user_a, matches[0].user_b} == {user_a.id, user_b.id}
+    assert matches[0].status == "pending"
+
+
+@pytest.mark.postgres
+def test_like_target_errors(pg_client: TestClient, pg_db, make_user):
+    """Test that target_exists and target_banned map to 404 and 400, with no like stored"""
+    user, headers = make_user()
+    banned, _ = make_user(banned=True)
+
+    cases = [
+        (user.id, 400, "Cannot like yourself"),
+        (uuid.uuid4(), 404, "Target user not found"),
+        (banned.id, 400, "Cannot like banned user"),
+    ]
+    for to_user_id, status_code, detail in cases:
+        response = pg_client.post("/api/v1/likes", json={"toUserId": str(to_user_id), "batchWeek": WEEK}, headers=headers)
+        assert response.status_code == status_code
+        assert response.json()["detail"] == detail
+    assert pg_db.query(models.Like).count() == 0
+
+
+@pytest.mark.postgres
+def test_like_result_flags(pg_db, make_user):
+    """Test the row returned by create_like_and_match for new, repeated and missing targets"""
+    user, _ = make_user()
+    target, _ = make_user()
+    banned, _ = make_user(banned=True)
+
+    result = crud_like.create_like_and_match(pg_db, str(user.id), str(target.id), WEEK)
+    assert (result.target_exists, result.target_banned, result.match_id) == (True, False, None)
+    assert result.like_id is not None
+    assert crud_like.create_like_and_match(pg_db, str(user.id), str(target.id), WEEK).like_id is None
+
+    result = crud_like.create_like_and_match(pg_db, str(user.id), str(uuid.uuid4()), WEEK)
+    assert (result.target_exists, result.like_id) == (False, None)
+    result = crud_like.create_like_and_match(pg_db, str(user.id), str(banned.id), WEEK)
+    assert (result.target_exists, result.target_banned, result.like_id) == (True, True, None)
+
+
+@pytest.mark.postgres
+def test_concurrent_mutual_likes_create_one_match(pg_db, make_user):
+    """Test that two simultaneous reciprocal likes create exactly one match"""
+    engine = pg_db.get_bind()
+    pairs = [(make_user()[0].id, make_user()[0].id) for _ in range(10)]
+
+    def like(from_user_id, to_user_id, barrier):
+        with Session(bind=engine) as db:
+            barrier.wait()
+            return crud_like.create_like_and_match(db, str(from_user_id), str(to_user_id), WEEK)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for user_a_id, user_b_id in pairs:
+            barrier = threading.Barrier(2)
+            results = [
+                future.result() for future in [
+                    pool.submit(like, user_a_id, user_b_id, barrier),
+                    pool.submit(like, user_b_id, user_a_id, barrier),
+                ]
+            ]
+            assert sum(result.match_id is not None for result in results) == 1
+
+    for user_a_id, user_b_id in pairs:
+        matches = pg_db.query(models.Match).filter(
+            models.Match.user_a.in_([user_a_id, user_b_id]),
+            models.Match.user_b.in_([user_a_id, user_b_id])
+        ).count()
+        assert matches == 1
+
+
+@pytest.mark.postgres
+def test_batch_like_statuses(pg_client: TestClient, pg_db, make_user):
+    """Test the per-target statuses of POST /likes/batch and the matches it creates"""
+    user, headers = make_user()
+    fresh, _ = make_user()
+    liked_before, _ = make_user()
+    admirer, admirer_headers = make_user()
+    banned, _ = make_user(banned=True)
+    missing = uuid.uuid4()
+
+    crud_like.create_like_and_match(pg_db, str(user.id), str(liked_before.id), WEEK)
+    crud_like.create_like_and_match(pg_db, str(admirer.id), str(user.id), WEEK)
+
+    to_user_ids = [user.id, fresh.id, liked_before.id, admirer.id, banned.id, missing, fresh.id]
+    response = pg_client.post(
+        "/api/v1/likes/batch",
+        json={"toUserIds": [str(to_user_id) for to_user_id in to_user_ids], "batchWeek": WEEK},
+        headers=headers
+    )
+    assert response.status_code == 200
+    results = [(item["toUserId"], item["status"], item["matched"]) for item in response.json()["results"]]
+    assert results == [
+        (str(user.id), "self", False),
+        (str(fresh.id), "liked", False),
+        (str(liked_before.id), "already_liked", False),
+        (str(admirer.id), "liked", True),
+        (str(banned.id), "banned", False),
+        (str(missing), "not_found", False),
+    ]
+    assert pg_db.query(models.Match).count() == 1
+    assert pg_db.query(models.Like).filter(models.Like.from_user == user.id).count() == 3
+
+
+@pytest.mark.postgres
+def test_batch_like_validation(pg_client: TestClient, make_user, monkeypatch):
+    """Test that empty, oversized and malformed batches are rejected"""
+    _, headers = make_user()
+    monkeypatch.setattr(settings, "LIKE_BATCH_MAX_TARGETS", 2)
+
+    def post(to_user_ids):
+        return pg_client.post("/api/v1/likes/batch", json={"toUserIds": to_user_ids, "batchWeek": WEEK}, headers=headers)
+
+    assert post([]).status_code == 400
+    assert post([str(uuid.uuid4()) for _ in range(3)]).status_code == 400
+    assert post(["not-a-uuid"]).status_code == 422
+
+    # Duplicates count once against the limit
+    to_user_id = str(uuid.uuid4())
+    response = post([to_user_id, to_user_id, str(uuid.uuid4())])
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["results"]] == ["not_found", "not_found"]
@@ -0,0 +1,116 @@
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.db import models
+from app.db.crud import match as crud_match
+from app.db.pagination import encode_cursor
+
+
+def test_user_match_rows_compile_for_postgres():
+    """Test that each UNION ALL side is a parenthesized, ordered and limited index scan"""
+    cursor = encode_cursor([datetime(2025, 1, 1, tzinfo=timezone.utc), uuid.uuid4()])
+    sql = str(crud_match.user_match_rows_query(str(uuid.uuid4()), 3, cursor).compile(dialect=postgresql.dialect()))
+    sql = re.sub(r"\s+", " ", sql)
+
+    sides = re.findall(r"\((SELECT .*? LIMIT %\(param_\d+\)s)\)", sql)
+    assert len(sides) == 2 and " UNION ALL " in sql
+    for column, side in zip(("user_a", "user_b"), sides):
+        assert f"WHERE matches.{column} = " in side
+        assert "(matches.created_at, matches.id) < " in side
+        assert side.count(" OR ") == 0
+        assert "ORDER BY matches.created_at DESC, matches.id DESC" in side
+    assert sql.endswith("ORDER BY anon_1.created_at DESC, anon_1.id DESC LIMIT %(param_5)s")
+
+
+def test_user_matches_version_compiles_to_union_all():
+    """Test that the ETag probe reads each side of the pair separately instead of with OR"""
+    sql = str(crud_match.user_matches_version_query(str(uuid.uuid4())).compile(dialect=postgresql.dialect()))
+    sql = re.sub(r"\s+", " ", sql)
+    assert " UNION ALL " in sql
+    assert "WHERE matches.user_a = " in sql and "WHERE matches.user_b = " in sql
+    assert " OR " not in sql
+
+
+@pytest.mark.postgres
+def test_get_matches(pg_client: TestClient, pg_db, make_user):
+    """Test that /matches lists the user's matches from both sides of the pair"""
+    user, headers = make_user()
+    other_a, _ = make_user()
+    other_b, _ = make_user()
+    outsider, _ = make_user()
+    match_a = crud_match.create_match(pg_db, str(user.id), str(other_a.id))
+    match_b = crud_match.create_match(pg_db, str(other_b.id), str(user.id))
+    crud_match.create_match(pg_db, str(other_a.id), str(outsider.id))
+
+    response = pg_client.get("/api/v1/matches", headers=headers)
+    assert response.status_code == 200
+    assert {item["id"] for item in response.json()} == {str(match_a.id), str(match_b.id)}
+    assert "X-Next-Cursor" not in response.headers
+
+    response = pg_client.get("/api/v1/matches", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.postgres
+def test_user_match_rows_pages_across_both_sides(pg_db, make_user):
+    """Test newest-first order and cursor continuation over matches on either side of the pair"""
+    # The middle id is user_b of its pairs with smaller ids and user_a of the rest
+    users = sorted((make_user()[0] for _ in range(8)), key=lambda user: str(user.id))
+    user, others = users[3], users[:3] + users[4:]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for position, other in enumerate(others):
+        # Pairs of matches share a created_at so the id breaks ties
+        user_a, user_b = crud_match.canonical_pair(user.id, other.id)
+        pg_db.add(models.Match(
+            id=uuid.uuid4(), user_a=user_a, user_b=user_b, created_at=start + timedelta(minutes=position // 2)
+        ))
+    pg_db.commit()
+
+    expected = [
+        (match.created_at, match.id)
+        for match in pg_db.query(models.Match).order_by(models.Match.created_at.desc(), models.Match.id.desc())
+    ]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = crud_match.get_user_match_rows(pg_db, str(user.id), 3, cursor)
+        seen.extend((row.created_at, row.id) for row in rows)
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == 3
+
+
+@pytest.mark.postgres
+def test_get_matches_only_maps_bad_cursors_to_400(pg_client: TestClient, make_user, monkeypatch):
+    """Test that a ValueError other than InvalidCursor stays a server error"""
+    _, headers = make_user()
+
+    def broken(db, user_id, limit, cursor):
+        raise ValueError("badly formed hexadecimal UUID string")
+
+    monkeypatch.setattr(crud_match, "get_user_match_rows", broken)
+    assert pg_client.get("/api/v1/matches", headers=headers).status_code == 500
+
+
+@pytest.mark.postgres
+def test_user_matches_version(pg_db, make_user):
+    """Test that the version counts matches on both sides and moves with new matches and statuses"""
+    users = sorted((make_user()[0] for _ in range(3)), key=lambda user: str(user.id))
+    user = users[1]
+    assert crud_match.get_user_matches_version(pg_db, str(user.id)) == (0, None, 0, 0, 0)
+
+    crud_match.create_match(pg_db, str(user.id), str(users[0].id))
+    match = crud_match.create_match(pg_db, str(user.id), str(users[2].id))
+    first = crud_match.get_user_matches_version(pg_db, str(user.id))
+    assert first[0] == 2 and first[2:] == (2, 0, 0)
+    assert first[1] == match.created_at
+
+    crud_match.update_match_status(pg_db, str(match.id), "active")
+    assert crud_match.get_user_matches_version(pg_db, str(user.id))[2:] == (1, 1, 0)
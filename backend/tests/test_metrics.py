@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.metrics import InstrumentedQueuePool, pool_stats, register_engine, render_prometheus, request_histograms
+
+
+@pytest.fixture
+def engine(tmp_path, request):
+    name = request.node.name
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+        pool_logging_name=name
+    )
+    register_engine(name, engine)
+    yield engine
+    engine.dispose()
+
+
+def test_pool_metrics_count_checkouts_overflow_and_timeouts(engine):
+    """Test checkout, overflow and timeout counters of an instrumented pool"""
+    first = engine.connect()
+    second = engine.connect()
+    stats = pool_stats()[engine.pool.logging_name]
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["overflow_checkouts"] == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    stats = pool_stats()[engine.pool.logging_name]
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+
+    first.close()
+    second.close()
+    assert pool_stats()[engine.pool.logging_name]["checked_out"] == 0
+
+
+def test_render_prometheus(engine):
+    """Test the Prometheus text rendering of pool metrics"""
+    with engine.connect():
+        text = render_prometheus()
+    assert "# TYPE db_pool_checked_out gauge" in text
+    assert 'db_pool_checked_out{pool="test_render_prometheus"} 1' in text
+    assert 'db_pool_checkouts_total{pool="test_render_prometheus"} 1' in text
+
+
+def test_request_histograms(client):
+    """Test that requests land in per-route, per-status latency histograms"""
+    client.get("/")
+    client.get("/")
+    client.get("/no-such-path")
+    unauthorized = client.get("/api/v1/auth/me").status_code
+
+    histograms = request_histograms()
+    assert histograms[("GET", "/api/v1/auth/me", unauthorized)].count >= 1
+    assert histograms[("GET", "/", 200)].count >= 2
+    assert histograms[("GET", "unmatched", 404)].count >= 1
+
+    text = client.get("/metrics").text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/",status="200",le="+Inf"}' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in text
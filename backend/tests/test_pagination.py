@@ -0,0 +1,72 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, Uuid, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.db.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(Uuid, primary_key=True)
+    created_at = Column(DateTime)
+    position = Column(Integer)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2025, 1, 1)
+    # Pairs of rows share a created_at so the id breaks ties
+    for position in range(7):
+        session.add(Item(id=uuid.uuid4(), created_at=start + timedelta(minutes=position // 2), position=position))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_keyset_pages_cover_all_rows_once(session):
+    """Test that following cursors visits every row exactly once, newest first"""
+    columns = [Item.created_at, Item.id]
+    expected = [item.id for item in session.query(Item).order_by(Item.created_at.desc(), Item.id.desc())]
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = paginate(session.query(Item), columns, cursor, limit=3)
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_cursor_round_trip():
+    """Test that cursors decode back to typed sort key values"""
+    created_at = datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc)
+    item_id = uuid.uuid4()
+    cursor = encode_cursor([created_at, item_id])
+    assert decode_cursor(cursor, [Item.created_at, Item.id]) == [created_at, item_id]
+
+
+def test_invalid_cursor():
+    """Test that malformed cursors raise ValueError"""
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", [Item.created_at, Item.id])
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(["x"]), [Item.created_at, Item.id])
+
+
+@pytest.mark.parametrize("payload", [[None, None], [123, str(uuid.uuid4())], ["2025-01-01T00:00:00", 5], ["2025-01-01T00:00:00", "x"]])
+def test_cursor_with_wrong_value_types(payload):
+    """Test that well-formed cursors holding values of the wrong type raise ValueError"""
+    cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, [Item.created_at, Item.id])
@@ -0,0 +1,170 @@
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+
+from app.core.cache import set_redis_client
+from app.core.config import settings
+from app.core import profile_cache
+from app.core.profile_cache import ProfileSnapshot, SnapshotCache, get_profiles_async, profile_snapshot
+from app.db.serializers import serialize_profile
+
+
+@pytest.fixture
+def fake_redis():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    set_redis_client(client)
+    yield client
+    set_redis_client(None)
+
+
+def _snapshot(user_id, nickname="nick"):
+    return ProfileSnapshot(
+        user_id=str(user_id),
+        nickname=nickname,
+        gender="F",
+        birth_year=1994,
+        height=165,
+        region="서울 강남구",
+        job="designer",
+        intro="hello",
+        photos=["a.jpg"],
+        visible={"height": False},
+        updated_at=1700000000.0
+    )
+
+
+class _Loader:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __call__(self, db, keys):
+        self.calls.append(keys)
+        return {key: self.rows[key] for key in keys if key in self.rows}
+
+
+def test_read_through_fills_both_tiers(fake_redis):
+    """Test that misses load once and are then served locally, then from Redis"""
+    user_ids = [str(uuid.uuid4()) for _ in range(3)]
+    loader = _Loader({user_id: _snapshot(user_id) for user_id in user_ids})
+    cache = SnapshotCache("test-profile", ProfileSnapshot, loader)
+
+    found = cache.get_many(None, user_ids + ["not-a-uuid", user_ids[0]])
+    assert set(found) == set(user_ids)
+    assert loader.calls == [user_ids]
+
+    assert cache.get_many(None, user_ids) == found
+    cache.clear_local()
+    assert cache.get_many(None, user_ids) == found
+    assert len(loader.calls) == 1
+
+
+def test_read_through_does_not_replace_write_through(fake_redis):
+    """Test that a stale read-through fill leaves a newer written entry in Redis"""
+    user_id = str(uuid.uuid4())
+    loader = _Loader({user_id: _snapshot(user_id, "old")})
+    cache = SnapshotCache("test-profile", ProfileSnapshot, loader)
+
+    cache.put(_snapshot(user_id, "new"))
+    cache.clear_local()
+    cache._fill(None, [user_id])
+    cache.clear_local()
+    assert cache.get_many(None, [user_id])[user_id].nickname == "new"
+
+    cache.refresh(None, [user_id])
+    cache.clear_local()
+    assert cache.get_many(None, [user_id])[user_id].nickname == "old"
+
+
+def test_works_without_redis(monkeypatch):
+    """Test that the cache falls back to the local tier and the loader"""
+    user_id = str(uuid.uuid4())
+    loader = _Loader({user_id: _snapshot(user_id)})
+    cache = SnapshotCache("test-profile", ProfileSnapshot, loader)
+    monkeypatch.setattr(settings, "CACHE_REDIS_ENABLED", False)
+
+    assert cache.get_many(None, [user_id])[user_id].nickname == "nick"
+    assert cache.get_many(None, [user_id])[user_id].nickname == "nick"
+    assert len(loader.calls) == 1
+
+
+class _AsyncSession:
+    async def run_sync(self, fn, *args):
+        return fn(None, *args)
+
+
+def test_async_redis_calls_run_off_the_event_loop(fake_redis, monkeypatch):
+    """Test that get_many_async reads and fills Redis from worker threads"""
+    cached_id, missing_id = str(uuid.uuid4()), str(uuid.uuid4())
+    loader = _Loader({missing_id: _snapshot(missing_id, "loaded")})
+    cache = SnapshotCache("test-profile", ProfileSnapshot, loader)
+    cache.put(_snapshot(cached_id, "cached"))
+    cache.clear_local()
+
+    threads = []
+    for name in ("_get_remote", "_store"):
+        method = getattr(cache, name)
+
+        def record_thread(*args, method=method):
+            threads.append(threading.get_ident())
+            return method(*args)
+
+        monkeypatch.setattr(cache, name, record_thread)
+
+    async def lookup():
+        return threading.get_ident(), await cache.get_many_async(_AsyncSession(), [cached_id, missing_id])
+
+    loop_thread, found = asyncio.run(lookup())
+    assert found[cached_id].nickname == "cached"
+    assert found[missing_id].nickname == "loaded"
+    assert len(threads) == 2 and loop_thread not in threads
+    assert fake_redis.exists(f"test-profile:v1:{missing_id}")
+
+
+def test_fresh_as_of_reloads_only_stale_snapshots(fake_redis, monkeypatch):
+    """Test that snapshots older than their fresh_as_of entry are reloaded and the rest kept"""
+    stale_id, fresh_id, unknown_id = (str(uuid.uuid4()) for _ in range(3))
+    edited_at = datetime.fromtimestamp(1700000100, timezone.utc)
+    loader = _Loader({
+        stale_id: _snapshot(stale_id, "edited")._replace(updated_at=edited_at.timestamp()),
+        fresh_id: _snapshot(fresh_id, "reloaded"),
+    })
+    cache = SnapshotCache("test-profile", ProfileSnapshot, loader)
+    for user_id in (stale_id, fresh_id, unknown_id):
+        cache.put(_snapshot(user_id))
+    monkeypatch.setattr(profile_cache, "profiles", cache)
+
+    fresh_as_of = {stale_id: edited_at.timestamp(), fresh_id: 1700000000.0}
+    found = asyncio.run(get_profiles_async(_AsyncSession(), [stale_id, fresh_id, unknown_id], fresh_as_of))
+    assert loader.calls == [[stale_id]]
+    assert {user_id: snapshot.nickname for user_id, snapshot in found.items()} == {
+        stale_id: "edited", fresh_id: "nick", unknown_id: "nick"
+    }
+    cache.clear_local()
+    assert cache.get_many(None, [stale_id])[stale_id].nickname == "edited"
+
+
+def test_write_through_bumps_profile_version(fake_redis):
+    """Test that cache_profile records the written profile's updated_at as its version"""
+    user_id, other_id = str(uuid.uuid4()), str(uuid.uuid4())
+    edited_at = datetime.fromtimestamp(1700000100.5, timezone.utc)
+    profile = SimpleNamespace(**{**_snapshot(user_id)._asdict(), "updated_at": edited_at})
+    profile_cache.cache_profile(profile)
+    try:
+        assert profile_cache.get_profile_versions([user_id, other_id, "not-a-uuid"]) == {user_id: 1700000100.5}
+        assert asyncio.run(profile_cache.get_profile_versions_async([user_id])) == {user_id: 1700000100.5}
+    finally:
+        profile_cache.profiles.delete(user_id)
+
+
+def test_snapshot_serializes_like_model():
+    """Test that snapshots go through serialize_profile like Profile models"""
+    profile = SimpleNamespace(**{**_snapshot(uuid.uuid4())._asdict(), "updated_at": None})
+    snapshot = profile_snapshot(profile)
+    for context in ("self", "match"):
+        assert serialize_profile(snapshot, context) == serialize_profile(profile, context)
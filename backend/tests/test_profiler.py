@@ -0,0 +1,55 @@
+import time
+
+from app.core.profiler import ProfileCapture, profile_current_thread
+
+
+def _busy_work(seconds):
+    deadline = time.monotonic() + seconds
+    total = 0
+    while time.monotonic() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def test_profile_current_thread_collapsed_stacks():
+    """Test that samples of the calling thread show up as collapsed stacks"""
+    with profile_current_thread(interval=0.001) as capture:
+        _busy_work(0.1)
+
+    assert capture.finished
+    assert capture.samples > 0
+    lines = capture.collapsed().splitlines()
+    assert any("_busy_work (tests/test_profiler.py" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.startswith("thread:")
+    assert int(count) > 0
+
+
+def test_path_capture_samples_only_matching_requests():
+    """Test that a path-scoped capture waits for and stops after its requests"""
+    capture = ProfileCapture(seconds=5, interval=0.001, path="/api/v1/matches", requests=1).start()
+    time.sleep(0.02)
+    assert capture.samples == 0
+    assert not capture.matches("/api/v1/recommendations")
+    assert capture.matches("/api/v1/matches/1")
+
+    capture.request_started()
+    _busy_work(0.05)
+    capture.request_finished()
+    capture.stop()
+    assert capture.finished
+    assert capture.samples > 0
+    assert capture.requests_seen == 1
+
+
+def test_speedscope_format():
+    """Test the speedscope sampled-profile structure"""
+    capture = ProfileCapture(seconds=1, interval=0.005)
+    capture.stacks.update({"thread:A;main;work": 3, "thread:A;main": 1})
+    profile = capture.speedscope("test")["profiles"][0]
+    frames = [frame["name"] for frame in capture.speedscope("test")["shared"]["frames"]]
+    assert frames == ["thread:A", "main", "work"]
+    assert profile["type"] == "sampled"
+    assert profile["samples"] == [[0, 1, 2], [0, 1]]
+    assert profile["weights"] == [15.0, 5.0]
+    assert profile["endValue"] == 20.0
@@ -0,0 +1,37 @@
+import uuid
+
+import pytest
+from sqlalchemy import String, cast, column, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.services.recommendation_service import delivery_bucket, delivery_bucket_sql
+
+
+def test_delivery_bucket_is_stable():
+    """Test that buckets are deterministic and cover every bucket"""
+    user_ids = [str(uuid.uuid4()) for _ in range(400)]
+    assert [delivery_bucket(user_id, 4) for user_id in user_ids] == [delivery_bucket(user_id, 4) for user_id in user_ids]
+    assert {delivery_bucket(user_id, 4) for user_id in user_ids} == {0, 1, 2, 3}
+    assert delivery_bucket(user_ids[0], 1) == 0
+
+
+def test_delivery_bucket_sql_compiles_for_postgres():
+    """Test the shape of the bucket predicate pushed into the user query"""
+    sql = str(delivery_bucket_sql(column("id", UUID), 4).compile(dialect=postgresql.dialect()))
+    assert "md5" in sql
+    assert "AS BIT(60)" in sql
+    assert "AS BIGINT" in sql
+
+
+@pytest.mark.postgres
+def test_delivery_bucket_sql_matches_python(pg_engine):
+    """Test that Postgres assigns every user to the same bucket as delivery_bucket"""
+    user_ids = [str(uuid.uuid4()) for _ in range(200)]
+    ids = select(func.unnest(postgresql.array([cast(user_id, UUID) for user_id in user_ids])).label("user_id")).subquery()
+    with pg_engine.connect() as connection:
+        rows = connection.execute(select(cast(ids.c.user_id, String), delivery_bucket_sql(ids.c.user_id, 7))).all()
+
+    assert len(rows) == len(user_ids)
+    for user_id, bucket in rows:
+        assert bucket == delivery_bucket(user_id, 7)
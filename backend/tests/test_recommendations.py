@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import profile_cache
+from app.db import models
+
+WEEK = "2025-W01"
+
+
+@pytest.mark.postgres
+def test_get_recommendations(pg_client: TestClient, pg_db, make_user):
+    """Test the weekly list with cached target profiles and its ETag"""
+    user, headers = make_user()
+    target, _ = make_user(nickname="추천대상")
+    pg_db.add(models.Recommendation(user_id=user.id, target_user_id=target.id, batch_week=WEEK, score=0.9))
+    pg_db.commit()
+
+    response = pg_client.get("/api/v1/recommendations", params={"week": WEEK}, headers=headers)
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["target_user_id"] for item in items] == [str(target.id)]
+    assert items[0]["target_profile"]["nickname"] == "추천대상"
+
+    response = pg_client.get(
+        "/api/v1/recommendations",
+        params={"week": WEEK},
+        headers={**headers, "If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+    response = pg_client.get("/api/v1/recommendations", params={"week": "2025-01"}, headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.postgres
+def test_recommendations_reload_edited_target_profiles(pg_client: TestClient, pg_db, make_user):
+    """Test that a target profile with a newer version is reloaded, and the rest served from the cache"""
+    user, headers = make_user()
+    targets = [make_user(nickname=f"대상{position}")[0] for position in range(2)]
+    for position, target in enumerate(targets):
+        pg_db.add(models.Recommendation(user_id=user.id, target_user_id=target.id, batch_week=WEEK, score=position))
+    pg_db.commit()
+    response = pg_client.get("/api/v1/recommendations", params={"week": WEEK}, headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    # Target 0 is edited and written through on another worker, which leaves
+    # this worker's local snapshot behind its version; target 1 is edited with
+    # no write-through at all, so nothing tells the read path to look
+    edited_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+    pg_db.query(models.Profile).filter(models.Profile.user_id == targets[0].id).update({
+        "nickname": "수정됨", "updated_at": edited_at
+    })
+    pg_db.query(models.Profile).filter(models.Profile.user_id == targets[1].id).update({"nickname": "몰래"})
+    pg_db.commit()
+    profile_cache.profile_versions.set(str(targets[0].id), repr(edited_at.timestamp()), 60)
+
+    response = pg_client.get(
+        "/api/v1/recommendations", params={"week": WEEK}, headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    nicknames = {item["target_user_id"]: item["target_profile"]["nickname"] for item in response.json()}
+    assert nicknames == {str(targets[0].id): "수정됨", str(targets[1].id): "대상1"}
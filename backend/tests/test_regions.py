@@ -0,0 +1,40 @@
+from app.core.regions import (
+    REGIONS,
+    codes_within,
+    region_affinity,
+    region_code,
+)
+
+
+def test_region_code_aliases():
+    """Test that region spellings map to the same code"""
+    seoul = region_code("서울")
+    assert seoul is not None
+    assert region_code("서울 강남구") == seoul
+    assert region_code("서울특별시 마포구") == seoul
+    assert region_code("강남구") is None
+    assert region_code(None) is None
+
+
+def test_region_affinity():
+    """Test that affinity decays with distance"""
+    seoul = region_code("서울")
+    incheon = region_code("인천")
+    busan = region_code("부산")
+
+    assert region_affinity(seoul, seoul) == 1.0
+    assert 0.0 < region_affinity(seoul, incheon) < 1.0
+    assert region_affinity(seoul, busan) == 0.0
+    assert region_affinity(seoul, None) == 0.0
+
+
+def test_codes_within():
+    """Test widening preferred regions by distance"""
+    assert codes_within(["서울"], 0) == {region_code("서울")}
+
+    nearby = codes_within(["서울"], 50)
+    assert region_code("인천") in nearby
+    assert region_code("경기") in nearby
+    assert region_code("부산") not in nearby
+
+    assert codes_within(["서울"], 1000) == set(range(len(REGIONS)))
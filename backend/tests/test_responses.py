@@ -0,0 +1,87 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from starlette.requests import Request
+
+from app.core.responses import FastJSONResponse, not_modified, weak_etag
+from app.db import schemas
+
+
+def _item(sent_at):
+    return dict(
+        id=1,
+        target_user_id=uuid.uuid4(),
+        batch_week="2024-W37",
+        score=Decimal("5.500"),
+        sent_at=sent_at,
+        responded=False,
+        target_profile=dict(
+            user_id=str(uuid.uuid4()),
+            nickname="nick",
+            gender="F",
+            birth_year=1994,
+            height=165,
+            region="서울 강남구",
+            job=None,
+            intro="hello",
+            photos=["a.jpg"],
+            visible={"age": False}
+        )
+    )
+
+
+def test_render_matches_pydantic_encoding():
+    """Test that orjson output decodes to the same JSON as the response model"""
+    for sent_at in (
+        datetime(2024, 9, 9, 12, 0, 0, 123456, tzinfo=timezone.utc),
+        datetime(2024, 9, 9, 21, 0, tzinfo=timezone(timedelta(hours=9))),
+        datetime(2024, 9, 9, 12, 0),
+        None,
+    ):
+        item = _item(sent_at)
+        expected = schemas.RecommendationItem.model_validate(item).model_dump_json()
+        body = FastJSONResponse([item]).body
+        assert json.loads(body) == [json.loads(expected)]
+
+
+def test_render_keeps_non_ascii():
+    """Test that text is emitted as UTF-8 rather than escaped"""
+    body = FastJSONResponse({"region": "서울"}).body
+    assert "서울".encode() in body
+
+
+def test_render_uuid_subclass():
+    """Test that driver UUID subclasses (e.g. asyncpg's) encode as strings"""
+    class DriverUUID(uuid.UUID):
+        pass
+
+    value = DriverUUID(str(uuid.uuid4()))
+    assert json.loads(FastJSONResponse({"id": value}).body) == {"id": str(value)}
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_weak_etag_is_stable():
+    """Test that the same markers give the same tag and any change gives a new one"""
+    etag = weak_etag("matches", "u1", None, 50, 3)
+    assert etag.startswith('W/"')
+    assert weak_etag("matches", "u1", None, 50, 3) == etag
+    assert weak_etag("matches", "u1", None, 50, 4) != etag
+
+
+def test_not_modified():
+    """Test If-None-Match handling with weak comparison, lists and wildcards"""
+    etag = weak_etag("recommendations", "u1", "2024-W37", 10)
+    assert not_modified(_request(), etag) is None
+    assert not_modified(_request('W/"other"'), etag) is None
+
+    for header in (etag, etag.removeprefix("W/"), f'W/"other", {etag}', "*"):
+        response = not_modified(_request(header), etag)
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.body == b""
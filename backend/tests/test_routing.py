@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from app.db.routing import (
+    READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER, ReadAfterWriteMiddleware, ReplicaRouter, reads_from_primary
+)
+
+
+def _database(path, name):
+    engine = create_engine(f"sqlite:///{path / name}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE source (name TEXT)"))
+        connection.execute(text("INSERT INTO source VALUES (:name)"), {"name": name})
+    return engine
+
+
+def _source(connection) -> str:
+    try:
+        return connection.execute(text("SELECT name FROM source")).scalar()
+    finally:
+        connection.close()
+
+
+def test_round_robin_over_replicas(tmp_path):
+    """Test that reads rotate over replicas"""
+    router = ReplicaRouter(
+        _database(tmp_path, "primary"),
+        [_database(tmp_path, "replica1"), _database(tmp_path, "replica2")]
+    )
+    sources = [_source(router.connect()) for _ in range(4)]
+    assert sources == ["replica1", "replica2", "replica1", "replica2"]
+
+
+def test_failed_replica_is_skipped(tmp_path):
+    """Test fallback past an unreachable replica, which is then skipped until its retry"""
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReplicaRouter(_database(tmp_path, "primary"), [broken], retry_seconds=60)
+    assert _source(router.connect()) == "primary"
+    assert router.candidates() == [router.primary]
+
+
+def test_recent_writer_reads_from_primary(tmp_path):
+    """Test read-after-write stickiness to the primary"""
+    router = ReplicaRouter(_database(tmp_path, "primary"), [_database(tmp_path, "replica")])
+    assert _source(router.connect(primary=True)) == "primary"
+    assert _source(router.connect()) == "replica"
+
+
+def _request(headers):
+    return Request({"type": "http", "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()]})
+
+
+def test_write_marker_travels_with_the_client():
+    """Test that successful writes set a marker that pins reads via its cookie or header until it expires"""
+    app = FastAPI()
+    app.add_middleware(ReadAfterWriteMiddleware, sticky_seconds=5)
+
+    @app.post("/items")
+    def create_item():
+        return {"ok": True}
+
+    @app.get("/items")
+    def list_items(request: Request):
+        return {"primary": reads_from_primary(request)}
+
+    @app.post("/fail")
+    def fail():
+        raise HTTPException(status_code=400)
+
+    client = TestClient(app)
+    assert client.get("/items").json() == {"primary": False}
+    assert READ_PRIMARY_HEADER not in client.post("/fail").headers
+
+    response = client.post("/items")
+    until = response.headers[READ_PRIMARY_HEADER]
+    assert float(until) > time.time()
+    assert response.cookies[READ_PRIMARY_COOKIE] == until
+    assert READ_PRIMARY_HEADER not in client.get("/items").headers
+    # The test client keeps the cookie
+    assert client.get("/items").json() == {"primary": True}
+
+    client.cookies.clear()
+    assert TestClient(app).get("/items", headers={READ_PRIMARY_HEADER: until}).json() == {"primary": True}
+    assert reads_from_primary(_request({READ_PRIMARY_HEADER: f"{time.time() - 1:.3f}"})) is False
+    assert reads_from_primary(_request({READ_PRIMARY_HEADER: "soon"})) is False
+
+
+def test_exhausted_replica_pool_falls_back(tmp_path):
+    """Test that a replica pool timeout falls back to the primary without marking the replica down"""
+    _database(tmp_path, "replica")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica'}", pool_size=1, max_overflow=0, pool_timeout=0.01)
+    router = ReplicaRouter(_database(tmp_path, "primary"), [replica])
+    held = router.connect()
+    try:
+        assert _source(router.connect()) == "primary"
+    finally:
+        held.close()
+    assert _source(router.connect()) == "replica"
+
+
+def test_async_router_falls_back_to_primary(tmp_path):
+    """Test the async router with an unreachable replica"""
+    _database(tmp_path, "primary")
+    router = ReplicaRouter(
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary'}"),
+        [create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")]
+    )
+
+    async def read():
+        connection = await router.connect_async()
+        try:
+            return (await connection.execute(text("SELECT name FROM source"))).scalar()
+        finally:
+            await connection.close()
+            await router.primary.dispose()
+
+    assert asyncio.run(read()) == "primary"
@@ -0,0 +1,34 @@
+import uuid
+from collections import Counter
+
+import pytest
+
+from app.services.scoring import STRATEGIES, assign_strategy, get_strategy, register_strategy
+
+
+def test_assign_strategy_is_deterministic():
+    """Test that a user always lands in the same strategy"""
+    user_id = str(uuid.uuid4())
+    spec = "baseline:50,experiment:50"
+    assert assign_strategy(user_id, spec) == assign_strategy(user_id, spec)
+    assert assign_strategy(user_id, "baseline:100") == "baseline"
+
+
+def test_assign_strategy_respects_weights():
+    """Test that users are split roughly by weight"""
+    counts = Counter(
+        assign_strategy(str(uuid.uuid4()), "baseline:80,experiment:20")
+        for _ in range(5000)
+    )
+    assert set(counts) == {"baseline", "experiment"}
+    assert 0.15 < counts["experiment"] / 5000 < 0.25
+
+
+def test_register_strategy_rejects_unknown_features():
+    """Test that strategies must declare known features"""
+    with pytest.raises(ValueError):
+        register_strategy("broken", features=("not_a_feature",))
+
+    with pytest.raises(ValueError):
+        get_strategy("broken")
+    assert "baseline" in STRATEGIES
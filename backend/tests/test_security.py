@@ -0,0 +1,25 @@
+from app.core.security import create_jwt, decode_jwt, token_cache_stats
+
+
+def test_decode_jwt_caches_verified_tokens():
+    """Test that a repeated token is served from the verified-token cache"""
+    token = create_jwt("00000000-0000-0000-0000-000000000001", "user")
+
+    before = token_cache_stats()
+    first = decode_jwt(token)
+    second = decode_jwt(token)
+    after = token_cache_stats()
+
+    assert first == second
+    assert first["sub"] == "00000000-0000-0000-0000-000000000001"
+    assert after["hits"] == before["hits"] + 1
+
+
+def test_decode_jwt_rejects_invalid_tokens():
+    """Test that invalid tokens are neither accepted nor cached"""
+    token = create_jwt("00000000-0000-0000-0000-000000000002")
+    tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+
+    assert decode_jwt(tampered) is None
+    assert decode_jwt(tampered) is None
+    assert decode_jwt("not-a-token") is None
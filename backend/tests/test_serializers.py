@@ -0,0 +1,55 @@
+import uuid
+from types import SimpleNamespace
+
+from app.core.responses import FastJSONResponse
+from app.db import schemas
+from app.db.serializers import dumps_profiles, serialize_profile, serialize_profiles
+
+
+def _profile(**overrides):
+    data = dict(
+        user_id=uuid.uuid4(),
+        nickname="nick",
+        gender="F",
+        birth_year=1994,
+        height=165,
+        region="서울 강남구",
+        job="designer",
+        intro="hello",
+        photos=["a.jpg"],
+        visible={"age": True, "height": False, "region": True, "job": False, "intro": True}
+    )
+    data.update(overrides)
+    return SimpleNamespace(**data)
+
+
+def test_self_and_admin_see_everything():
+    """Test that unmasked contexts match the full Profile schema"""
+    profile = _profile()
+    expected = schemas.Profile.model_validate(profile, from_attributes=True).model_dump(mode="json")
+    assert serialize_profile(profile, "self") == expected
+    assert serialize_profile(profile, "admin") == expected
+
+
+def test_recommendation_and_match_apply_visibility():
+    """Test that hidden fields are nulled for other viewers, and photos stay visible"""
+    for context in ("recommendation", "match"):
+        data = serialize_profile(_profile(), context)
+        assert data["height"] is None
+        assert data["job"] is None
+        assert data["birth_year"] == 1994
+        assert data["photos"] == ["a.jpg"]
+
+
+def test_missing_visibility_keys_default_to_visible():
+    """Test that fields without a visibility setting are shown"""
+    data = serialize_profile(_profile(visible={}), "recommendation")
+    assert data["height"] == 165
+    assert data["intro"] == "hello"
+
+
+def test_dumps_profiles_matches_fast_json_response():
+    """Test that encoded profiles are the bytes FastJSONResponse would send"""
+    profiles = [_profile(), _profile(nickname="둘")]
+    body = FastJSONResponse(serialize_profiles(profiles, "match")).body
+    assert dumps_profiles(profiles, "match") == body
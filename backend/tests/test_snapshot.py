@@ -0,0 +1,130 @@
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.recommendation_service import build_pair_features
+from app.services.scoring import get_strategy
+from app.services.snapshot import Snapshot, snapshot_features, write_snapshot
+
+
+def _columns(user_ids):
+    return {
+        "user_id": np.frombuffer(b"".join(u.bytes for u in user_ids), dtype=np.uint8).reshape(-1, 16),
+        "birth_year": [1990, 1992, 1975],
+        "gender": [0, 1, 1],
+        "target_gender": [1, 0, 0],
+        "region_code": [0, 0, -1],
+        "region_id": [0, 0, -1],
+        "age_min": [25, 28, 40],
+        "age_max": [35, 38, 50],
+        "intro_len": [0, 40, 5],
+        "photo_count": [1, 3, 0],
+    }
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test that a written snapshot maps back read-only and sorted by id"""
+    user_ids = [uuid.uuid4() for _ in range(3)]
+    path = str(tmp_path / "population.snap")
+    write_snapshot(path, _columns(user_ids))
+
+    snapshot = Snapshot(path)
+    try:
+        assert len(snapshot) == 3
+        assert not snapshot["birth_year"].flags.writeable
+
+        for user_id, birth_year in zip(user_ids, [1990, 1992, 1975]):
+            index = snapshot.index_of(user_id)
+            assert snapshot.user_id(index) == user_id
+            assert snapshot["birth_year"][index] == birth_year
+
+        assert snapshot.index_of(uuid.uuid4()) is None
+        rows = snapshot.indices_of([user_ids[2], uuid.uuid4(), str(user_ids[0])])
+        assert list(rows) == [snapshot.index_of(user_ids[2]), -1, snapshot.index_of(user_ids[0])]
+    finally:
+        snapshot.close()
+
+
+def test_snapshot_features_score(tmp_path):
+    """Test building strategy features straight from snapshot rows"""
+    user_ids = [uuid.uuid4() for _ in range(3)]
+    path = str(tmp_path / "population.snap")
+    write_snapshot(path, _columns(user_ids), ["서울 강남구"])
+
+    snapshot = Snapshot(path)
+    try:
+        strategy = get_strategy("baseline")
+        user = snapshot.index_of(user_ids[0])
+        candidates = np.array([snapshot.index_of(user_ids[1]), snapshot.index_of(user_ids[2])])
+        features = snapshot_features(snapshot, strategy.features, np.full(2, user), candidates)
+        np.testing.assert_allclose(strategy.function(features), [8.0, 1.0])
+    finally:
+        snapshot.close()
+
+
+def test_empty_snapshot(tmp_path):
+    """Test that an empty population still produces a valid snapshot"""
+    path = str(tmp_path / "empty.snap")
+    columns = {name: [] for name in _columns([uuid.uuid4()] * 3)}
+    columns["user_id"] = np.zeros((0, 16), dtype=np.uint8)
+    write_snapshot(path, columns)
+
+    snapshot = Snapshot(path)
+    assert len(snapshot) == 0
+    assert snapshot.index_of(uuid.uuid4()) is None
+    snapshot.close()
+
+
+def test_region_match_needs_identical_text(tmp_path):
+    """Test that region text matches compare interned region ids, not hashes"""
+    user_ids = [uuid.uuid4() for _ in range(3)]
+    columns = _columns(user_ids)
+    columns["region_id"] = [0, 1, 0]
+    path = str(tmp_path / "population.snap")
+    write_snapshot(path, columns, ["서울 강남구", "서울 서초구"])
+
+    snapshot = Snapshot(path)
+    try:
+        assert snapshot.header["regions"] == ["서울 강남구", "서울 서초구"]
+        rows = snapshot.indices_of(user_ids)
+        features = snapshot_features(snapshot, ["region_text_match"], np.full(2, rows[0]), rows[1:])
+        assert list(features["region_text_match"]) == [False, True]
+    finally:
+        snapshot.close()
+
+
+def test_pair_features_from_snapshot_match_orm_rows(tmp_path):
+    """Test that scoring from snapshot rows matches ORM rows, falling back for unknown users"""
+    user_ids = [uuid.uuid4() for _ in range(3)]
+    path = str(tmp_path / "population.snap")
+    write_snapshot(path, _columns(user_ids), ["서울 강남구"])
+
+    def user(user_id, birth_year, region_code, region, intro, photos):
+        profile = SimpleNamespace(
+            birth_year=birth_year, region_code=region_code, region=region, intro=intro, photos=photos
+        )
+        return SimpleNamespace(id=user_id, profile=profile)
+
+    users = [
+        user(user_ids[0], 1990, 0, "서울 강남구", "", ["a"]),
+        user(user_ids[1], 1992, 0, "서울 강남구", "x" * 40, ["a", "b", "c"]),
+        user(user_ids[2], 1975, None, None, "x" * 5, []),
+    ]
+    pairs = [(users[0], users[1]), (users[0], users[2])]
+    strategy = get_strategy("baseline")
+
+    snapshot = Snapshot(path)
+    try:
+        expected = strategy.function(build_pair_features(strategy, pairs))
+        np.testing.assert_allclose(strategy.function(build_pair_features(strategy, pairs, snapshot)), expected)
+
+        # A user who signed up after the snapshot was built
+        newcomer = user(uuid.uuid4(), 1991, 0, "서울 강남구", "", [])
+        pairs.append((users[0], newcomer))
+        np.testing.assert_allclose(
+            strategy.function(build_pair_features(strategy, pairs, snapshot)),
+            strategy.function(build_pair_features(strategy, pairs))
+        )
+    finally:
+        snapshot.close()
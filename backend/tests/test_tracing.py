@@ -0,0 +1,112 @@
+import json
+import types
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import SpanExporter, instrument_module, span, start_trace
+
+
+@pytest.fixture
+def spans(tmp_path, monkeypatch):
+    """Enable tracing and return a function reading the spans exported so far"""
+    path = tmp_path / "spans.jsonl"
+    exporter = SpanExporter()
+    monkeypatch.setattr(exporter, "_start", lambda: None)
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "TRACING_EXPORT_PATH", str(path))
+
+    def read():
+        exporter.flush()
+        if not path.exists():
+            return []
+        return [
+            item
+            for line in path.read_text().splitlines()
+            for resource in json.loads(line)["resourceSpans"]
+            for scope in resource["scopeSpans"]
+            for item in scope["spans"]
+        ]
+    return read
+
+
+def test_disabled_tracing_is_a_noop(monkeypatch):
+    """Test that no spans are created while tracing is disabled"""
+    monkeypatch.setattr(settings, "TRACING_ENABLED", False)
+    with start_trace("job") as root, span("stage") as child:
+        assert root is None
+        assert child is None
+
+
+def test_nested_spans_in_otlp_json(spans):
+    """Test that stages nest under the root span and errors are recorded"""
+    with start_trace("job weekly-recommendations", sampled=True, week="2025-W01") as root:
+        with span("recs.load_users", users=3):
+            pass
+        with pytest.raises(ValueError):
+            with span("recs.score"):
+                raise ValueError("bad features")
+
+    exported = {item["name"]: item for item in spans()}
+    assert set(exported) == {"job weekly-recommendations", "recs.load_users", "recs.score"}
+    assert "parentSpanId" not in exported["job weekly-recommendations"]
+    assert exported["recs.load_users"]["parentSpanId"] == root.span_id
+    assert exported["recs.load_users"]["traceId"] == root.trace_id
+    assert {"key": "users", "value": {"intValue": "3"}} in exported["recs.load_users"]["attributes"]
+    assert exported["recs.score"]["status"] == {"code": 2, "message": "bad features"}
+    assert int(exported["recs.score"]["endTimeUnixNano"]) >= int(exported["recs.score"]["startTimeUnixNano"])
+
+
+def test_traceparent_continues_trace(spans):
+    """Test that a W3C traceparent sets the trace id, parent and sampling decision"""
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    with start_trace("GET", traceparent=f"00-{trace_id}-00f067aa0ba902b7-01") as root:
+        assert root.trace_id == trace_id
+        assert root.parent_id == "00f067aa0ba902b7"
+    with start_trace("GET", traceparent=f"00-{trace_id}-00f067aa0ba902b7-00") as root:
+        assert root is None
+
+
+def test_crud_and_statement_spans(spans):
+    """Test that instrumented CRUD functions and their statements become child spans"""
+    engine = create_engine("sqlite://")
+    for name in ("before_cursor_execute", "after_cursor_execute"):
+        event.listen(engine, name, getattr(tracing, f"_{name}"))
+
+    module = types.ModuleType("app.db.crud.example")
+
+    def get_answer(db, value):
+        return db.execute(text("SELECT :value"), {"value": value}).scalar()
+
+    def helper(value):
+        return value
+
+    get_answer.__module__ = helper.__module__ = module.__name__
+    module.get_answer, module.helper = get_answer, helper
+    assert instrument_module(module, "crud.example") == 1
+    assert module.helper is helper
+
+    with engine.connect() as db, start_trace("GET /api/v1/example", sampled=True):
+        assert module.get_answer(db, 42) == 42
+
+    exported = {item["name"]: item for item in spans()}
+    assert exported["SELECT"]["parentSpanId"] == exported["crud.example.get_answer"]["spanId"]
+    assert {"key": "db.statement", "value": {"stringValue": "SELECT ?"}} in exported["SELECT"]["attributes"]
+
+
+def test_span_cap_drops_crud_spans(spans, monkeypatch):
+    """Test that CRUD spans past the per-trace cap are dropped and counted on the root"""
+    monkeypatch.setattr(settings, "TRACING_MAX_SPANS_PER_TRACE", 2)
+    call = tracing.traced("crud.example.noop")(lambda db: None)
+    with start_trace("job", sampled=True):
+        for _ in range(3):
+            call(None)
+
+    exported = spans()
+    assert [item["name"] for item in exported].count("crud.example.noop") == 1
+    root = next(item for item in exported if item["name"] == "job")
+    assert {"key": "tracing.dropped_spans", "value": {"intValue": "2"}} in root["attributes"]
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import uuid
+
+import fakeredis
+import pytest
+
+from app.core import user_cache
+from app.core.cache import set_redis_client
+from app.core.user_cache import AuthUser, get_auth_user, get_auth_user_async, invalidate_user
+from app.db import models
+from app.db.crud.user import update_user_status
+
+
+@pytest.fixture(autouse=True)
+def fake_redis():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    set_redis_client(client)
+    user_cache._local.clear()
+    yield client
+    user_cache._local.clear()
+    set_redis_client(None)
+
+
+class _NoDatabase:
+    def query(self, *args):
+        raise AssertionError("cache hit must not query the database")
+
+
+def test_hit_skips_database():
+    """Test that local and Redis hits never reach the database"""
+    user = AuthUser(id=uuid.uuid4(), role="user", banned=False)
+    user_cache._local.set(str(user.id), user)
+    assert get_auth_user(_NoDatabase(), str(user.id).upper()) is user
+
+    user_cache._local.clear()
+    user_cache._redis.set(str(user.id), '{"role": "admin", "banned": true}', 60)
+    assert get_auth_user(_NoDatabase(), str(user.id)) == AuthUser(id=user.id, role="admin", banned=True)
+
+
+def test_async_redis_lookup_runs_off_the_event_loop(monkeypatch):
+    """Test that the async lookup calls the blocking Redis client from a worker thread"""
+    user_id = str(uuid.uuid4())
+    user_cache._redis.set(user_id, '{"role": "user", "banned": false}', 60)
+    get_remote = user_cache._get_remote
+    threads = []
+
+    def record_thread(key):
+        threads.append(threading.get_ident())
+        return get_remote(key)
+
+    monkeypatch.setattr(user_cache, "_get_remote", record_thread)
+
+    async def lookup():
+        return threading.get_ident(), await get_auth_user_async(_NoDatabase(), user_id)
+
+    loop_thread, user = asyncio.run(lookup())
+    assert user.id == uuid.UUID(user_id)
+    assert threads and loop_thread not in threads
+
+
+def test_invalid_id_is_a_miss():
+    """Test that a malformed id resolves to no user without a lookup"""
+    assert get_auth_user(_NoDatabase(), "not-a-uuid") is None
+    invalidate_user("not-a-uuid")
+
+
+def test_invalidate_normalizes_key():
+    """Test that invalidation finds entries whatever form of the id it is given"""
+    user = AuthUser(id=uuid.uuid4(), role="user", banned=False)
+    for user_id in (user.id, str(user.id).upper(), str(user.id).replace("-", "")):
+        user_cache._local.set(str(user.id), user)
+        user_cache._redis.set(str(user.id), '{"role": "user", "banned": false}', 60)
+        invalidate_user(user_id)
+        assert user_cache._local.get(str(user.id)) is None
+        assert user_cache._redis.get(str(user.id)) is None
+
+
+@pytest.mark.postgres
+def test_miss_loads_and_ban_invalidates(pg_db):
+    """Test that a miss loads from the database and ban/unban are seen immediately"""
+    user = models.User(kakao_user_id="cache-user")
+    pg_db.add(user)
+    pg_db.commit()
+
+    assert get_auth_user(pg_db, str(user.id)) == AuthUser(id=user.id, role="user", banned=False)
+    assert get_auth_user(pg_db, str(user.id).upper()).banned is False
+
+    update_user_status(pg_db, str(user.id).upper(), banned=True)
+    assert get_auth_user(pg_db, str(user.id)).banned is True
+
+    update_user_status(pg_db, user.id, banned=False, role="admin")
+    assert get_auth_user(pg_db, str(user.id)) == AuthUser(id=user.id, role="admin", banned=False)
+    assert get_auth_user(pg_db, str(uuid.uuid4())) is None
@@ -19,7 +19,7 @@ class ApiError extends Error {
   }
 }
 
-export async function apiServerSide<T>(path: string, options: RequestInit = {}): Promise<T> {
+async function fetchServerSide(path: string, options: RequestInit = {}): Promise<Response> {
   const session = await getServerSession(authOptions);
   const headers: Record<string, string> = {
     'Content-Type': 'application/json',
@@ -41,10 +41,14 @@ export async function apiServerSide<T>(path: string, options: RequestInit = {}):
     throw new ApiError(response.status, errorText);
   }
 
-  return response.json();
+  return response;
 }
 
-export async function apiClientSide<T>(path: string, options: RequestInit = {}, token?: string): Promise<T> {
+export async function apiServerSide<T>(path: string, options: RequestInit = {}): Promise<T> {
+  return (await fetchServerSide(path, options)).json();
+}
+
+async function fetchClientSide(path: string, options: RequestInit = {}, token?: string): Promise<Response> {
   const headers: Record<string, string> = {
     'Content-Type': 'application/json',
     ...(options.headers as Record<string, string> || {}),
@@ -57,6 +61,8 @@ export async function apiClientSide<T>(path: string, options: RequestInit = {},
   const response = await fetch(`${API_BASE_URL}${path}`, {
     ...options,
     headers,
+    // Carries the read-after-write cookie set by the API on writes
+    credentials: 'include',
   });
 
   if (!response.ok) {
@@ -64,7 +70,25 @@ export async function apiClientSide<T>(path: string, options: RequestInit = {},
     throw new ApiError(response.status, errorText);
   }
 
-  return response.json();
+  return response;
+}
+
+export async function apiClientSide<T>(path: string, options: RequestInit = {}, token?: string): Promise<T> {
+  return (await fetchClientSide(path, options, token)).json();
+}
+
+// Cursor-paginated lists send the next page's cursor in this header (absent on the last page)
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
+
+async function fetchAllPages<T>(path: string, fetchPage: (path: string) => Promise<Response>): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const response = await fetchPage(cursor ? `${path}?cursor=${encodeURIComponent(cursor)}` : path);
+    items.push(...(await response.json() as T[]));
+    cursor = response.headers.get(NEXT_CURSOR_HEADER);
+  } while (cursor);
+  return items;
 }
 
 // Auth API
@@ -117,11 +141,12 @@ export const recommendationsApi = {
 
 // Matches API
 export const matchesApi = {
+  // /matches returns at most one page (50 by default); follow the cursor for the rest
   getMatches: async (token?: string) => {
     if (token) {
-      return apiClientSide<Match[]>('/matches', {}, token);
+      return fetchAllPages<Match>('/matches', (path) => fetchClientSide(path, {}, token));
     }
-    return apiServerSide<Match[]>('/matches');
+    return fetchAllPages<Match>('/matches', (path) => fetchServerSide(path));
   },
   
   getMatch: async (matchId: string, token?: string) => {